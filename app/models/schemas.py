@@ -2,10 +2,13 @@
 app/models/schemas.py
 All Pydantic request/response models for Creator Growth AI.
 """
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List, Any, Dict
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List, Any, Dict, Union
 from enum import Enum
 
+# Monte Carlo work is simulations × timeline_months draws; 10k paths × 60 months
+MAX_SIMULATION_CELLS = 600_000
+
 
 class Platform(str, Enum):
     instagram = "instagram"
@@ -68,7 +71,7 @@ class ProfileAnalysisResponse(BaseModel):
     avg_likes:       int
     avg_comments:    int
     top_posts:       List[TopPost]
-    growth_data:     List[Dict[str, Any]]
+    growth_data:     Union[List[Dict[str, Any]], Dict[str, List[Any]]]   # rows, or columns with ?format=columnar
 
 
 # ─────────────────────────────────────────────
@@ -142,6 +145,14 @@ class GoalRequest(BaseModel):
     niche:             str
     posting_frequency: int = Field(default=5, ge=1, le=21,
                                    description="Posts per week")
+    platform:          Optional[Platform] = None
+    projection_mode:   str = Field(default="deterministic",
+                                   pattern="^(deterministic|monte_carlo)$",
+                                   description="monte_carlo adds p10/p50/p90 projection bands")
+    simulations:       int = Field(default=10_000, ge=1_000, le=100_000,
+                                   description="Simulated follower paths (monte_carlo mode)")
+    seed:              Optional[int] = Field(default=None,
+                                             description="RNG seed; defaults to one derived from the inputs")
 
     @field_validator("target_followers")
     @classmethod
@@ -151,13 +162,51 @@ class GoalRequest(BaseModel):
             raise ValueError("target_followers must be greater than current_followers")
         return v
 
+    @model_validator(mode="after")
+    def simulations_within_budget(self) -> "GoalRequest":
+        if self.simulations * self.timeline_months > MAX_SIMULATION_CELLS:
+            raise ValueError(f"simulations × timeline_months must be at most {MAX_SIMULATION_CELLS:,} "
+                             f"(at most {MAX_SIMULATION_CELLS // self.timeline_months:,} simulations "
+                             f"for {self.timeline_months} months)")
+        return self
+
 
 class GoalResponse(BaseModel):
     feasibility_score:    float
     feasibility_label:    str
     required_growth_rate: float
-    projection:           List[Dict[str, Any]]
+    projection:           Union[List[Dict[str, Any]], Dict[str, List[Any]]]   # rows, or columns with ?format=columnar
     recommendations:      List[str]
+    projection_bands:     Optional[Union[List[Dict[str, Any]], Dict[str, List[Any]]]] = None
+
+
+class GoalSolveRequest(BaseModel):
+    current_followers:     int   = Field(..., gt=0)
+    target_followers:      int   = Field(..., gt=0)
+    min_score:             float = Field(default=80.0, ge=0, le=100,
+                                         description="Minimum feasibility score the plan must reach")
+    objective:             str   = Field(default="timeline", pattern="^(timeline|frequency)$",
+                                         description="Minimise timeline or posting frequency first")
+    max_timeline_months:   int   = Field(default=60, ge=1, le=60)
+    max_posting_frequency: int   = Field(default=21, ge=1, le=21)
+
+    @field_validator("target_followers")
+    @classmethod
+    def target_must_exceed_current(cls, v: int, info) -> int:
+        current = info.data.get("current_followers", 0)
+        if v <= current:
+            raise ValueError("target_followers must be greater than current_followers")
+        return v
+
+
+class GoalSolveResponse(BaseModel):
+    min_score:      float
+    objective:      str
+    timelines:      List[int]
+    frequencies:    List[int]
+    surface:        List[List[float]]   # surface[timeline-1][frequency-1]
+    feasible_plans: int
+    plan:           Optional[Dict[str, Any]] = None
 
 
 # ─────────────────────────────────────────────
@@ -170,3 +219,75 @@ class ReportRequest(BaseModel):
     astrology: Optional[Dict[str, Any]] = None
     goals:     Optional[Dict[str, Any]] = None
     username:  str = "Creator"
+
+    # Result ids from the X-Result-Id header of earlier calls — loaded
+    # server-side when the matching inline dict is not sent.
+    profile_id:   Optional[str] = None
+    insights_id:  Optional[str] = None
+    astrology_id: Optional[str] = None
+    goals_id:     Optional[str] = None
+
+
+# ─────────────────────────────────────────────
+# 30-Day Plan
+# ─────────────────────────────────────────────
+
+class PlanRequest(BaseModel):
+    name:        str
+    platform:    str
+    goal:        str
+    zodiac:      str
+    dob:         str
+    followers:   Optional[int] = None
+    posts:       Optional[int] = None
+    subscribers: Optional[int] = None
+    videos:      Optional[int] = None
+    views:       Optional[int] = None
+
+
+class PlanDay(BaseModel):
+    day:  str
+    task: str
+
+
+class PlanWeek(BaseModel):
+    week:  int
+    theme: str
+    days:  List[PlanDay]
+
+
+class PlanResponse(BaseModel):
+    plan_id:     str
+    weeks_total: int
+    week:        PlanWeek
+    next_week:   Optional[str] = None   # path of the next page, None after the last week
+
+
+# ─────────────────────────────────────────────
+# Pipeline
+# ─────────────────────────────────────────────
+
+class PipelineRequest(BaseModel):
+    social_url:        str = Field(..., min_length=3, description="Full social media profile URL")
+    username:          Optional[str] = None
+    niche:             Optional[str] = "general"
+    goals:             Optional[str] = "grow audience"
+
+    # Astrology stage runs only when both are given
+    dob:               Optional[str] = Field(default=None, description="Date of birth YYYY-MM-DD")
+    time_of_birth:     str = Field(default="12:00", description="HH:MM 24h format")
+    zodiac:            Optional[Zodiac] = None
+
+    # Goals stage runs only when a target is given
+    target_followers:  Optional[int] = Field(default=None, gt=0)
+    timeline_months:   int = Field(default=6, gt=0, le=60)
+    posting_frequency: int = Field(default=5, ge=1, le=21)
+    current_followers: Optional[int] = Field(default=None, gt=0,
+                                             description="Known follower count — lets goals start without waiting for the profile")
+
+    include_report:    bool = True
+
+    @field_validator("social_url")
+    @classmethod
+    def validate_url(cls, v: str) -> str:
+        return ProfileAnalysisRequest.validate_url(v)
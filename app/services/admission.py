@@ -0,0 +1,229 @@
+"""
+app/services/admission.py
+
+Admission control with separate lanes for cheap and expensive routes.
+
+Expensive routes (OpenAI calls, scraping, PDF rendering) each get their own
+concurrency limit, a bounded FIFO wait queue and a maximum queue wait. A
+request is shed with 503 up front when the queue is full or when its
+predicted wait (queue position × EWMA service time / concurrency) already
+exceeds the deadline, instead of timing out after holding a slot in line.
+
+A slot is held until the response body has been sent, not just until the
+handler returns — streaming routes such as /pipeline do their work while the
+body is produced. The timing middleware closes out its metrics, trace and
+profiles through the same hook (on_body_sent).
+
+Cheap routes (/health, /calculate-goals, /solve-goals, metadata) are in their
+own lane with no queue at all, so a burst of uploads can never delay them.
+
+Limits can be overridden with
+  ADMISSION_LIMITS="/creator-analysis=4:8:20,/generate-report=2:4:10"
+as route=concurrency:max_queue:max_wait_seconds.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional
+
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+from app.services.metrics import registry
+
+logger = logging.getLogger("creator_growth_ai")
+
+ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "1").lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class LaneConfig:
+    concurrency: int
+    max_queue:   int
+    max_wait:    float          # seconds
+    initial_service_time: float  # seed for the EWMA before real samples arrive
+
+
+_DEFAULT_LIMITS: Dict[str, LaneConfig] = {
+    "/creator-analysis":     LaneConfig(4,  8,  20.0, 40.0),
+    "/palm-analysis":        LaneConfig(6,  12, 15.0, 10.0),
+    "/generate-ai-insights": LaneConfig(12, 24, 15.0, 10.0),
+    "/astrology-analysis":   LaneConfig(12, 24, 15.0, 6.0),
+    "/analyze-profile":      LaneConfig(16, 32, 10.0, 2.0),
+    "/generate-report":      LaneConfig(2,  8,  10.0, 1.5),
+    "/pipeline":             LaneConfig(4,  8,  20.0, 30.0),
+    "/plans":                LaneConfig(8,  16, 15.0, 8.0),
+    "/plans/{plan_id}/weeks/{week}": LaneConfig(8, 16, 15.0, 8.0),
+}
+
+admission_wait = registry.histogram(
+    "admission_queue_wait_seconds", "Time spent waiting for an admission slot", ("route",))
+admission_rejected_total = registry.counter(
+    "admission_rejected_total", "Requests shed by admission control", ("route", "reason"))
+admission_queue_depth = registry.gauge(
+    "admission_queue_depth", "Requests waiting for an admission slot", ("route",))
+
+
+class Rejected(Exception):
+    def __init__(self, route: str, reason: str, retry_after: float):
+        super().__init__(f"Server busy ({reason}) for {route}. Retry in ~{retry_after:.0f}s.")
+        self.reason      = reason
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class RouteLimiter:
+    def __init__(self, route: str, config: LaneConfig):
+        self.route   = route
+        self.config  = config
+        self.active  = 0
+        self.service_ewma = config.initial_service_time
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def predicted_wait(self, position: int) -> float:
+        return position * self.service_ewma / self.config.concurrency
+
+    async def acquire(self) -> float:
+        """Take a slot, returning the time spent queued. Raises Rejected to shed."""
+        if self.active < self.config.concurrency and not self._waiters:
+            self.active += 1
+            return 0.0
+
+        position = len(self._waiters) + 1
+        if position > self.config.max_queue:
+            raise Rejected(self.route, "queue full", self.predicted_wait(position))
+        predicted = self.predicted_wait(position)
+        if predicted > self.config.max_wait:
+            raise Rejected(self.route, "predicted wait exceeds deadline", predicted)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        admission_queue_depth.set(self.route, value=len(self._waiters))
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(fut, timeout=self.config.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed over just as we gave up — pass it on
+                self.release(0.0)
+            else:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            admission_queue_depth.set(self.route, value=len(self._waiters))
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            raise Rejected(self.route, "queue wait deadline", self.service_ewma)
+        admission_queue_depth.set(self.route, value=len(self._waiters))
+        return time.monotonic() - start
+
+    def release(self, held_for: float) -> None:
+        if held_for > 0:
+            self.service_ewma = 0.8 * self.service_ewma + 0.2 * held_for
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)   # slot transfers directly; active unchanged
+                return
+        self.active -= 1
+
+
+class Ticket:
+    __slots__ = ("limiter", "_start", "_released")
+
+    def __init__(self, limiter: RouteLimiter):
+        self.limiter   = limiter
+        self._start    = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.limiter.release(time.monotonic() - self._start)
+
+
+def on_body_sent(response: Response, callback: Callable[[], None]) -> None:
+    """
+    Call `callback` once, after `response`'s body has been sent or the client
+    has gone. Responses whose body is already rendered call it right away.
+    """
+    done = False
+
+    def run_once() -> None:
+        nonlocal done
+        if not done:
+            done = True
+            callback()
+
+    body = getattr(response, "body_iterator", None)
+    if body is None:
+        run_once()
+        return
+
+    async def call_after():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            run_once()
+
+    response.body_iterator = call_after()
+    if response.background is None:
+        # Also runs when the client disconnects before the body is iterated at all
+        response.background = BackgroundTask(run_once)
+
+
+def hold_until_sent(response: Response, ticket: Ticket) -> None:
+    """Release `ticket` once `response`'s body has been sent (or the client has gone)."""
+    on_body_sent(response, ticket.release)
+
+
+def _load_limits() -> Dict[str, LaneConfig]:
+    limits = dict(_DEFAULT_LIMITS)
+    for item in filter(None, (p.strip() for p in os.getenv("ADMISSION_LIMITS", "").split(","))):
+        try:
+            route, spec = item.split("=", 1)
+            concurrency, max_queue, max_wait = spec.split(":")
+            base = limits.get(route)
+            limits[route] = LaneConfig(int(concurrency), int(max_queue), float(max_wait),
+                                       base.initial_service_time if base else 5.0)
+        except ValueError:
+            logger.warning("[admission] ignoring malformed ADMISSION_LIMITS entry %r", item)
+    return limits
+
+
+_limiters: Dict[str, RouteLimiter] = {route: RouteLimiter(route, cfg) for route, cfg in _load_limits().items()}
+
+
+async def admit(route: str) -> Optional[Ticket]:
+    """Cheap-lane routes return None immediately; expensive ones wait for a slot or raise Rejected."""
+    if not ADMISSION_ENABLED:
+        return None
+    limiter = _limiters.get(route)
+    if limiter is None:
+        return None
+    try:
+        waited = await limiter.acquire()
+    except Rejected as exc:
+        admission_rejected_total.inc(route, exc.reason)
+        logger.warning("[admission] shed %s: %s", route, exc.reason)
+        raise
+    admission_wait.observe(waited, route)
+    return Ticket(limiter)
+
+
+def lane_stats() -> Dict[str, dict]:
+    return {
+        route: {
+            "active":          lim.active,
+            "queued":          len(lim._waiters),
+            "concurrency":     lim.config.concurrency,
+            "max_queue":       lim.config.max_queue,
+            "max_wait":        lim.config.max_wait,
+            "service_ewma_s":  round(lim.service_ewma, 3),
+        }
+        for route, lim in _limiters.items()
+    }
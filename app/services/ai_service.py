@@ -7,15 +7,19 @@ If OPENAI_API_KEY is missing or the call fails, a clear HTTPException is raised
 so the frontend receives a proper error message instead of fake data.
 """
 import os
-import json
 import logging
 import base64
-from typing import Optional
+from typing import List, Optional
 
 import httpx
 from fastapi import HTTPException
 from dotenv import load_dotenv
 
+from app.services.openai_transport import post_chat_completion, record_usage
+from app.services.repair import parse_json, validate_or_repair
+from app.services.serialization import validate
+from app.services.tracing import span
+
 # Load .env file — must be present at project root
 load_dotenv()
 
@@ -23,7 +27,6 @@ logger = logging.getLogger("creator_growth_ai")
 
 OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "").strip()
 OPENAI_MODEL:   str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-OPENAI_URL      = "https://api.openai.com/v1/chat/completions"
 
 if not OPENAI_API_KEY:
     logger.warning(
@@ -50,10 +53,12 @@ async def _call_openai(
     temperature: float = 0.7,
     max_tokens: int = 2000,
     require_json: bool = True,
+    usage: Optional[dict] = None,
 ) -> dict:
     """
     Make a single OpenAI chat completion call.
     Returns the parsed JSON dict (when require_json=True) or raises HTTPException.
+    If `usage` is given it is filled with the call's token usage.
     """
     api_key = _require_key()
 
@@ -66,18 +71,11 @@ async def _call_openai(
     if require_json:
         payload["response_format"] = {"type": "json_object"}
 
-    logger.info(f"[OpenAI] calling model={OPENAI_MODEL} messages={len(messages)}")
+    logger.info("[OpenAI] calling model=%s messages=%s", OPENAI_MODEL, len(messages))
 
     try:
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            resp = await client.post(
-                OPENAI_URL,
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type":  "application/json",
-                },
-                json=payload,
-            )
+        with span("openai_wait", model=OPENAI_MODEL, max_tokens=max_tokens):
+            resp = await post_chat_completion(api_key, payload, timeout=90.0)
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="OpenAI request timed out (>90s). Try again.")
     except httpx.RequestError as exc:
@@ -98,8 +96,11 @@ async def _call_openai(
 
     try:
         data = resp.json()
+        record_usage(OPENAI_MODEL, data)
+        if usage is not None:
+            usage.update(data.get("usage") or {})
         raw_content = data["choices"][0]["message"]["content"]
-        logger.info(f"[OpenAI] response length={len(raw_content)} chars")
+        logger.info("[OpenAI] response length=%s chars", len(raw_content))
     except (KeyError, IndexError, ValueError) as exc:
         raise HTTPException(
             status_code=502,
@@ -109,40 +110,28 @@ async def _call_openai(
     if not require_json:
         return {"text": raw_content}
 
-    # Strip markdown code fences if model wrapped the JSON anyway
-    cleaned = raw_content.strip()
-    if cleaned.startswith("```"):
-        lines = cleaned.split("\n")
-        cleaned = "\n".join(lines[1:-1]) if lines[-1].strip() == "```" else "\n".join(lines[1:])
-
-    try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError as exc:
-        raise HTTPException(
-            status_code=502,
-            detail=f"OpenAI returned invalid JSON: {exc}. Raw: {raw_content[:200]}",
-        )
+    with span("json_parse", chars=len(raw_content)):
+        try:
+            return parse_json(raw_content)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=502,
+                detail=f"OpenAI returned invalid JSON: {exc}. Raw: {raw_content[:200]}",
+            )
 
 
 # ─────────────────────────────────────────────────────────────
 # GROWTH INSIGHTS
 # ─────────────────────────────────────────────────────────────
 
-_INSIGHTS_PROMPT = """\
+# Static instructions and schema first (system message) so every call shares
+# the same prefix for OpenAI's prompt cache; per-creator values come last.
+_INSIGHTS_SYSTEM_PROMPT = """\
 You are a brutally honest but highly intelligent content growth strategist.
-
-Creator profile:
-- Username: {username}
-- Platform: {platform}
-- Followers: {followers:,}
-- Engagement Rate: {engagement_rate}%
-- Niche: {niche}
-- Goals: {goals}
-- Target Followers: {target_followers}
-- Timeline: {timeline_months} months
+The user message contains the creator's profile.
 
 Respond ONLY with a single valid JSON object matching this exact structure (no extra keys, no markdown):
-{{
+{
   "profile_analysis": "<2-3 sentence honest analysis of this profile>",
   "mistakes": ["<mistake 1>", "<mistake 2>", "<mistake 3>", "<mistake 4>", "<mistake 5>"],
   "daily_plan": [
@@ -161,7 +150,7 @@ Respond ONLY with a single valid JSON object matching this exact structure (no e
     "<hook 1>", "<hook 2>", "<hook 3>", "<hook 4>", "<hook 5>",
     "<hook 6>", "<hook 7>", "<hook 8>", "<hook 9>", "<hook 10>"
   ],
-  "posting_schedule": {{
+  "posting_schedule": {
     "Monday":    ["10:00 AM", "7:00 PM"],
     "Tuesday":   ["12:00 PM"],
     "Wednesday": ["9:00 AM", "6:30 PM"],
@@ -169,30 +158,54 @@ Respond ONLY with a single valid JSON object matching this exact structure (no e
     "Friday":    ["10:00 AM", "8:00 PM"],
     "Saturday":  ["2:00 PM", "7:00 PM"],
     "Sunday":    ["5:00 PM"]
-  }},
-  "growth_prediction": {{
+  },
+  "growth_prediction": {
     "month_1":  <integer followers in 1 month>,
     "month_3":  <integer followers in 3 months>,
     "month_6":  <integer followers in 6 months>,
     "month_12": <integer followers in 12 months>,
     "confidence": "high" | "medium" | "low"
-  }}
-}}
+  }
+}
 
 Rules:
 - Be direct, specific, and actionable — no generic advice
-- Base all numbers on the creator's actual stats above
+- Base all numbers on the creator's actual stats from the user message
 - Content ideas and hooks must be niche-specific, not generic
 - Daily plan must include specific times in "H:MM AM/PM — action" format
 """
 
+_INSIGHTS_USER_PROMPT = """\
+Creator profile:
+- Username: {username}
+- Platform: {platform}
+- Followers: {followers:,}
+- Engagement Rate: {engagement_rate}%
+- Niche: {niche}
+- Goals: {goals}
+- Target Followers: {target_followers}
+- Timeline: {timeline_months} months
+"""
+
 from app.models.schemas import AIInsightsRequest, AIInsightsResponse
 
 
-async def generate_insights(req: AIInsightsRequest) -> AIInsightsResponse:
-    logger.info(f"[generate_insights] @{req.username} on {req.platform}, {req.followers:,} followers")
+def feasibility_score(req: AIInsightsRequest) -> Optional[float]:
+    """Goal feasibility 5–100 when goal data is provided, else None."""
+    if not (req.target_followers and req.timeline_months and req.followers):
+        return None
+    needed_ratio = (req.target_followers - req.followers) / req.followers
+    monthly_rate = needed_ratio / req.timeline_months
+    # Score: 100 = easy (5% monthly), decreases as rate increases
+    raw = 100 - max(0, (monthly_rate * 100 - 5) * 3)
+    return round(max(5.0, min(100.0, raw)), 1)
 
-    prompt = _INSIGHTS_PROMPT.format(
+
+async def generate_insights(req: AIInsightsRequest, usage: Optional[dict] = None) -> AIInsightsResponse:
+    """Growth insights from OpenAI; `usage`, if given, receives the call's token usage."""
+    logger.info("[generate_insights] @%s on %s, %d followers", req.username, req.platform, req.followers)
+
+    prompt = _INSIGHTS_USER_PROMPT.format(
         username=req.username,
         platform=req.platform,
         followers=req.followers,
@@ -203,47 +216,34 @@ async def generate_insights(req: AIInsightsRequest) -> AIInsightsResponse:
         timeline_months=req.timeline_months or 6,
     )
 
-    data = await _call_openai([{"role": "user", "content": prompt}])
-
-    # Validate all required keys are present
-    required = ["profile_analysis", "mistakes", "daily_plan", "content_ideas",
-                "hook_ideas", "posting_schedule", "growth_prediction"]
-    missing = [k for k in required if k not in data]
-    if missing:
-        raise HTTPException(
-            status_code=502,
-            detail=f"OpenAI response missing required fields: {missing}",
-        )
-
-    # Calculate feasibility score if goal data provided
-    feasibility_score: Optional[float] = None
-    if req.target_followers and req.timeline_months and req.followers:
-        needed_ratio = (req.target_followers - req.followers) / req.followers
-        monthly_rate = needed_ratio / req.timeline_months
-        # Score: 100 = easy (5% monthly), decreases as rate increases
-        raw = 100 - max(0, (monthly_rate * 100 - 5) * 3)
-        feasibility_score = round(max(5.0, min(100.0, raw)), 1)
-
-    return AIInsightsResponse(**data, feasibility_score=feasibility_score)
+    messages = [
+        {"role": "system", "content": _INSIGHTS_SYSTEM_PROMPT},
+        {"role": "user",   "content": prompt},
+    ]
+    usage = {} if usage is None else usage
+    data = await _call_openai(messages, usage=usage)
+
+    # Missing or invalid fields are regenerated on their own instead of failing the call
+    score = feasibility_score(req)
+    return await validate_or_repair(
+        AIInsightsResponse, data, messages, _call_openai, usage,
+        prepare=lambda d: {**d, "feasibility_score": score},
+    )
 
 
 # ─────────────────────────────────────────────────────────────
 # ASTROLOGY ANALYSIS
 # ─────────────────────────────────────────────────────────────
 
-_ASTROLOGY_PROMPT = """\
+_ASTROLOGY_SYSTEM_PROMPT = """\
 You are an expert Vedic astrology consultant specializing in content creator success patterns.
-
-Input:
-- Date of Birth: {dob}
-- Time of Birth: {time_of_birth}
-- Sun Sign: {zodiac}
+The user message contains the creator's birth details and sun sign.
 
 Respond ONLY with a single valid JSON object (no markdown, no extra text):
-{{
-  "sun_sign": "{zodiac}",
-  "personality_insights": "<3-4 sentences about this creator's personality, communication style, and audience magnetism based on their {zodiac} traits>",
-  "growth_patterns": "<2-3 sentences about how {zodiac} creators typically grow — burst pattern, steady, viral-prone, etc.>",
+{
+  "sun_sign": "<the sun sign from the input>",
+  "personality_insights": "<3-4 sentences about this creator's personality, communication style, and audience magnetism based on their sun sign traits>",
+  "growth_patterns": "<2-3 sentences about how creators of this sign typically grow — burst pattern, steady, viral-prone, etc.>",
   "lucky_posting_times": [
     "<time window 1, e.g. '8:00–10:00 AM (Jupiter hour)'>",
     "<time window 2>",
@@ -265,39 +265,68 @@ Respond ONLY with a single valid JSON object (no markdown, no extra text):
     "<content type 2>",
     "<content type 3>"
   ],
-  "monthly_forecast": "<2-3 sentence forecast for this creator's next 30 days based on current planetary positions and {zodiac} energy>"
-}}
+  "monthly_forecast": "<2-3 sentence forecast for this creator's next 30 days based on current planetary positions and their sign's energy>"
+}
 
-Make responses specific to {zodiac} — do not give generic advice that applies to all signs.
+Make responses specific to the given sun sign — do not give generic advice that applies to all signs.
 """
 
-from app.models.schemas import AstrologyRequest, AstrologyResponse
+_ASTROLOGY_USER_PROMPT = """\
+Input:
+- Date of Birth: {dob}
+- Time of Birth: {time_of_birth}
+- Sun Sign: {zodiac}
+"""
+
+_ASTROLOGY_BASE_PROMPT = """\
+Input:
+- Sun Sign: {zodiac}
+- Month: {month} (the monthly_forecast covers this calendar month)
+- Date and time of birth: not given — write the reading for the sign as a whole;
+  it is personalised per creator afterwards
+"""
+
+from app.models.schemas import AstrologyRequest, AstrologyResponse, Zodiac
 
 
 async def generate_astrology(req: AstrologyRequest) -> AstrologyResponse:
-    logger.info(f"[generate_astrology] zodiac={req.zodiac.value} dob={req.dob}")
+    logger.info("[generate_astrology] zodiac=%s dob=%s", req.zodiac.value, req.dob)
 
-    prompt = _ASTROLOGY_PROMPT.format(
+    prompt = _ASTROLOGY_USER_PROMPT.format(
         dob=req.dob,
         time_of_birth=req.time_of_birth or "12:00",
         zodiac=req.zodiac.value,
     )
 
-    data = await _call_openai([{"role": "user", "content": prompt}])
-
-    required = ["sun_sign", "personality_insights", "growth_patterns",
-                "lucky_posting_times", "strengths", "weaknesses",
-                "best_content_types", "monthly_forecast"]
-    missing = [k for k in required if k not in data]
-    if missing:
-        raise HTTPException(
-            status_code=502,
-            detail=f"OpenAI astrology response missing fields: {missing}",
-        )
+    messages = [
+        {"role": "system", "content": _ASTROLOGY_SYSTEM_PROMPT},
+        {"role": "user",   "content": prompt},
+    ]
+    usage: dict = {}
+    data = await _call_openai(messages, usage=usage)
 
     # Ensure sun_sign matches what was requested
-    data["sun_sign"] = req.zodiac.value
-    return AstrologyResponse(**data)
+    return await validate_or_repair(
+        AstrologyResponse, data, messages, _call_openai, usage,
+        prepare=lambda d: {**d, "sun_sign": req.zodiac.value},
+    )
+
+
+async def generate_astrology_base(zodiac: Zodiac, month: str) -> AstrologyResponse:
+    """Sign-wide reading for one month ("YYYY-MM"), the unit of the astrology corpus."""
+    logger.info("[generate_astrology_base] zodiac=%s month=%s", zodiac.value, month)
+
+    messages = [
+        {"role": "system", "content": _ASTROLOGY_SYSTEM_PROMPT},
+        {"role": "user",   "content": _ASTROLOGY_BASE_PROMPT.format(zodiac=zodiac.value, month=month)},
+    ]
+    usage: dict = {}
+    data = await _call_openai(messages, usage=usage)
+
+    return await validate_or_repair(
+        AstrologyResponse, data, messages, _call_openai, usage,
+        prepare=lambda d: {**d, "sun_sign": zodiac.value},
+    )
 
 
 # ─────────────────────────────────────────────────────────────
@@ -332,7 +361,7 @@ from app.models.schemas import PalmAnalysisResponse
 
 
 async def analyze_palm_image(image_bytes: bytes) -> PalmAnalysisResponse:
-    logger.info(f"[analyze_palm_image] image size={len(image_bytes)} bytes")
+    logger.info("[analyze_palm_image] image size=%s bytes", len(image_bytes))
 
     # Detect mime type from magic bytes
     if image_bytes[:2] == b'\xff\xd8':
@@ -345,9 +374,11 @@ async def analyze_palm_image(image_bytes: bytes) -> PalmAnalysisResponse:
         mime = "image/jpeg"  # default
 
     b64_image = base64.b64encode(image_bytes).decode("utf-8")
-    logger.info(f"[analyze_palm_image] mime={mime}, b64_len={len(b64_image)}")
+    logger.info("[analyze_palm_image] mime=%s, b64_len=%s", mime, len(b64_image))
 
+    # Static instructions first so the prefix is shared across calls; the image last
     messages = [
+        {"role": "system", "content": _PALM_SYSTEM_PROMPT},
         {
             "role": "user",
             "content": [
@@ -358,17 +389,13 @@ async def analyze_palm_image(image_bytes: bytes) -> PalmAnalysisResponse:
                         "detail": "high",
                     },
                 },
-                {
-                    "type": "text",
-                    "text": _PALM_SYSTEM_PROMPT,
-                },
             ],
-        }
+        },
     ]
 
     # Vision requires a vision-capable model
     vision_model = OPENAI_MODEL if "vision" in OPENAI_MODEL or "gpt-4o" in OPENAI_MODEL else "gpt-4o-mini"
-    logger.info(f"[analyze_palm_image] using vision model: {vision_model}")
+    logger.info("[analyze_palm_image] using vision model: %s", vision_model)
 
     api_key = _require_key()
     payload = {
@@ -379,12 +406,8 @@ async def analyze_palm_image(image_bytes: bytes) -> PalmAnalysisResponse:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            resp = await client.post(
-                OPENAI_URL,
-                headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-                json=payload,
-            )
+        with span("openai_wait", model=vision_model):
+            resp = await post_chat_completion(api_key, payload, timeout=90.0)
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Palm analysis timed out. Try again.")
     except httpx.RequestError as exc:
@@ -398,9 +421,10 @@ async def analyze_palm_image(image_bytes: bytes) -> PalmAnalysisResponse:
         raise HTTPException(status_code=502, detail=f"OpenAI returned {resp.status_code}: {resp.text[:200]}")
 
     try:
-        raw = resp.json()["choices"][0]["message"]["content"]
-        cleaned = raw.strip().lstrip("```json").lstrip("```").rstrip("```").strip()
-        data = json.loads(cleaned)
+        body = resp.json()
+        record_usage(vision_model, body)
+        raw = body["choices"][0]["message"]["content"]
+        data = parse_json(raw)
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"Failed to parse palm analysis response: {exc}")
 
@@ -413,4 +437,85 @@ async def analyze_palm_image(image_bytes: bytes) -> PalmAnalysisResponse:
     if data.get("risk_profile") not in ("conservative", "moderate", "aggressive"):
         data["risk_profile"] = "moderate"
 
-    return PalmAnalysisResponse(**data)
+    return validate(PalmAnalysisResponse, data)
+
+
+# ─────────────────────────────────────────────────────────────
+# 30-DAY PLAN (one week per call)
+# ─────────────────────────────────────────────────────────────
+
+# Day ranges of the four plan weeks — week 4 runs to day 30
+PLAN_WEEK_DAYS = {1: (1, 7), 2: (8, 14), 3: (15, 21), 4: (22, 30)}
+
+_PLAN_SYSTEM_PROMPT = """\
+You are a brutally honest digital growth strategist and Vedic astrologer writing a creator's
+30-day growth plan one week at a time. The user message contains the creator's profile, the
+week to plan, and the weeks already planned.
+
+The four weeks build on each other:
+- Week 1 (Days 1–7):   foundations — audit, positioning, profile fixes, first consistent posts
+- Week 2 (Days 8–14):  content engine — pillars, formats, hooks, batching
+- Week 3 (Days 15–21): reach — collaborations, trends, community, distribution
+- Week 4 (Days 22–30): optimise — review the numbers, double down on what worked, monetisation
+
+Respond ONLY with a single valid JSON object (no markdown, no extra keys):
+{
+  "week":  <week number>,
+  "theme": "<one-line focus of this week, personalised to the creator>",
+  "days": [
+    {"day": "Day N", "task": "<specific, actionable task for the creator on their platform — personalised to their goal, stats and zodiac sign>"}
+  ]
+}
+
+Rules:
+- "days" has exactly one entry per day of the requested week, in order
+- Every task is specific to the creator's platform, stats and goal — no generic advice
+- Do not repeat tasks from the weeks already planned; build on them
+"""
+
+from app.models.schemas import PlanRequest, PlanWeek
+from app.services.creator_analysis_service import creator_stats, format_stats
+
+
+def _plan_user_prompt(req: PlanRequest, week: int, previous: List[PlanWeek]) -> str:
+    first, last = PLAN_WEEK_DAYS[week]
+    stats = creator_stats(req.platform, req.followers, req.posts, req.subscribers, req.videos, req.views)
+    lines = [
+        "Creator profile:",
+        f"- Name: {req.name}",
+        format_stats(req.platform, stats),
+        f"- Goal: {req.goal}",
+        f"- Zodiac Sign: {req.zodiac}",
+        f"- Date of Birth: {req.dob}",
+        "",
+    ]
+    if previous:
+        lines.append("Weeks already planned:")
+        for prev in previous:
+            lines.append(f"Week {prev.week} — {prev.theme}")
+            lines.extend(f"  {d.day}: {d.task}" for d in prev.days)
+        lines.append("")
+    lines.append(f"Plan week {week}: Day {first} to Day {last} ({last - first + 1} tasks).")
+    return "\n".join(lines)
+
+
+async def generate_plan_week(req: PlanRequest, week: int, previous: List[PlanWeek]) -> PlanWeek:
+    """One week of the 30-day plan; `previous` are the earlier weeks already generated."""
+    logger.info("[generate_plan_week] %r week=%d (after %d weeks)", req.name, week, len(previous))
+
+    messages = [
+        {"role": "system", "content": _PLAN_SYSTEM_PROMPT},
+        {"role": "user",   "content": _plan_user_prompt(req, week, previous)},
+    ]
+    usage: dict = {}
+    data = await _call_openai(messages, max_tokens=1200, usage=usage)
+
+    first, last = PLAN_WEEK_DAYS[week]
+
+    def prepare(d: dict) -> dict:
+        days = d.get("days")
+        if isinstance(days, list):
+            d = {**d, "days": days[:last - first + 1]}
+        return {**d, "week": week}
+
+    return await validate_or_repair(PlanWeek, data, messages, _call_openai, usage, prepare=prepare)
@@ -0,0 +1,364 @@
+"""
+app/services/astrology_corpus.py
+
+Pre-generated astrology readings: one base reading per sign per month.
+
+An astrology reading depends mostly on the sun sign (12 values) and the
+month being forecast, yet every /astrology-analysis used to be a full OpenAI
+round trip. The corpus holds a sign-wide reading for each (sign, month) in a
+small SQLite asset (ASTROLOGY_CORPUS_PATH, JSON payloads zlib-compressed):
+
+  build     scripts/build_astrology_corpus.py generates it offline; the
+            scheduled refresh job keeps the current and next
+            ASTROLOGY_CORPUS_MONTHS_AHEAD months present and regenerates
+            entries older than ASTROLOGY_CORPUS_MAX_AGE
+  load      the rows for those months are read into memory at startup
+  serve     a request is answered from its sign's reading for the current
+            month, personalised locally from dob and time of birth:
+              - decan of the sign and its sub-ruler (personality_insights)
+              - planetary hour of birth as a lucky posting window
+              - a solar-return note when the birthday falls this month
+            A sign/month missing from the corpus falls back to the live
+            OpenAI call, and that entry is generated in the background.
+
+By default the service never generates readings itself: it loads the asset
+at startup and again every refresh interval (picking up a rebuilt file and
+new months), and serves misses live. Generation is opt-in so that starting
+an instance does not start spending on OpenAI.
+
+  ASTROLOGY_CORPUS_ENABLED=1            serve from the corpus (0: always live)
+  ASTROLOGY_CORPUS_GENERATE=0           1: the refresh job builds missing or
+                                        stale entries and misses are filled in
+                                        the background (needs OPENAI_API_KEY)
+  ASTROLOGY_CORPUS_PATH                 SQLite asset location
+  ASTROLOGY_CORPUS_MONTHS_AHEAD=1       months kept besides the current one
+  ASTROLOGY_CORPUS_REFRESH_INTERVAL     seconds between reloads/refreshes (6h)
+  ASTROLOGY_CORPUS_MAX_AGE              regenerate entries older than this (14d)
+  ASTROLOGY_CORPUS_CONCURRENCY=3        parallel OpenAI calls while building
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.models.schemas import AstrologyRequest, AstrologyResponse, Zodiac
+from app.services.ai_service import OPENAI_API_KEY, generate_astrology, generate_astrology_base
+from app.services.metrics import registry
+from app.services.request_context import current_route, request_deadline
+from app.services.serialization import validate
+
+logger = logging.getLogger("creator_growth_ai")
+
+ASTROLOGY_CORPUS_ENABLED:          bool  = os.getenv("ASTROLOGY_CORPUS_ENABLED", "1").lower() in ("1", "true", "yes")
+ASTROLOGY_CORPUS_GENERATE:         bool  = os.getenv("ASTROLOGY_CORPUS_GENERATE", "0").lower() in ("1", "true", "yes")
+ASTROLOGY_CORPUS_PATH:             str   = os.getenv("ASTROLOGY_CORPUS_PATH", "astrology_corpus.sqlite3")
+ASTROLOGY_CORPUS_MONTHS_AHEAD:     int   = int(os.getenv("ASTROLOGY_CORPUS_MONTHS_AHEAD", "1"))
+ASTROLOGY_CORPUS_REFRESH_INTERVAL: float = float(os.getenv("ASTROLOGY_CORPUS_REFRESH_INTERVAL", str(6 * 3600)))
+ASTROLOGY_CORPUS_MAX_AGE:          float = float(os.getenv("ASTROLOGY_CORPUS_MAX_AGE", str(14 * 24 * 3600)))
+ASTROLOGY_CORPUS_CONCURRENCY:      int   = int(os.getenv("ASTROLOGY_CORPUS_CONCURRENCY", "3"))
+
+CORPUS_ROUTE = "refresh:astrology-corpus"
+
+astrology_corpus_requests_total = registry.counter(
+    "astrology_corpus_requests_total", "Astrology readings by corpus outcome", ("outcome",))
+astrology_corpus_entries = registry.gauge(
+    "astrology_corpus_entries", "Sign/month readings loaded from the astrology corpus")
+
+Key = Tuple[str, str]   # (sign, "YYYY-MM")
+
+
+# ─────────────────────────────────────────────
+# Months and storage
+# ─────────────────────────────────────────────
+def month_key(offset: int = 0, today: Optional[date] = None) -> str:
+    today = today or datetime.now(timezone.utc).date()
+    index = today.year * 12 + today.month - 1 + offset
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def corpus_months() -> List[str]:
+    return [month_key(i) for i in range(ASTROLOGY_CORPUS_MONTHS_AHEAD + 1)]
+
+
+_db_lock = threading.Lock()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS readings ("
+        " sign TEXT NOT NULL, month TEXT NOT NULL, payload BLOB NOT NULL,"
+        " generated_at REAL NOT NULL, PRIMARY KEY (sign, month))"
+    )
+    return conn
+
+
+def load_entries(path: str, months: Iterable[str]) -> Dict[Key, Tuple[dict, float]]:
+    """Readings for the given months → {(sign, month): (reading, generated_at)}."""
+    months = list(months)
+    if not months or not os.path.exists(path):
+        return {}
+    with _db_lock:
+        conn = _connect(path)
+        try:
+            rows = conn.execute(
+                f"SELECT sign, month, payload, generated_at FROM readings"
+                f" WHERE month IN ({','.join('?' * len(months))})", months,
+            ).fetchall()
+        finally:
+            conn.close()
+    return {(sign, month): (json.loads(zlib.decompress(blob)), at) for sign, month, blob, at in rows}
+
+
+def save_entry(path: str, sign: str, month: str, reading: dict) -> float:
+    blob = zlib.compress(json.dumps(reading, separators=(",", ":")).encode("utf-8"), 9)
+    generated_at = time.time()
+    with _db_lock:
+        conn = _connect(path)
+        try:
+            conn.execute("INSERT OR REPLACE INTO readings VALUES (?, ?, ?, ?)", (sign, month, blob, generated_at))
+            conn.commit()
+        finally:
+            conn.close()
+    return generated_at
+
+
+async def build(
+    path:        str,
+    months:      Iterable[str],
+    signs:       Iterable[Zodiac] = tuple(Zodiac),
+    max_age:     Optional[float] = None,
+    concurrency: int = ASTROLOGY_CORPUS_CONCURRENCY,
+) -> Dict[Key, Tuple[dict, float]]:
+    """Generate missing (and, with max_age, stale) readings; returns the ones written."""
+    months   = list(months)
+    existing = await asyncio.to_thread(load_entries, path, months)
+    now      = time.time()
+    todo = [
+        (zodiac, month) for month in months for zodiac in signs
+        if (zodiac.value, month) not in existing
+        or (max_age is not None and now - existing[(zodiac.value, month)][1] > max_age)
+    ]
+    written: Dict[Key, Tuple[dict, float]] = {}
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(zodiac: Zodiac, month: str) -> None:
+        async with limit:
+            try:
+                reading = (await generate_astrology_base(zodiac, month)).model_dump()
+            except Exception as exc:
+                logger.warning("[astrology_corpus] %s %s failed: %s", zodiac.value, month, exc)
+                return
+            at = await asyncio.to_thread(save_entry, path, zodiac.value, month, reading)
+            written[(zodiac.value, month)] = (reading, at)
+
+    await asyncio.gather(*(one(z, m) for z, m in todo))
+    if todo:
+        logger.info("[astrology_corpus] generated %d/%d readings for %s", len(written), len(todo), months)
+    return written
+
+
+# ─────────────────────────────────────────────
+# Local personalisation
+# ─────────────────────────────────────────────
+_SIGNS = [z.value for z in Zodiac]   # Aries … Pisces, zodiac order
+
+# Tropical start date (month, day) of each sign
+_SIGN_START = {
+    "Aries": (3, 21), "Taurus": (4, 20), "Gemini": (5, 21), "Cancer": (6, 21),
+    "Leo": (7, 23), "Virgo": (8, 23), "Libra": (9, 23), "Scorpio": (10, 23),
+    "Sagittarius": (11, 22), "Capricorn": (12, 22), "Aquarius": (1, 20), "Pisces": (2, 19),
+}
+_RULER = {
+    "Aries": "Mars", "Taurus": "Venus", "Gemini": "Mercury", "Cancer": "Moon",
+    "Leo": "Sun", "Virgo": "Mercury", "Libra": "Venus", "Scorpio": "Mars",
+    "Sagittarius": "Jupiter", "Capricorn": "Saturn", "Aquarius": "Saturn", "Pisces": "Jupiter",
+}
+_PLANET_GIFT = {
+    "Sun":     "visibility and confident self-expression",
+    "Moon":    "emotional, relatable storytelling",
+    "Mars":    "bold, high-energy content",
+    "Mercury": "quick wit and sharp communication",
+    "Jupiter": "teaching and big-picture ideas",
+    "Venus":   "aesthetics, charm and collaborations",
+    "Saturn":  "discipline and long-game consistency",
+}
+_CHALDEAN    = ["Saturn", "Jupiter", "Mars", "Sun", "Venus", "Mercury", "Moon"]
+_DAY_RULER   = ["Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun"]   # Monday … Sunday
+_DECAN_NAMES = ("first", "second", "third")
+
+
+def _decan(sign: str, dob: date) -> Optional[int]:
+    """0–2, or None when the birth date is outside the sign (e.g. a sidereal sign)."""
+    start_month, start_day = _SIGN_START[sign]
+    start = date(dob.year if (dob.month, dob.day) >= (start_month, start_day) else dob.year - 1,
+                 start_month, start_day)
+    days = (dob - start).days
+    return min(days // 10, 2) if 0 <= days < 32 else None
+
+
+def _decan_sentence(sign: str, dob: date) -> Optional[str]:
+    decan = _decan(sign, dob)
+    if decan is None:
+        return None
+    # Triplicity decans: the 2nd and 3rd are sub-ruled by the next signs of the same element
+    sub_sign = _SIGNS[(_SIGNS.index(sign) + 4 * decan) % 12]
+    planet = _RULER[sub_sign]
+    return (f"Born in the {_DECAN_NAMES[decan]} decan of {sign}, sub-ruled by {planet}, "
+            f"your content gains an extra edge through {_PLANET_GIFT[planet]}.")
+
+
+def _clock(hour: int) -> str:
+    hour %= 24
+    return f"{(hour % 12) or 12}:00 {'AM' if hour < 12 else 'PM'}"
+
+
+def _birth_hour_window(dob: date, time_of_birth: str) -> Optional[str]:
+    try:
+        hour = int(time_of_birth.split(":", 1)[0])
+    except ValueError:
+        return None
+    if not 0 <= hour < 24:
+        return None
+    # Equal planetary hours counted from a nominal 6:00 sunrise
+    day_ruler = _DAY_RULER[dob.weekday()]
+    planet = _CHALDEAN[(_CHALDEAN.index(day_ruler) + (hour - 6) % 24) % 7]
+    return f"{_clock(hour)}–{_clock(hour + 1)} ({planet} hour — the planetary hour you were born in)"
+
+
+def personalise(base: dict, req: AstrologyRequest, today: Optional[date] = None) -> AstrologyResponse:
+    """A sign-wide reading made specific to one creator's date and time of birth."""
+    data = {**base, "sun_sign": req.zodiac.value}
+    try:
+        dob = date.fromisoformat(req.dob)
+    except ValueError:
+        return validate(AstrologyResponse, data)
+
+    sentence = _decan_sentence(req.zodiac.value, dob)
+    if sentence:
+        data["personality_insights"] = f"{data['personality_insights'].rstrip()} {sentence}"
+
+    window = _birth_hour_window(dob, req.time_of_birth or "12:00")
+    if window:
+        data["lucky_posting_times"] = [window, *data["lucky_posting_times"][:2]]
+
+    today = today or datetime.now(timezone.utc).date()
+    if dob.month == today.month:
+        data["monthly_forecast"] = (
+            f"{data['monthly_forecast'].rstrip()} With your birthday on {dob.strftime('%B')} {dob.day}, "
+            f"this is your solar-return month — a natural moment to relaunch or announce something new."
+        )
+    return validate(AstrologyResponse, data)
+
+
+# ─────────────────────────────────────────────
+# Service
+# ─────────────────────────────────────────────
+class AstrologyCorpus:
+    def __init__(self, path: str = ASTROLOGY_CORPUS_PATH):
+        self.path = path
+        self._readings:  Dict[Key, dict]  = {}
+        self._generated: Dict[Key, float] = {}
+        self._filling:   Set[Key] = set()
+        self._tasks:     Set[asyncio.Task] = set()
+        self._refresher: Optional[asyncio.Task] = None
+        self.hits = self.misses = 0
+        self.last_refresh: Optional[float] = None
+
+    def _merge(self, entries: Dict[Key, Tuple[dict, float]]) -> None:
+        for key, (reading, generated_at) in entries.items():
+            self._readings[key]  = reading
+            self._generated[key] = generated_at
+        months = set(corpus_months())
+        for key in [k for k in self._readings if k[1] not in months]:
+            del self._readings[key]
+            self._generated.pop(key, None)
+        astrology_corpus_entries.set(value=len(self._readings))
+
+    async def load(self) -> None:
+        self._merge(await asyncio.to_thread(load_entries, self.path, corpus_months()))
+        logger.info("[astrology_corpus] loaded %d readings from %s", len(self._readings), self.path)
+
+    async def refresh(self) -> None:
+        self._merge(await build(self.path, corpus_months(), max_age=ASTROLOGY_CORPUS_MAX_AGE))
+        self.last_refresh = time.time()
+
+    async def _refresh_forever(self) -> None:
+        current_route.set(CORPUS_ROUTE)
+        while True:
+            try:
+                await self.load()
+                if ASTROLOGY_CORPUS_GENERATE and OPENAI_API_KEY:
+                    await self.refresh()
+            except Exception as exc:
+                logger.error("[astrology_corpus] refresh failed: %s", exc)
+            await asyncio.sleep(ASTROLOGY_CORPUS_REFRESH_INTERVAL)
+
+    def _fill(self, zodiac: Zodiac, month: str) -> None:
+        """Generate one missing reading in the background (one at a time per sign/month)."""
+        key = (zodiac.value, month)
+        if not (ASTROLOGY_CORPUS_GENERATE and OPENAI_API_KEY) or key in self._filling:
+            return
+        self._filling.add(key)
+
+        async def fill() -> None:
+            request_deadline.set(None)
+            current_route.set(CORPUS_ROUTE)
+            try:
+                self._merge(await build(self.path, [month], signs=(zodiac,)))
+            finally:
+                self._filling.discard(key)
+
+        task = asyncio.create_task(fill())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def astrology(self, req: AstrologyRequest) -> AstrologyResponse:
+        """The request's reading from the corpus, or a live generate_astrology() when it has none."""
+        if ASTROLOGY_CORPUS_ENABLED:
+            month = month_key()
+            base = self._readings.get((req.zodiac.value, month))
+            if base is not None:
+                self.hits += 1
+                astrology_corpus_requests_total.inc("hit")
+                return personalise(base, req)
+            self.misses += 1
+            astrology_corpus_requests_total.inc("miss")
+            self._fill(req.zodiac, month)
+        return await generate_astrology(req)
+
+    def start(self) -> None:
+        if ASTROLOGY_CORPUS_ENABLED and self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled":      ASTROLOGY_CORPUS_ENABLED,
+            "generate":     ASTROLOGY_CORPUS_GENERATE,
+            "path":         self.path,
+            "months":       corpus_months(),
+            "entries":      len(self._readings),
+            "hits":         self.hits,
+            "misses":       self.misses,
+            "hit_rate":     round(self.hits / total, 4) if total else None,
+            "last_refresh": self.last_refresh,
+        }
+
+
+astrology_corpus = AstrologyCorpus()
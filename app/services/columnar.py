@@ -0,0 +1,33 @@
+"""
+app/services/columnar.py
+
+Row / column shapes for time-series responses.
+
+Series (profile growth_data, goal projection and projection_bands) are built
+as parallel columns and converted once at the edge:
+  rows      [{"week": "Jan 01", "followers": 1200, ...}, ...]   (default)
+  columnar  {"week": [...], "followers": [...], ...}           (?format=columnar)
+Columnar skips the per-row dicts and repeated key strings, so it is smaller on
+the wire and cheaper to encode and to feed to chart libraries.
+scripts/bench_columnar.py compares the two.
+"""
+from typing import Any, Dict, List, Sequence, Union
+
+ROWS     = "rows"
+COLUMNAR = "columnar"
+FORMAT_PATTERN = f"^({ROWS}|{COLUMNAR})$"
+
+Columns = Dict[str, Sequence[Any]]
+Series  = Union[List[Dict[str, Any]], Dict[str, List[Any]]]
+
+
+def to_rows(columns: Columns) -> List[Dict[str, Any]]:
+    keys = tuple(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+def shape(columns: Columns, fmt: str = ROWS) -> Series:
+    """Columns (plain lists) in the requested response format."""
+    if fmt == COLUMNAR:
+        return dict(columns)
+    return to_rows(columns)
@@ -0,0 +1,247 @@
+"""
+app/services/compression.py
+
+Response compression negotiated on Accept-Encoding (Brotli, then gzip).
+
+CompressionMiddleware compresses text responses (JSON, HTML, plain text)
+of at least COMPRESSION_MIN_BYTES. Bodies of COMPRESSION_OFFLOOP_BYTES or
+more are compressed in a worker thread so a large report never stalls the
+event loop. Responses that already carry Content-Encoding pass through
+untouched, as do streaming types (NDJSON, server-sent events) and binaries
+that are compressed already (PDF, images, MessagePack).
+
+VariantCache keeps rendered bodies of cacheable responses (astrology,
+reports) together with their compressed variants: each encoding is
+produced once, at a higher level than on-the-fly compression, and every later
+hit is served as stored bytes.
+"""
+import asyncio
+import gzip
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.services.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - gzip only
+    brotli = None
+
+logger = logging.getLogger("creator_growth_ai")
+
+COMPRESSION_ENABLED:     bool = os.getenv("COMPRESSION_ENABLED", "1").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_BYTES:   int  = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_OFFLOOP_BYTES: int = int(os.getenv("COMPRESSION_OFFLOOP_BYTES", str(64 * 1024)))
+
+ASTROLOGY_CACHE_TTL:     float = float(os.getenv("ASTROLOGY_CACHE_TTL", str(6 * 3600)))
+REPORT_CACHE_TTL:        float = float(os.getenv("REPORT_CACHE_TTL", "3600"))
+VARIANT_CACHE_MAX_BYTES: int   = int(os.getenv("VARIANT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# (gzip level, brotli quality): fast for per-request, dense for cached variants
+_DYNAMIC_LEVELS = (6, 4)
+_CACHED_LEVELS  = (9, 9)
+
+_COMPRESSIBLE = ("application/json", "text/html", "text/plain", "text/css",
+                 "application/javascript", "image/svg+xml")
+
+response_compression_bytes = registry.counter(
+    "response_compression_bytes_total", "Response bytes before and after compression", ("encoding", "stage"))
+
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best encoding the client accepts (highest q; br before gzip on ties), or None."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.split(";", 1)[0].strip().lower() in _COMPRESSIBLE
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    gzip_level, brotli_quality = _CACHED_LEVELS if cached else _DYNAMIC_LEVELS
+    if encoding == "br":
+        out = brotli.compress(body, quality=brotli_quality)
+    else:
+        out = gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    response_compression_bytes.inc(encoding, "in", amount=len(body))
+    response_compression_bytes.inc(encoding, "out", amount=len(out))
+    return out
+
+
+async def compress_async(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if len(body) >= COMPRESSION_OFFLOOP_BYTES:
+        return await asyncio.to_thread(compress, body, encoding, cached)
+    return compress(body, encoding, cached)
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if not vary:
+        headers["vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["vary"] = f"{vary}, Accept-Encoding"
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            return await self.app(scope, receive, send)
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message: Optional[dict] = None
+        chunks = []
+        passthrough = False
+
+        async def wrapped_send(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                return await send(message)
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or not compressible(headers.get("content-type")):
+                    passthrough = True
+                    return await send(message)
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                return await send(message)
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start_message["headers"])
+            _add_vary(headers)
+            if len(body) >= self.minimum_size:
+                body = await compress_async(body, encoding)
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, wrapped_send)
+
+
+@dataclass
+class CachedBody:
+    body:       bytes
+    media_type: str
+    headers:    Dict[str, str]
+    expires_at: float
+    variants:   Dict[str, bytes] = field(default_factory=dict)
+    evicted:    bool = False
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(v) for v in self.variants.values())
+
+
+class VariantCache:
+    """Bounded LRU of rendered response bodies plus their compressed variants."""
+
+    def __init__(self, name: str, ttl: float, max_bytes: int):
+        self.name      = name
+        self.ttl       = ttl
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._bytes = 0
+        self.hits = self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at < time.monotonic():
+            self._drop(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, body: bytes, media_type: str, headers: Optional[Dict[str, str]] = None) -> CachedBody:
+        if key in self._entries:
+            self._drop(key)
+        entry = CachedBody(body, media_type, dict(headers or {}), time.monotonic() + self.ttl)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._evict()
+        return entry
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        entry.evicted = True
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+
+    async def respond(self, entry: CachedBody, request: Request, headers: Optional[Dict[str, str]] = None) -> Response:
+        """Serve an entry in the client's preferred encoding, compressing each variant only once."""
+        headers = {**entry.headers, **(headers or {})}
+        body = entry.body
+        if COMPRESSION_ENABLED and compressible(entry.media_type) and len(body) >= COMPRESSION_MIN_BYTES:
+            headers["Vary"] = ", ".join(filter(None, (headers.get("Vary"), "Accept-Encoding")))
+            encoding = negotiate(request.headers.get("accept-encoding"))
+            if encoding is not None:
+                variant = entry.variants.get(encoding)
+                if variant is None:
+                    variant = await compress_async(entry.body, encoding, cached=True)
+                    if not entry.evicted and encoding not in entry.variants:
+                        entry.variants[encoding] = variant
+                        self._bytes += len(variant)
+                        self._evict()
+                body = variant
+                headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=entry.media_type, headers=headers)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries":  len(self._entries),
+            "bytes":    self._bytes,
+            "hits":     self.hits,
+            "misses":   self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+astrology_cache = VariantCache("astrology", ASTROLOGY_CACHE_TTL, VARIANT_CACHE_MAX_BYTES)
+report_cache    = VariantCache("report", REPORT_CACHE_TTL, VARIANT_CACHE_MAX_BYTES)
@@ -9,23 +9,29 @@ Single service for POST /creator-analysis
 """
 
 import os
-import json
 import base64
 import logging
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 from fastapi import HTTPException, UploadFile
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
+from app.services.metrics import registry, upload_size_bytes
+from app.services.openai_transport import post_chat_completion, record_usage
+from app.services.request_context import current_route
+from app.services.repair import parse_json, validate_or_repair
+from app.services.serialization import register
+from app.services.tracing import span
+
 load_dotenv()
 
 logger = logging.getLogger("creator_growth_ai")
 
 OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "").strip()
 OPENAI_MODEL:   str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-OPENAI_URL      = "https://api.openai.com/v1/chat/completions"
 
 if not OPENAI_API_KEY:
     logger.warning("⚠️  OPENAI_API_KEY not set — all /creator-analysis calls will fail with HTTP 503.")
@@ -54,18 +60,26 @@ class PalmReading(BaseModel):
     creator_strengths:  List[str]  # strengths visible in the palm
 
 
+# Every section is optional: a request for a subset of `sections` returns null
+# for the rest. Requested sections are enforced in run_creator_analysis.
 class CreatorAnalysisResponse(BaseModel):
-    platform_assessment:  str
-    what_went_right:      List[str]
-    what_went_wrong:      List[str]
-    content_strategy:     str
-    astro_zodiac_reading: AstroZodiacReading
-    palm_reading:         PalmReading
-    best_posting_days:    List[str]
-    posting_schedule:     Dict[str, List[str]]
-    monthly_plan:         Any
-    growth_prediction:    str
-    final_blessing:       str
+    platform_assessment:  Optional[str]                  = None
+    what_went_right:      Optional[List[str]]            = None
+    what_went_wrong:      Optional[List[str]]            = None
+    content_strategy:     Optional[str]                  = None
+    astro_zodiac_reading: Optional[AstroZodiacReading]   = None
+    palm_reading:         Optional[PalmReading]          = None
+    best_posting_days:    Optional[List[str]]            = None
+    posting_schedule:     Optional[Dict[str, List[str]]] = None
+    monthly_plan:         Any                            = None
+    growth_prediction:    Optional[str]                  = None
+    final_blessing:       Optional[str]                  = None
+
+
+register(CreatorAnalysisResponse)
+
+creator_sections_total = registry.counter(
+    "creator_analysis_sections_total", "Sections requested from /creator-analysis", ("section",))
 
 
 # ─────────────────────────────────────────────
@@ -83,7 +97,7 @@ def _require_key() -> str:
     return OPENAI_API_KEY
 
 
-async def _call_openai_vision(messages: list, max_tokens: int = 4096) -> dict:
+async def _call_openai_vision(messages: list, max_tokens: int = 4096, usage: Optional[dict] = None) -> dict:
     key = _require_key()
 
     # gpt-4o-mini supports vision; fall back gracefully if model is text-only
@@ -97,15 +111,11 @@ async def _call_openai_vision(messages: list, max_tokens: int = 4096) -> dict:
         "response_format": {"type": "json_object"},
     }
 
-    logger.info(f"[OpenAI] model={model} max_tokens={max_tokens}")
+    logger.info("[OpenAI] model=%s max_tokens=%s", model, max_tokens)
 
     try:
-        async with httpx.AsyncClient(timeout=150.0) as client:
-            resp = await client.post(
-                OPENAI_URL,
-                headers={"Authorization": f"Bearer {key}", "Content-Type": "application/json"},
-                json=payload,
-            )
+        with span("openai_wait", model=model, max_tokens=max_tokens):
+            resp = await post_chat_completion(key, payload, timeout=150.0)
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="OpenAI timed out (>150s). Try again.")
     except httpx.RequestError as exc:
@@ -121,21 +131,21 @@ async def _call_openai_vision(messages: list, max_tokens: int = 4096) -> dict:
         raise HTTPException(status_code=502, detail=f"OpenAI returned {resp.status_code}: {resp.text[:300]}")
 
     try:
-        raw = resp.json()["choices"][0]["message"]["content"]
+        body = resp.json()
+        record_usage(model, body)
+        if usage is not None:
+            usage.update(body.get("usage") or {})
+        raw = body["choices"][0]["message"]["content"]
     except (KeyError, IndexError) as exc:
         raise HTTPException(status_code=502, detail=f"Unexpected OpenAI response: {exc}")
 
-    logger.info(f"[OpenAI] response chars={len(raw)}")
+    logger.info("[OpenAI] response chars=%s", len(raw))
 
-    cleaned = raw.strip()
-    if cleaned.startswith("```"):
-        lines   = cleaned.split("\n")
-        cleaned = "\n".join(lines[1:-1]) if lines[-1].strip() == "```" else "\n".join(lines[1:])
-
-    try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError as exc:
-        raise HTTPException(status_code=502, detail=f"OpenAI returned invalid JSON: {exc}. Raw: {raw[:300]}")
+    with span("json_parse", chars=len(raw)):
+        try:
+            return parse_json(raw)
+        except ValueError as exc:
+            raise HTTPException(status_code=502, detail=f"OpenAI returned invalid JSON: {exc}. Raw: {raw[:300]}")
 
 
 # ─────────────────────────────────────────────
@@ -154,72 +164,42 @@ def _detect_mime(image_bytes: bytes) -> str:
 # ─────────────────────────────────────────────
 # Prompt builder
 # ─────────────────────────────────────────────
-def _build_prompt(
-    name:        str,
-    platform:    str,
-    goal:        str,
-    zodiac:      str,
-    dob:         str,
-    stats:       dict,
-) -> str:
-
-    if platform == "instagram":
-        followers = stats.get("followers", 0)
-        posts     = stats.get("posts", 0)
-        ppw       = round(posts / 52, 1) if posts else "unknown"
-        stats_block = (
-            f"- Platform: Instagram\n"
-            f"- Followers: {int(followers):,}\n"
-            f"- Total Posts: {int(posts):,}\n"
-            f"- Estimated posts/week: {ppw}"
-        )
-    else:
-        subs   = stats.get("subscribers", 0)
-        vids   = stats.get("videos", 0)
-        views  = stats.get("views", 0)
-        stats_block = (
-            f"- Platform: YouTube\n"
-            f"- Subscribers: {int(subs):,}\n"
-            f"- Total Videos: {int(vids):,}\n"
-            f"- Monthly Views: {int(views):,}"
-        )
-
-    return f"""
-You are simultaneously:
+# Static instructions + schema go first as the system message so every call
+# shares the same prefix and OpenAI's prompt cache can reuse it; the
+# per-creator profile and the palm image come last in the user message.
+# Clients that show only part of the response pass `sections`: the schema and
+# rules then cover just those sections, so nothing else is generated.
+_SYSTEM_HEADER = """You are simultaneously:
 1. A world-class Vedic astrologer with 30 years of experience advising content creators
 2. A brutally honest digital growth strategist
 3. A certified palmist who reads hands for career and creative potential
 
-The creator {name} has shared their palm image (included in this message), their birth details, and their platform stats.
+The creator has shared their palm image, their birth details, and their platform stats in the user message.
 You must weave ALL THREE perspectives — astrology, palm reading, and growth strategy — into one deeply personalised, large, bulk response.
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-CREATOR PROFILE
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Name: {name}
-{stats_block}
-Goal: {goal}
-Zodiac Sign: {zodiac}
-Date of Birth: {dob}
-Palm Image: PROVIDED (analyse the actual visible lines and features)
-
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 RESPOND WITH ONE VALID JSON OBJECT — exact structure below.
 No markdown, no extra keys, no placeholders, no generic advice.
-Every sentence must be personalised to {name}, their zodiac, their DOB, their palm, and their stats.
+Every sentence must be personalised to the creator, their zodiac, their DOB, their palm, and their stats.
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-{{
-  "platform_assessment": "<5-7 sentences of deep honest assessment of {name}'s current standing on {platform}. Reference their exact numbers. Tell them what their follower-to-post ratio truly means, where they rank in the creator ecosystem, what the numbers reveal about their consistency, engagement potential, and monetisation readiness. Do NOT sugarcoat.>",
+"""
 
+# One schema fragment per response section, in response order
+_SECTION_SCHEMAS: Dict[str, str] = {
+    "platform_assessment": """\
+  "platform_assessment": "<5-7 sentences of deep honest assessment of the creator's current standing on their platform. Reference their exact numbers. Tell them what their follower-to-post ratio truly means, where they rank in the creator ecosystem, what the numbers reveal about their consistency, engagement potential, and monetisation readiness. Do NOT sugarcoat.>"
+""",
+    "what_went_right": """\
   "what_went_right": [
     "<Specific strength based on their actual stats — e.g. their posting volume relative to followers indicates consistent effort>",
     "<Another specific positive>",
     "<Another>",
     "<Another>",
     "<Another>"
-  ],
-
+  ]
+""",
+    "what_went_wrong": """\
   "what_went_wrong": [
     "<Specific mistake or gap deduced from their numbers — be direct and specific>",
     "<Another mistake>",
@@ -227,15 +207,17 @@ Every sentence must be personalised to {name}, their zodiac, their DOB, their pa
     "<Another>",
     "<Another>",
     "<Another>"
-  ],
-
-  "content_strategy": "<Write 4-6 full paragraphs. Cover: (1) what content pillars {name} must build on {platform} based on their goal, (2) exact format recommendations (Reels vs Carousels vs Stories for IG, or Shorts vs long-form vs Live for YT), (3) hook strategy — what the first 3 seconds of every post must do, (4) what they must STOP doing immediately, (5) how to use the algorithm at their follower level specifically, (6) collaboration and distribution tactics. Must be long, detailed, platform-specific.>",
-
-  "astro_zodiac_reading": {{
-    "personality": "<4-5 sentences about {name}'s creator personality as a {zodiac}. Describe how {zodiac} energy shapes their content style, their relationship with the audience, their creative rhythm, and their natural magnetism or weaknesses on camera. Be mystical and specific to this zodiac sign — not generic.>",
+  ]
+""",
+    "content_strategy": """\
+  "content_strategy": "<Write 4-6 full paragraphs. Cover: (1) what content pillars the creator must build on their platform based on their goal, (2) exact format recommendations (Reels vs Carousels vs Stories for IG, or Shorts vs long-form vs Live for YT), (3) hook strategy — what the first 3 seconds of every post must do, (4) what they must STOP doing immediately, (5) how to use the algorithm at their follower level specifically, (6) collaboration and distribution tactics. Must be long, detailed, platform-specific.>"
+""",
+    "astro_zodiac_reading": """\
+  "astro_zodiac_reading": {
+    "personality": "<4-5 sentences about the creator's personality as their zodiac sign. Describe how that sign's energy shapes their content style, their relationship with the audience, their creative rhythm, and their natural magnetism or weaknesses on camera. Be mystical and specific to this zodiac sign — not generic.>",
 
     "good_timings": [
-      "<Auspicious time window with astrological reason — e.g. '9:00 AM–11:00 AM — Venus hour on {zodiac}'s strong days, amplifies reach and engagement'>",
+      "<Auspicious time window with astrological reason — e.g. '9:00 AM–11:00 AM — Venus hour on the sign's strong days, amplifies reach and engagement'>",
       "<Another auspicious time window with reason>",
       "<Another>",
       "<Another>",
@@ -243,44 +225,45 @@ Every sentence must be personalised to {name}, their zodiac, their DOB, their pa
     ],
 
     "bad_timings": [
-      "<Inauspicious time window with astrological reason — e.g. 'Avoid posting 2:00 PM–4:00 PM — Saturn's shadow hour suppresses {zodiac} visibility'>",
+      "<Inauspicious time window with astrological reason — e.g. 'Avoid posting 2:00 PM–4:00 PM — Saturn's shadow hour suppresses the sign's visibility'>",
       "<Another inauspicious window with reason>",
       "<Another>",
       "<Another>"
     ],
 
     "good_days": [
-      "<Lucky day with specific astrological reason for {zodiac} creator — e.g. 'Wednesday — Mercury rules this day and governs communication, ideal for {zodiac} to launch new content'>",
+      "<Lucky day with specific astrological reason for a creator of this sign — e.g. 'Wednesday — Mercury rules this day and governs communication, ideal for this sign to launch new content'>",
       "<Another lucky day with reason>",
       "<Another>",
       "<Another>"
     ],
 
     "bad_days": [
-      "<Unlucky day for {zodiac} creator with astrological reason>",
+      "<Unlucky day for a creator of this sign with astrological reason>",
       "<Another unlucky day with reason>",
       "<Another>"
     ],
 
-    "monthly_forecast": "<3-4 sentences of monthly cosmic forecast for {name} as a {zodiac}. Reference current planetary positions (as of the birth month and zodiac cycle), what energy this month brings for their creative growth, whether Mercury retrograde or any other planetary event affects them, and what they should focus on or avoid this month specifically. Make it feel like a real astrologer is speaking to them personally.>",
+    "monthly_forecast": "<3-4 sentences of monthly cosmic forecast for the creator as their zodiac sign. Reference current planetary positions (as of the birth month and zodiac cycle), what energy this month brings for their creative growth, whether Mercury retrograde or any other planetary event affects them, and what they should focus on or avoid this month specifically. Make it feel like a real astrologer is speaking to them personally.>",
 
     "remedies": [
-      "<Specific Vedic remedy or ritual for {zodiac} to enhance creative success — e.g. 'Light a ghee lamp on Friday evenings facing northeast to invoke Venus and amplify your magnetic pull on {platform}'>",
+      "<Specific Vedic remedy or ritual for their sign to enhance creative success — e.g. 'Light a ghee lamp on Friday evenings facing northeast to invoke Venus and amplify your magnetic pull on your platform'>",
       "<Another remedy — crystal, mantra, colour, or ritual>",
       "<Another>",
       "<Another>"
     ]
-  }},
-
-  "palm_reading": {{
-    "overall_reading": "<5-6 sentences written as a real palmist speaking directly to {name}. Describe what you actually see in the palm image — the length and curve of the life line, the heart line's emotional depth, the head line's intellectual orientation, the fate line's clarity, and any distinctive mounts or markings. Translate each feature into what it means for {name} as a content creator. Be specific and personal — not generic palm reading text.>",
+  }
+""",
+    "palm_reading": """\
+  "palm_reading": {
+    "overall_reading": "<5-6 sentences written as a real palmist speaking directly to the creator. Describe what you actually see in the palm image — the length and curve of the life line, the heart line's emotional depth, the head line's intellectual orientation, the fate line's clarity, and any distinctive mounts or markings. Translate each feature into what it means for them as a content creator. Be specific and personal — not generic palm reading text.>",
 
     "creativity_score": <integer 1-100 based on actual palm features observed>,
     "leadership_score": <integer 1-100 based on actual palm features observed>,
     "resilience_score": <integer 1-100 based on actual palm features observed>,
 
     "difficulties": [
-      "<Specific difficulty {name} will face, grounded in a palm line observation — e.g. 'Your head line shows a fork mid-way, indicating a period of creative confusion and self-doubt between months 4–8 of your journey'>",
+      "<Specific difficulty the creator will face, grounded in a palm line observation — e.g. 'Your head line shows a fork mid-way, indicating a period of creative confusion and self-doubt between months 4–8 of your journey'>",
       "<Another palm-based difficulty with timing if visible>",
       "<Another>",
       "<Another>",
@@ -301,91 +284,222 @@ Every sentence must be personalised to {name}, their zodiac, their DOB, their pa
       "<Another>",
       "<Another>"
     ]
-  }},
-
+  }
+""",
+    "best_posting_days": """\
   "best_posting_days": [
-    "<Day + specific astrological AND data-based reason why it is ideal for {name} to post on {platform}>",
+    "<Day + specific astrological AND data-based reason why it is ideal for the creator to post on their platform>",
     "<Another day with combined reason>",
     "<Another>",
     "<Another>"
-  ],
-
-  "posting_schedule": {{
-    "Monday":    ["<time if auspicious for {zodiac}, else []>"],
+  ]
+""",
+    "posting_schedule": """\
+  "posting_schedule": {
+    "Monday":    ["<time if auspicious for their sign, else []>"],
     "Tuesday":   [],
     "Wednesday": ["<time>", "<time>"],
     "Thursday":  [],
     "Friday":    ["<time>", "<time>"],
     "Saturday":  ["<time>"],
     "Sunday":    []
-  }},
-
+  }
+""",
+    "monthly_plan": """\
   "monthly_plan": [
     [
-      {{"day": "Day 1",  "task": "<specific, actionable task for {name} on {platform} — personalised to their goal and stats>"}},
-      {{"day": "Day 2",  "task": "<specific task>"}},
-      {{"day": "Day 3",  "task": "<specific task>"}},
-      {{"day": "Day 4",  "task": "<specific task>"}},
-      {{"day": "Day 5",  "task": "<specific task>"}},
-      {{"day": "Day 6",  "task": "<specific task>"}},
-      {{"day": "Day 7",  "task": "<specific task>"}}
+      {"day": "Day 1",  "task": "<specific, actionable task for the creator on their platform — personalised to their goal and stats>"},
+      {"day": "Day 2",  "task": "<specific task>"},
+      {"day": "Day 3",  "task": "<specific task>"},
+      {"day": "Day 4",  "task": "<specific task>"},
+      {"day": "Day 5",  "task": "<specific task>"},
+      {"day": "Day 6",  "task": "<specific task>"},
+      {"day": "Day 7",  "task": "<specific task>"}
     ],
     [
-      {{"day": "Day 8",  "task": "<specific task>"}},
-      {{"day": "Day 9",  "task": "<specific task>"}},
-      {{"day": "Day 10", "task": "<specific task>"}},
-      {{"day": "Day 11", "task": "<specific task>"}},
-      {{"day": "Day 12", "task": "<specific task>"}},
-      {{"day": "Day 13", "task": "<specific task>"}},
-      {{"day": "Day 14", "task": "<specific task>"}}
+      {"day": "Day 8",  "task": "<specific task>"},
+      {"day": "Day 9",  "task": "<specific task>"},
+      {"day": "Day 10", "task": "<specific task>"},
+      {"day": "Day 11", "task": "<specific task>"},
+      {"day": "Day 12", "task": "<specific task>"},
+      {"day": "Day 13", "task": "<specific task>"},
+      {"day": "Day 14", "task": "<specific task>"}
     ],
     [
-      {{"day": "Day 15", "task": "<specific task>"}},
-      {{"day": "Day 16", "task": "<specific task>"}},
-      {{"day": "Day 17", "task": "<specific task>"}},
-      {{"day": "Day 18", "task": "<specific task>"}},
-      {{"day": "Day 19", "task": "<specific task>"}},
-      {{"day": "Day 20", "task": "<specific task>"}},
-      {{"day": "Day 21", "task": "<specific task>"}}
+      {"day": "Day 15", "task": "<specific task>"},
+      {"day": "Day 16", "task": "<specific task>"},
+      {"day": "Day 17", "task": "<specific task>"},
+      {"day": "Day 18", "task": "<specific task>"},
+      {"day": "Day 19", "task": "<specific task>"},
+      {"day": "Day 20", "task": "<specific task>"},
+      {"day": "Day 21", "task": "<specific task>"}
     ],
     [
-      {{"day": "Day 22", "task": "<specific task>"}},
-      {{"day": "Day 23", "task": "<specific task>"}},
-      {{"day": "Day 24", "task": "<specific task>"}},
-      {{"day": "Day 25", "task": "<specific task>"}},
-      {{"day": "Day 26", "task": "<specific task>"}},
-      {{"day": "Day 27", "task": "<specific task>"}},
-      {{"day": "Day 28", "task": "<specific task>"}},
-      {{"day": "Day 29", "task": "<specific task>"}},
-      {{"day": "Day 30", "task": "<specific task>"}}
+      {"day": "Day 22", "task": "<specific task>"},
+      {"day": "Day 23", "task": "<specific task>"},
+      {"day": "Day 24", "task": "<specific task>"},
+      {"day": "Day 25", "task": "<specific task>"},
+      {"day": "Day 26", "task": "<specific task>"},
+      {"day": "Day 27", "task": "<specific task>"},
+      {"day": "Day 28", "task": "<specific task>"},
+      {"day": "Day 29", "task": "<specific task>"},
+      {"day": "Day 30", "task": "<specific task>"}
     ]
-  ],
+  ]
+""",
+    "growth_prediction": """\
+  "growth_prediction": "<4-5 sentences of honest, data-based growth prediction for the creator. Give specific projected numbers for 3 months, 6 months, and 12 months from now if they follow the plan above. Factor in their current platform metrics, the astrological timing, and their palm's resilience score. Be honest — distinguish between realistic projections and optimistic ones. Close with what will determine whether they hit the higher or lower estimate.>"
+""",
+    "final_blessing": """\
+  "final_blessing": "<3-4 sentences written as a master Vedic astrologer delivering a final personalised message to the creator. Reference their zodiac's ruling planet, what their palm lines say about their ultimate destiny as a creator, and the cosmic window opening for them this year. Make it personal, moving, grounded, and inspiring. Address them by name. This should feel like a real spiritual advisor's closing words.>"
+""",
+}
+
+_RULE_RULE = "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
+
+# (section the rule applies to — None for every response, rule text)
+_RULES: List[Tuple[Optional[str], str]] = [
+    (None,                   'Every field must be fully populated — no empty strings, no placeholder text, no "N/A"'),
+    ("monthly_plan",         "monthly_plan: exactly 4 weeks, weeks 1–3 have 7 tasks, week 4 has 9 tasks"),
+    ("posting_schedule",     "posting_schedule: all 7 days present — use [] for rest days"),
+    ("posting_schedule",     'Times in posting_schedule: "H:MM AM/PM" format only (e.g. "7:00 PM")'),
+    ("palm_reading",         "Palm reading MUST reference actual visible features from the image — not generic text"),
+    ("astro_zodiac_reading", "Astrology MUST be specific to the creator's zodiac sign — do not write generic content that fits any sign"),
+    (None,                   "All advice must be personalised to the creator, their exact platform stats, and their specific goal"),
+    ("content_strategy",     "content_strategy must be at minimum 4 full paragraphs"),
+    ("final_blessing",       "final_blessing must address the creator by name"),
+]
+
+SECTIONS: Tuple[str, ...] = tuple(_SECTION_SCHEMAS)
+
+
+def parse_sections(raw: Optional[str]) -> Tuple[str, ...]:
+    """Comma-separated section names → tuple in response order; None/empty means all."""
+    if not raw or not raw.strip():
+        return SECTIONS
+    requested = {s.strip() for s in raw.split(",") if s.strip()}
+    unknown = requested - set(SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown sections: {sorted(unknown)}. Valid sections: {list(SECTIONS)}",
+        )
+    return tuple(s for s in SECTIONS if s in requested)
+
+
+@lru_cache(maxsize=None)
+def _system_prompt(sections: Tuple[str, ...]) -> str:
+    """Header + schema + rules for just the requested sections (the full set is the common, cached prompt)."""
+    schema = ",\n\n".join(_SECTION_SCHEMAS[s].rstrip("\n") for s in sections)
+    rules  = [text for section, text in _RULES if section is None or section in sections]
+    numbered = "\n".join(f"{i}. {text}" for i, text in enumerate(rules, 1))
+    return f"{_SYSTEM_HEADER}{{\n{schema}\n}}\n\n{_RULE_RULE}\nABSOLUTE RULES:\n{numbered}\n{_RULE_RULE}\n"
 
-  "growth_prediction": "<4-5 sentences of honest, data-based growth prediction for {name}. Give specific projected numbers for 3 months, 6 months, and 12 months from now if they follow the plan above. Factor in their current {platform} metrics, the astrological timing, and their palm's resilience score. Be honest — distinguish between realistic projections and optimistic ones. Close with what will determine whether they hit the higher or lower estimate.>",
 
-  "final_blessing": "<3-4 sentences written as a master Vedic astrologer delivering a final personalised message to {name}. Reference their zodiac's ruling planet, what their palm lines say about their ultimate destiny as a creator, and the cosmic window opening for them this year. Make it personal, moving, grounded, and inspiring. Address them by name. This should feel like a real spiritual advisor's closing words.>"
-}}
 
+def creator_stats(
+    platform:    str,
+    followers:   Optional[int] = None,
+    posts:       Optional[int] = None,
+    subscribers: Optional[int] = None,
+    videos:      Optional[int] = None,
+    views:       Optional[int] = None,
+) -> dict:
+    if platform == "instagram":
+        return {"followers": followers or 0, "posts": posts or 0}
+    return {"subscribers": subscribers or 0, "videos": videos or 0, "views": views or 0}
+
+
+def format_stats(platform: str, stats: dict) -> str:
+    """The platform stats lines of the CREATOR PROFILE block (shared with the plan prompts)."""
+    if platform == "instagram":
+        followers = stats.get("followers", 0)
+        posts     = stats.get("posts", 0)
+        ppw       = round(posts / 52, 1) if posts else "unknown"
+        return (
+            f"- Platform: Instagram\n"
+            f"- Followers: {int(followers):,}\n"
+            f"- Total Posts: {int(posts):,}\n"
+            f"- Estimated posts/week: {ppw}"
+        )
+    else:
+        subs   = stats.get("subscribers", 0)
+        vids   = stats.get("videos", 0)
+        views  = stats.get("views", 0)
+        return (
+            f"- Platform: YouTube\n"
+            f"- Subscribers: {int(subs):,}\n"
+            f"- Total Videos: {int(vids):,}\n"
+            f"- Monthly Views: {int(views):,}"
+        )
+
+
+def _build_prompt(
+    name:        str,
+    platform:    str,
+    goal:        str,
+    zodiac:      str,
+    dob:         str,
+    stats:       dict,
+    sections:    Tuple[str, ...] = (),
+) -> str:
+
+    stats_block = format_stats(platform, stats)
+
+    if not sections or "palm_reading" in sections:
+        palm_line = "Palm Image: PROVIDED (analyse the actual visible lines and features)"
+    else:
+        palm_line = "Palm Image: NOT PROVIDED (do not reference palm features)"
+    if not sections or sections == SECTIONS:
+        closing = f"Write the complete JSON response for {name} — a {zodiac} creator on {platform} — and address them by name."
+    else:
+        closing = (f"Write the JSON response for {name} — a {zodiac} creator on {platform} — "
+                   f"with ONLY these keys: {', '.join(sections)}.")
+
+    return f"""
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-ABSOLUTE RULES:
-1. Every field must be fully populated — no empty strings, no placeholder text, no "N/A"
-2. monthly_plan: exactly 4 weeks, weeks 1–3 have 7 tasks, week 4 has 9 tasks
-3. posting_schedule: all 7 days present — use [] for rest days
-4. Times in posting_schedule: "H:MM AM/PM" format only (e.g. "7:00 PM")
-5. Palm reading MUST reference actual visible features from the image — not generic text
-6. Astrology MUST be specific to {zodiac} — do not write generic content that fits any sign
-7. All advice must be personalised to {name}, their exact platform stats, and their specific goal
-8. content_strategy must be at minimum 4 full paragraphs
-9. final_blessing must address {name} by name
+CREATOR PROFILE
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+Name: {name}
+{stats_block}
+Goal: {goal}
+Zodiac Sign: {zodiac}
+Date of Birth: {dob}
+{palm_line}
+
+{closing}
 """.strip()
 
 
+# ─────────────────────────────────────────────
+# Server-side normalisation
+# ─────────────────────────────────────────────
+_ALL_DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def _normalise(data: dict) -> dict:
+    """Fill missing posting_schedule days and clamp palm scores to 1–100."""
+    data = dict(data)
+
+    sched = data.get("posting_schedule")
+    if isinstance(sched, dict):
+        data["posting_schedule"] = {**{day: [] for day in _ALL_DAYS}, **sched}
+
+    pr = data.get("palm_reading")
+    if isinstance(pr, dict):
+        pr = dict(pr)
+        for field in ("creativity_score", "leadership_score", "resilience_score"):
+            v = pr.get(field, 70)
+            pr[field] = max(1, min(100, int(v) if isinstance(v, (int, float)) else 70))
+        data["palm_reading"] = pr
+    return data
+
+
 # ─────────────────────────────────────────────
 # Main service function
 # ─────────────────────────────────────────────
 async def run_creator_analysis(
-    palm_image:  UploadFile,
+    palm_image:  Optional[UploadFile],
     platform:    str,
     name:        str,
     goal:        str,
@@ -396,88 +510,78 @@ async def run_creator_analysis(
     subscribers: Optional[int] = None,
     videos:      Optional[int] = None,
     views:       Optional[int] = None,
+    sections:    Tuple[str, ...] = SECTIONS,
 ) -> CreatorAnalysisResponse:
 
-    logger.info(f"[creator_analysis] name={name!r} platform={platform} zodiac={zodiac} dob={dob}")
-
-    # ── Read and validate palm image ──
-    image_bytes = await palm_image.read()
-    size_mb = len(image_bytes) / (1024 * 1024)
-    if size_mb > 10:
-        raise HTTPException(status_code=400, detail=f"Palm image must be under 10MB. Got {size_mb:.1f}MB.")
-    if not image_bytes:
-        raise HTTPException(status_code=400, detail="Palm image file is empty.")
-
-    mime     = _detect_mime(image_bytes)
-    b64_palm = base64.b64encode(image_bytes).decode("utf-8")
-    logger.info(f"[creator_analysis] palm image: mime={mime} size={size_mb:.2f}MB")
+    logger.info("[creator_analysis] name=%r platform=%s zodiac=%s dob=%s sections=%d",
+                name, platform, zodiac, dob, len(sections))
+    for section in sections:
+        creator_sections_total.inc(section)
+
+    # ── Read and validate palm image — only needed for the palm reading ──
+    wants_palm = "palm_reading" in sections
+    image_part: Optional[dict] = None
+    if wants_palm:
+        if palm_image is None:
+            raise HTTPException(status_code=400, detail="palm_image is required for the palm_reading section.")
+        with span("upload_read") as sp:
+            image_bytes = await palm_image.read()
+            if sp:
+                sp.set("bytes", len(image_bytes))
+        upload_size_bytes.observe(len(image_bytes), current_route.get())
+        size_mb = len(image_bytes) / (1024 * 1024)
+        if size_mb > 10:
+            raise HTTPException(status_code=400, detail=f"Palm image must be under 10MB. Got {size_mb:.1f}MB.")
+        if not image_bytes:
+            raise HTTPException(status_code=400, detail="Palm image file is empty.")
+
+        mime     = _detect_mime(image_bytes)
+        with span("base64_encode", bytes=len(image_bytes)):
+            b64_palm = base64.b64encode(image_bytes).decode("utf-8")
+        logger.info("[creator_analysis] palm image: mime=%s size=%.2fMB", mime, size_mb)
+        image_part = {
+            "type":      "image_url",
+            "image_url": {
+                "url":    f"data:{mime};base64,{b64_palm}",
+                "detail": "high",
+            },
+        }
 
     # ── Build stats dict ──
-    stats = {}
-    if platform == "instagram":
-        stats = {"followers": followers or 0, "posts": posts or 0}
-    else:
-        stats = {"subscribers": subscribers or 0, "videos": videos or 0, "views": views or 0}
+    stats = creator_stats(platform, followers, posts, subscribers, videos, views)
 
     # ── Build prompt ──
-    prompt_text = _build_prompt(name, platform, goal, zodiac, dob, stats)
+    with span("prompt_build"):
+        prompt_text = _build_prompt(name, platform, goal, zodiac, dob, stats, sections)
 
-    # ── Build messages — text + palm image in one call ──
+    # ── Build messages — static system prompt, then profile + palm image ──
     messages = [
+        {"role": "system", "content": _system_prompt(sections)},
         {
             "role": "user",
-            "content": [
-                {
-                    "type":      "image_url",
-                    "image_url": {
-                        "url":    f"data:{mime};base64,{b64_palm}",
-                        "detail": "high",
-                    },
-                },
-                {
-                    "type": "text",
-                    "text": prompt_text,
-                },
-            ],
-        }
+            "content": [{"type": "text", "text": prompt_text}] + ([image_part] if image_part else []),
+        },
     ]
 
     # ── Call OpenAI Vision ──
-    data = await _call_openai_vision(messages, max_tokens=4096)
-
-    # ── Validate required top-level keys ──
-    required_keys = [
-        "platform_assessment", "what_went_right", "what_went_wrong",
-        "content_strategy", "astro_zodiac_reading", "palm_reading",
-        "best_posting_days", "posting_schedule", "monthly_plan",
-        "growth_prediction", "final_blessing",
-    ]
-    missing = [k for k in required_keys if k not in data]
-    if missing:
-        raise HTTPException(
-            status_code=502,
-            detail=f"OpenAI response missing required fields: {missing}",
+    usage: dict = {}
+    data = await _call_openai_vision(messages, max_tokens=4096, usage=usage)
+
+    # The palm image is only resent when the palm reading itself needs repair
+    def repair_context(broken: Dict[str, str]) -> list:
+        if "palm_reading" in broken:
+            return messages
+        return [messages[0], {"role": "user", "content": prompt_text}]
+
+    # Unrequested keys the model added anyway are dropped
+    def prepare(d: dict) -> dict:
+        return _normalise({k: v for k, v in d.items() if k in sections})
+
+    # ── Validate; missing or invalid sections are regenerated on their own ──
+    with span("validate"):
+        result = await validate_or_repair(
+            CreatorAnalysisResponse, data, repair_context, _call_openai_vision, usage,
+            prepare=prepare, required=sections,
         )
-
-    # ── Normalise posting_schedule — ensure all 7 days present ──
-    all_days = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
-    sched = data.get("posting_schedule", {})
-    for day in all_days:
-        if day not in sched:
-            sched[day] = []
-    data["posting_schedule"] = sched
-
-    # ── Clamp palm scores ──
-    pr = data.get("palm_reading", {})
-    for field in ("creativity_score", "leadership_score", "resilience_score"):
-        v = pr.get(field, 70)
-        pr[field] = max(1, min(100, int(v) if isinstance(v, (int, float)) else 70))
-    data["palm_reading"] = pr
-
-    logger.info(f"[creator_analysis] ✅ complete for {name!r}")
-
-    try:
-        return CreatorAnalysisResponse(**data)
-    except Exception as exc:
-        logger.error(f"[creator_analysis] schema validation error: {exc}")
-        raise HTTPException(status_code=502, detail=f"Response schema mismatch: {exc}")
+    logger.info("[creator_analysis] ✅ complete for %r", name)
+    return result
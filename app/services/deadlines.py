@@ -0,0 +1,196 @@
+"""
+app/services/deadlines.py
+
+Request-scoped deadlines and client-disconnect cancellation.
+
+Every expensive route has a default budget, looked up by route template
+(`/plans/{plan_id}/weeks/{week}`, not the concrete path); clients may send
+`X-Request-Deadline: <seconds>` to choose their own (capped at
+DEADLINE_MAX_SECONDS). The absolute deadline is stored in
+request_context.request_deadline, and the OpenAI transport and profile fetches
+shrink their timeouts to what is left of it.
+
+DeadlineMiddleware runs the rest of the app as a task and cancels it when
+  - the ASGI `http.disconnect` message arrives (browser tab closed), or
+  - the deadline passes before a response has started (→ 504).
+Once a streaming response has started its status is sent, so a streamed
+body has to stop itself at the deadline (run_pipeline does, using remaining()).
+A disconnect before the response starts is logged with status 499.
+Cancelling the task cancels the in-flight httpx request, so OpenAI stops
+generating tokens nobody will read. Aborts are counted in
+`request_aborts_total{route,reason}`.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+from starlette.routing import Match
+
+from app.services.metrics import registry
+from app.services.request_context import request_deadline
+
+logger = logging.getLogger("creator_growth_ai")
+
+DEADLINE_HEADER      = b"x-request-deadline"
+DEADLINE_MAX_SECONDS: float = float(os.getenv("DEADLINE_MAX_SECONDS", "300"))
+
+DEFAULT_DEADLINES: Dict[str, float] = {
+    "/creator-analysis":     160.0,
+    "/palm-analysis":        100.0,
+    "/generate-ai-insights": 100.0,
+    "/astrology-analysis":   100.0,
+    "/analyze-profile":      20.0,
+    "/generate-report":      60.0,
+    "/pipeline":             180.0,
+    "/plans":                60.0,
+    "/plans/{plan_id}/weeks/{week}": 60.0,
+}
+
+request_aborts_total = registry.counter(
+    "request_aborts_total", "Requests whose work was cancelled before completion", ("route", "reason"))
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, or None when it has no deadline."""
+    deadline = request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def timeout_within(default: float) -> float:
+    """Upstream timeout that never outlives the request; 504 if already past it."""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise HTTPException(status_code=504, detail="Request deadline exceeded.")
+    return min(default, left)
+
+
+_templates: Dict[str, str] = {}
+
+
+def route_template(scope) -> str:
+    """Template of the route matching `scope` (memoised per path, bounded like main._route_label)."""
+    path = scope.get("path", "")
+    template = _templates.get(path)
+    if template is None:
+        template = path
+        app = scope.get("app")
+        for route in getattr(getattr(app, "router", None), "routes", ()):
+            if route.matches(scope)[0] == Match.FULL:
+                template = route.path
+                break
+        if template != path and len(_templates) > 1024:
+            return template
+        _templates[path] = template
+    return template
+
+
+def _budget_for(scope, route: str) -> Optional[float]:
+    default = DEFAULT_DEADLINES.get(route)
+    for name, value in scope.get("headers", ()):
+        if name == DEADLINE_HEADER:
+            try:
+                budget = float(value)
+            except ValueError:
+                break
+            if budget > 0:
+                return min(budget, DEADLINE_MAX_SECONDS)
+            break
+    return default
+
+
+class DeadlineMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route  = route_template(scope)
+        budget = _budget_for(scope, route)
+        if budget is None:
+            return await self.app(scope, receive, send)
+
+        deadline = time.monotonic() + budget
+        disconnected = asyncio.Event()
+        after_body: asyncio.Queue = asyncio.Queue()
+        watcher: Optional[asyncio.Task] = None
+        response_started = False
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                await after_body.put(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        async def wrapped_receive():
+            nonlocal watcher
+            if watcher is not None:
+                return await after_body.get()
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False):
+                # Body fully read — from now on only a disconnect can arrive
+                watcher = asyncio.create_task(watch_disconnect())
+            return message
+
+        async def wrapped_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        token = request_deadline.set(deadline)
+        try:
+            task = asyncio.create_task(self.app(scope, wrapped_receive, wrapped_send))
+        finally:
+            request_deadline.reset(token)
+        disconnect_wait = asyncio.create_task(disconnected.wait())
+
+        try:
+            while True:
+                timeout = None if response_started else max(0.0, deadline - time.monotonic())
+                done, _ = await asyncio.wait(
+                    {task, disconnect_wait}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if task in done:
+                    return task.result()
+                if disconnect_wait in done:
+                    reason = "disconnect"
+                    break
+                if not response_started:
+                    reason = "deadline"
+                    break
+        finally:
+            disconnect_wait.cancel()
+            if watcher is not None:
+                watcher.cancel()
+
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+        request_aborts_total.inc(route, reason)
+        logger.warning("[deadline] cancelled %s after %.1fs: %s", route, budget - (deadline - time.monotonic()), reason)
+
+        if not response_started:
+            # 499 (client closed request) is never seen by the client but keeps
+            # the outer middleware and metrics from treating this as a crash.
+            status = 504 if reason == "deadline" else 499
+            body = json.dumps({"detail": f"Request deadline of {budget:g}s exceeded." if reason == "deadline"
+                               else "Client disconnected."}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
@@ -5,17 +5,212 @@ Pure math-based goal feasibility calculator.
 No AI needed — deterministic from inputs.
 """
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
-from app.models.schemas import GoalRequest, GoalResponse
+import numpy as np
+
+from app.models.schemas import GoalRequest, GoalResponse, GoalSolveRequest, GoalSolveResponse, Platform
+from app.services.columnar import ROWS, Series, shape
 
 logger = logging.getLogger("creator_growth_ai")
 
 
-def calculate_goal(req: GoalRequest) -> GoalResponse:
+# ── Monte Carlo projection ───────────────────────────────────────
+# Month-to-month volatility of follower growth (std-dev of log growth)
+_PLATFORM_VOLATILITY = {
+    Platform.instagram: 0.050,
+    Platform.youtube:   0.045,
+    Platform.tiktok:    0.090,
+    Platform.facebook:  0.035,
+    Platform.twitter:   0.060,
+    Platform.unknown:   0.050,
+}
+
+
+def _default_seed(req: GoalRequest) -> int:
+    """Same inputs → same bands, like the deterministic projection."""
+    return (req.current_followers * 1_000_003
+            + req.target_followers * 10_007
+            + req.timeline_months * 101
+            + req.posting_frequency) & 0xFFFFFFFF
+
+
+def simulate_projection_bands(
+    req: GoalRequest,
+    monthly_rate: float,
+    simulations: Optional[int] = None,
+    seed: Optional[int] = None,
+    fmt: str = ROWS,
+) -> Series:
+    """
+    Simulate `simulations` follower paths, one month at a time.
+
+    Monthly log-growth is normal with
+      - drift from the realistic rate (85% of required) scaled by posting frequency
+      - volatility from the platform, widening for more ambitious targets
+    Only the current month's position of every path is kept (a float32
+    vector), plus a "reached the target yet" flag per path, so memory is O(n)
+    instead of a (months, n) matrix and its cumulative-max copy. Percentiles
+    come from an in-place np.partition of that vector. The draws are taken in
+    the same order as one (months, n) block, so a seed gives the same paths.
+    GoalRequest caps simulations × months (MAX_SIMULATION_CELLS) so this stays
+    within a few milliseconds; callers still run it off the event loop.
+    """
+    n      = simulations or req.simulations
+    months = req.timeline_months
+    rng    = np.random.default_rng(_default_seed(req) if seed is None else seed)
+
+    freq_factor = float(np.clip((req.posting_frequency / 5.0) ** 0.35, 0.6, 1.5))
+    mean_rate   = monthly_rate * 0.85 * freq_factor
+    sigma       = _PLATFORM_VOLATILITY.get(req.platform or Platform.unknown, 0.05) + 0.35 * mean_rate
+    drift       = np.log1p(mean_rate) - 0.5 * sigma * sigma
+
+    log_target = np.float32(np.log(req.target_followers / req.current_followers))
+    position   = np.zeros(n, dtype=np.float32)
+    step       = np.empty(n, dtype=np.float32)
+    scratch    = np.empty(n, dtype=np.float32)
+    hit        = np.empty(n, dtype=bool)
+    reached    = np.zeros(n, dtype=bool)
+
+    # Linear-interpolation percentiles (numpy's default) from the two order
+    # statistics around each rank
+    ranks = np.array([0.10, 0.50, 0.90]) * (n - 1)
+    lower = np.floor(ranks).astype(np.intp)
+    upper = np.minimum(lower + 1, n - 1)
+    frac  = (ranks - lower).astype(np.float32)
+    kth   = np.unique(np.concatenate((lower, upper)))
+
+    log_pct    = np.empty((3, months), dtype=np.float64)
+    reach_prob = np.empty(months, dtype=np.float64)
+    for month in range(months):
+        rng.standard_normal(dtype=np.float32, out=step)
+        step     *= np.float32(sigma)
+        step     += np.float32(drift)
+        position += step
+        np.greater_equal(position, log_target, out=hit)
+        reached |= hit
+        reach_prob[month] = np.count_nonzero(reached) / n
+
+        np.copyto(scratch, position)
+        scratch.partition(kth)
+        lo, hi = scratch[lower], scratch[upper]
+        log_pct[:, month] = lo + (hi - lo) * frac
+
+    pct = np.rint(req.current_followers * np.exp(log_pct)).astype(np.int64)
+
+    # Month 0 is the starting point: every band at current followers
+    start = np.full((3, 1), req.current_followers, dtype=np.int64)
+    pct   = np.hstack((start, pct))
+    return shape({
+        "month":             list(range(months + 1)),
+        "p10":               pct[0].tolist(),
+        "p50":               pct[1].tolist(),
+        "p90":               pct[2].tolist(),
+        "reach_probability": [0.0] + np.round(reach_prob, 4).tolist(),
+    }, fmt)
+
+
+# ── Feasibility scoring rules ────────────────────────────────────
+# Base score by required monthly growth rate (upper bound inclusive);
+# anything above the last bound is "Extremely Ambitious".
+_RATE_BOUNDS = np.array([0.05, 0.10, 0.20, 0.40])
+_RATE_SCORES = np.array([95.0, 80.0, 60.0, 38.0, 18.0])
+_RATE_LABELS = ["Highly Achievable", "Achievable", "Challenging",
+                "Very Challenging", "Extremely Ambitious"]
+
+MAX_TIMELINE_MONTHS   = 60
+MAX_POSTING_FREQUENCY = 21
+
+
+def _frequency_adjusted(score: np.ndarray, freq: np.ndarray) -> np.ndarray:
+    """Posting frequency bonuses/penalties, clamped to [5, 100]."""
+    return np.select(
+        [freq >= 14, freq >= 7, freq >= 5, freq <= 2],
+        [np.minimum(100.0, score + 12.0),
+         np.minimum(100.0, score + 7.0),
+         np.minimum(100.0, score + 3.0),
+         np.maximum(5.0, score - 10.0)],
+        default=score,
+    )
+
+
+def _feasibility(monthly_rate: float, posting_frequency: int) -> Tuple[float, str]:
+    band  = int(np.searchsorted(_RATE_BOUNDS, monthly_rate, side="left"))
+    score = float(_frequency_adjusted(_RATE_SCORES[band], np.asarray(posting_frequency)))
+    return round(score, 1), _RATE_LABELS[band]
+
+
+def feasibility_surface(current_followers: int, target_followers: int) -> np.ndarray:
+    """
+    Feasibility score for every (timeline 1–60, frequency 1–21) plan in one
+    vectorised pass, using exactly the rules calculate_goal applies to a
+    single plan. Row i is timeline i+1 months, column j is j+1 posts/week.
+    """
+    months = np.arange(1, MAX_TIMELINE_MONTHS + 1, dtype=np.float64)
+    freqs  = np.arange(1, MAX_POSTING_FREQUENCY + 1)
+    rates  = (target_followers - current_followers) / months / current_followers
+    base   = _RATE_SCORES[np.searchsorted(_RATE_BOUNDS, rates, side="left")]
+    return np.round(_frequency_adjusted(base[:, None], freqs[None, :]), 1)
+
+
+def solve_goal(req: GoalSolveRequest) -> GoalSolveResponse:
+    """
+    Inverse planner: find the cheapest (timeline, frequency) plan whose
+    feasibility score meets req.min_score.
+      objective="timeline"  → shortest timeline, then fewest posts/week
+      objective="frequency" → fewest posts/week, then shortest timeline
+    """
+    logger.info(
+        "[solve_goal] %s → %s min_score=%s objective=%s",
+        req.current_followers, req.target_followers, req.min_score, req.objective,
+    )
+
+    surface  = feasibility_surface(req.current_followers, req.target_followers)
+    allowed  = surface[:req.max_timeline_months, :req.max_posting_frequency]
+    feasible = allowed >= req.min_score
+
+    plan: Optional[Dict[str, Any]] = None
+    if feasible.any():
+        grid = feasible if req.objective == "timeline" else feasible.T
+        outer, inner = np.unravel_index(int(np.argmax(grid)), grid.shape)
+        t_idx, f_idx = (int(outer), int(inner)) if req.objective == "timeline" else (int(inner), int(outer))
+        monthly_rate = (req.target_followers - req.current_followers) / (t_idx + 1) / req.current_followers
+        score, label = _feasibility(monthly_rate, f_idx + 1)
+        plan = {
+            "timeline_months":      t_idx + 1,
+            "posting_frequency":    f_idx + 1,
+            "feasibility_score":    score,
+            "feasibility_label":    label,
+            "required_growth_rate": round(monthly_rate * 100, 2),
+        }
+
+    return GoalSolveResponse(
+        min_score=req.min_score,
+        objective=req.objective,
+        timelines=list(range(1, MAX_TIMELINE_MONTHS + 1)),
+        frequencies=list(range(1, MAX_POSTING_FREQUENCY + 1)),
+        surface=surface.tolist(),
+        feasible_plans=int(feasible.sum()),
+        plan=plan,
+    )
+
+
+def projection_columns(req: GoalRequest, monthly_rate: float) -> Dict[str, List[int]]:
+    """Month-by-month projection at the realistic rate (85% of needed) next to the linear target line."""
+    months = np.arange(req.timeline_months + 1)
+    needed = req.target_followers - req.current_followers
+    return {
+        "month":     months.tolist(),
+        # Python ints, as before vectorising: extreme targets outgrow int64 within the timeline
+        "followers": [int(v) for v in np.rint(req.current_followers * (1 + monthly_rate * 0.85) ** months).tolist()],
+        "target":    (req.current_followers + needed * months / req.timeline_months).astype(np.int64).tolist(),
+    }
+
+
+def calculate_goal(req: GoalRequest, fmt: str = ROWS) -> GoalResponse:
     logger.info(
-        f"[calculate_goal] {req.current_followers} → {req.target_followers} "
-        f"over {req.timeline_months} months, posting {req.posting_frequency}x/week"
+        "[calculate_goal] %s → %s over %s months, posting %sx/week",
+        req.current_followers, req.target_followers, req.timeline_months, req.posting_frequency,
     )
 
     needed_followers = req.target_followers - req.current_followers
@@ -23,47 +218,11 @@ def calculate_goal(req: GoalRequest) -> GoalResponse:
     monthly_rate     = monthly_needed / req.current_followers  # as a decimal
 
     # ── Feasibility Score ────────────────────────────────────────
-    # Base score: 100 if monthly rate ≤ 5%, degrades from there
-    if monthly_rate <= 0.05:
-        score = 95.0
-        label = "Highly Achievable"
-    elif monthly_rate <= 0.10:
-        score = 80.0
-        label = "Achievable"
-    elif monthly_rate <= 0.20:
-        score = 60.0
-        label = "Challenging"
-    elif monthly_rate <= 0.40:
-        score = 38.0
-        label = "Very Challenging"
-    else:
-        score = 18.0
-        label = "Extremely Ambitious"
-
-    # Posting frequency bonuses
-    if req.posting_frequency >= 14:
-        score = min(100.0, score + 12.0)
-    elif req.posting_frequency >= 7:
-        score = min(100.0, score + 7.0)
-    elif req.posting_frequency >= 5:
-        score = min(100.0, score + 3.0)
-    elif req.posting_frequency <= 2:
-        score = max(5.0, score - 10.0)
-
-    score = round(score, 1)
+    score, label = _feasibility(monthly_rate, req.posting_frequency)
 
     # ── Projection ───────────────────────────────────────────────
     # Realistic rate = 85% of needed (accounts for real-world variance)
-    realistic_monthly = monthly_rate * 0.85
-    projection: List[Dict[str, Any]] = []
-    current = float(req.current_followers)
-    for month in range(req.timeline_months + 1):
-        projection.append({
-            "month":     month,
-            "followers": int(round(current)),
-            "target":    int(req.current_followers + (needed_followers * month / req.timeline_months)),
-        })
-        current *= (1 + realistic_monthly)
+    projection = shape(projection_columns(req, monthly_rate), fmt)
 
     # ── Recommendations ──────────────────────────────────────────
     recommendations: List[str] = []
@@ -88,10 +247,15 @@ def calculate_goal(req: GoalRequest) -> GoalResponse:
         "Track your top 3 performing posts weekly and double down on those formats.",
     ]
 
+    projection_bands = None
+    if req.projection_mode == "monte_carlo":
+        projection_bands = simulate_projection_bands(req, monthly_rate, seed=req.seed, fmt=fmt)
+
     return GoalResponse(
         feasibility_score=score,
         feasibility_label=label,
         required_growth_rate=round(monthly_rate * 100, 2),
         projection=projection,
         recommendations=recommendations[:6],
+        projection_bands=projection_bands,
     )
@@ -0,0 +1,226 @@
+"""
+app/services/insights_cache.py
+
+Near-duplicate cache for /generate-ai-insights.
+
+Insights requests differ by tiny amounts (10,213 vs 10,240 followers, 4.31%
+vs 4.29% engagement), so an exact-match key almost never hits. With
+INSIGHTS_CACHE_MODE=quantized the key is built from normalised inputs:
+
+  followers / target   log buckets, INSIGHTS_FOLLOWER_BUCKETS per decade
+                       (20 → buckets about 12% wide)
+  engagement rate      rounded to INSIGHTS_ENGAGEMENT_STEP percentage points
+  niche / goals        lower-cased, punctuation stripped, whitespace collapsed
+  platform, timeline   exact; the tenant is always part of the key
+
+A hit returns the cached response with the requester's own numbers patched
+in: the exact follower, target and engagement figures and the username are
+substituted in every text field, growth_prediction is scaled by the
+follower ratio and feasibility_score is recomputed. Rounded forms the model
+may have written ("10K") are left alone — they hold for the whole bucket.
+
+insights_cache_requests_total{outcome} gives the hit rate;
+insights_cache_saved_seconds_total and insights_cache_saved_tokens_total add
+up the generation time and OpenAI tokens each hit did not spend.
+"""
+import logging
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.models.schemas import AIInsightsRequest, AIInsightsResponse
+from app.services.ai_service import feasibility_score, generate_insights
+from app.services.metrics import registry
+from app.services.request_context import current_tenant
+
+logger = logging.getLogger("creator_growth_ai")
+
+INSIGHTS_CACHE_MODE:        str   = os.getenv("INSIGHTS_CACHE_MODE", "off").lower()   # off | quantized
+INSIGHTS_CACHE_TTL:         float = float(os.getenv("INSIGHTS_CACHE_TTL", "3600"))
+INSIGHTS_CACHE_MAX_ENTRIES: int   = int(os.getenv("INSIGHTS_CACHE_MAX_ENTRIES", "2000"))
+INSIGHTS_FOLLOWER_BUCKETS:  int   = int(os.getenv("INSIGHTS_FOLLOWER_BUCKETS", "20"))
+INSIGHTS_ENGAGEMENT_STEP:   float = float(os.getenv("INSIGHTS_ENGAGEMENT_STEP", "0.1"))
+
+insights_cache_requests_total = registry.counter(
+    "insights_cache_requests_total", "Quantized insights cache lookups", ("outcome",))
+insights_cache_saved_seconds = registry.counter(
+    "insights_cache_saved_seconds_total", "Generation time not spent thanks to cache hits")
+insights_cache_saved_tokens = registry.counter(
+    "insights_cache_saved_tokens_total", "OpenAI tokens not spent thanks to cache hits")
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES   = re.compile(r"\s+")
+
+
+def _log_bucket(n: Optional[int]) -> str:
+    if not n or n <= 0:
+        return "-"
+    return str(math.floor(math.log10(n) * INSIGHTS_FOLLOWER_BUCKETS))
+
+
+def _text(value: Optional[str], default: str) -> str:
+    value = _NON_WORD.sub(" ", (value or default).lower())
+    return _SPACES.sub(" ", value).strip()
+
+
+def quantized_key(req: AIInsightsRequest) -> str:
+    step = INSIGHTS_ENGAGEMENT_STEP
+    engagement = round(req.engagement_rate / step) if step > 0 else req.engagement_rate
+    return "|".join((
+        current_tenant.get(),
+        req.platform.strip().lower(),
+        f"f{_log_bucket(req.followers)}",
+        f"e{engagement}",
+        f"t{_log_bucket(req.target_followers)}",
+        f"m{req.timeline_months or '-'}",
+        _text(req.niche, "general"),
+        _text(req.goals, "grow audience"),
+    ))
+
+
+def _number_forms(n: int) -> tuple:
+    return (f"{n:,}", str(n))
+
+
+def _percent_forms(x: float) -> tuple:
+    return (f"{x}%", f"{x:.2f}%", f"{x:.1f}%")
+
+
+class _Patcher:
+    """Substitutes the cached request's exact figures with the new request's, in one pass."""
+
+    def __init__(self, source: AIInsightsRequest, target: AIInsightsRequest):
+        pairs: Dict[str, str] = {}
+
+        def add(old_forms: tuple, new_forms: tuple) -> None:
+            for old, new in zip(old_forms, new_forms):
+                if old != new:
+                    pairs.setdefault(old, new)
+
+        add(_number_forms(source.followers), _number_forms(target.followers))
+        # The prompt defaults the target to 2× followers when none is given
+        add(_number_forms(source.target_followers or source.followers * 2),
+            _number_forms(target.target_followers or target.followers * 2))
+        add(_percent_forms(source.engagement_rate), _percent_forms(target.engagement_rate))
+        if source.username != target.username:
+            pairs.setdefault(f"@{source.username}", f"@{target.username}")
+            if len(source.username) >= 4:   # a bare "ann" or "go" could be an ordinary word
+                pairs.setdefault(source.username, target.username)
+        self.pairs   = pairs
+        self.ratio   = target.followers / source.followers if source.followers else 1.0
+        self.pattern = None
+        if pairs:
+            alternatives = "|".join(re.escape(p) for p in sorted(pairs, key=len, reverse=True))
+            self.pattern = re.compile(rf"(?<![\w.,])(?:{alternatives})(?![\w]|[.,]\d)")
+
+    def text(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.pattern.sub(lambda m: self.pairs[m.group(0)], value) if self.pattern else value
+        if isinstance(value, list):
+            return [self.text(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self.text(v) for k, v in value.items()}
+        return value
+
+    def prediction(self, prediction: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            k: round(v * self.ratio) if isinstance(v, (int, float)) and not isinstance(v, bool) else self.text(v)
+            for k, v in prediction.items()
+        }
+
+
+@dataclass
+class _Entry:
+    request:    AIInsightsRequest
+    response:   AIInsightsResponse
+    seconds:    float
+    tokens:     int
+    expires_at: float
+
+
+class InsightsCache:
+    def __init__(self):
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.hits = self.misses = 0
+        self.saved_seconds = 0.0
+        self.saved_tokens  = 0
+
+    @property
+    def enabled(self) -> bool:
+        return INSIGHTS_CACHE_MODE == "quantized"
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > INSIGHTS_CACHE_MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def patch(entry: _Entry, req: AIInsightsRequest) -> AIInsightsResponse:
+        """The cached response rewritten with `req`'s exact numbers."""
+        patcher = _Patcher(entry.request, req)
+        data = entry.response.model_dump()
+        patched = {k: patcher.text(v) for k, v in data.items()
+                   if k not in ("growth_prediction", "feasibility_score")}
+        patched["growth_prediction"] = patcher.prediction(data["growth_prediction"])
+        patched["feasibility_score"] = feasibility_score(req)
+        return AIInsightsResponse.model_construct(**patched)
+
+    async def insights(self, req: AIInsightsRequest) -> AIInsightsResponse:
+        """generate_insights(req), answered from a near-duplicate request when the cache is on."""
+        if not self.enabled:
+            return await generate_insights(req)
+
+        key = quantized_key(req)
+        entry = self._lookup(key)
+        if entry is not None:
+            start = time.perf_counter()
+            result = self.patch(entry, req)
+            saved = max(0.0, entry.seconds - (time.perf_counter() - start))
+            self.hits += 1
+            self.saved_seconds += saved
+            self.saved_tokens  += entry.tokens
+            insights_cache_requests_total.inc("hit")
+            insights_cache_saved_seconds.inc(amount=saved)
+            insights_cache_saved_tokens.inc(amount=entry.tokens)
+            return result
+
+        self.misses += 1
+        insights_cache_requests_total.inc("miss")
+        usage: dict = {}
+        start = time.perf_counter()
+        result = await generate_insights(req, usage=usage)
+        tokens = (usage.get("prompt_tokens", 0) or 0) + (usage.get("completion_tokens", 0) or 0)
+        self._store(key, _Entry(req, result, time.perf_counter() - start, tokens,
+                                time.monotonic() + INSIGHTS_CACHE_TTL))
+        return result
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "mode":               INSIGHTS_CACHE_MODE,
+            "follower_buckets":   INSIGHTS_FOLLOWER_BUCKETS,
+            "engagement_step":    INSIGHTS_ENGAGEMENT_STEP,
+            "entries":            len(self._entries),
+            "hits":               self.hits,
+            "misses":             self.misses,
+            "hit_rate":           round(self.hits / total, 4) if total else None,
+            "saved_seconds":      round(self.saved_seconds, 3),
+            "saved_tokens":       self.saved_tokens,
+        }
+
+
+insights_cache = InsightsCache()
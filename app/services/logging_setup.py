@@ -0,0 +1,208 @@
+"""
+app/services/logging_setup.py
+
+Non-blocking logging: the event loop only enqueues records.
+
+configure_logging() puts a QueueHandler on the root logger and a
+QueueListener thread behind it that owns the real (stdout) handler, so
+formatting and write() calls never run on the event loop. Records are queued
+unformatted — services log with %-style templates and args
+(`logger.info("[OpenAI] model=%s", model)`), and the `%` interpolation happens
+on the listener thread, or not at all for records below the level.
+
+LOG_FORMAT=json (default) emits one JSON object per line with the request
+route, tenant and trace id captured at call time; LOG_FORMAT=text keeps the
+classic human-readable line.
+
+Noisy hot-path INFO/DEBUG lines are sampled per template: with
+  LOG_SAMPLE_RATES="[extract_username]=0.05;[OpenAI] calling=0.1"
+only 1 in 20 / 1 in 10 records whose template starts with that prefix is
+kept (kept records carry sample_rate so counts can be scaled back up).
+Warnings and errors are never sampled. The decision is made by
+SamplingFilter on the queue handler, ahead of the context capture, so dropped
+lines never reach the queue. Dropped records are counted in
+`log_records_sampled_out_total{template}`. Nothing outside the root handler
+is touched: third-party and uvicorn loggers keep their class.
+
+Thread and process lookups (logging.logThreads / logProcesses) are turned off
+unless LOG_CALLER=1 (then JSON lines also carry "loc": "module:lineno").
+
+scripts/bench_logging.py measures the per-request cost before and after.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO
+
+from app.services.metrics import registry
+from app.services.request_context import current_route, current_tenant
+from app.services.tracing import current_trace_id
+
+LOG_LEVEL:  str = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").strip().lower()
+LOG_CALLER: bool = os.getenv("LOG_CALLER", "").lower() in ("1", "true", "yes")
+
+TEXT_FORMAT = "%(asctime)s  %(levelname)-8s  %(name)s  %(message)s"
+
+# Template prefix → fraction of records kept
+_DEFAULT_SAMPLE_RATES: Dict[str, float] = {
+    "[extract_username]":                   0.05,
+    "[fetch_profile_page] fresh cache hit": 0.05,
+    "[simulate_profile] url=":              0.1,
+    "[OpenAI] calling":                     0.1,
+    "[OpenAI] response":                    0.1,
+    "[OpenAI] model=":                      0.1,
+    "[analyze_palm_image] image size":      0.1,
+    "[analyze_palm_image] mime":            0.1,
+}
+
+log_sampled_out_total = registry.counter(
+    "log_records_sampled_out_total", "Log records dropped by per-template sampling", ("template",))
+
+_listener: Optional[QueueListener] = None
+_sampler:  Optional["Sampler"] = None
+
+
+def _load_sample_rates() -> Dict[str, float]:
+    rates = dict(_DEFAULT_SAMPLE_RATES)
+    for item in filter(None, (p.strip() for p in os.getenv("LOG_SAMPLE_RATES", "").split(";"))):
+        prefix, _, rate = item.rpartition("=")
+        try:
+            rates[prefix] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+class Sampler:
+    """Keeps 1 in N records per template prefix; runs on the calling thread, so it must stay cheap."""
+
+    _UNSAMPLED = 1.0
+
+    def __init__(self, rates: Dict[str, float]):
+        self.rates = rates
+        self._by_template: Dict[str, Optional[str]] = {}   # template → matching prefix (memoised)
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def keep(self, template: str) -> Optional[float]:
+        """Sample rate to tag a kept record with (1.0 = not sampled), or None to drop it."""
+        try:
+            prefix = self._by_template[template]
+        except KeyError:
+            prefix = next((p for p in self.rates if template.startswith(p)), None)
+            self._by_template[template] = prefix
+        if prefix is None:
+            return self._UNSAMPLED
+        rate = self.rates[prefix]
+        if rate >= 1.0:
+            return self._UNSAMPLED
+        with self._lock:
+            n = self._counts.get(prefix, 0)
+            self._counts[prefix] = n + 1
+        if rate > 0 and n % max(1, round(1 / rate)) == 0:
+            return rate
+        log_sampled_out_total.inc(prefix)
+        return None
+
+
+class SamplingFilter(logging.Filter):
+    """Drops sampled-out INFO/DEBUG records; kept sampled ones are tagged with their sample_rate."""
+
+    def __init__(self, sampler: Sampler):
+        super().__init__()
+        self.sampler = sampler
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not isinstance(record.msg, str):
+            return True
+        rate = self.sampler.keep(record.msg)
+        if rate is None:
+            return False
+        if rate < 1.0:
+            record.sample_rate = rate
+        return True
+
+
+class ContextFilter(logging.Filter):
+    """Captures request context on the calling thread — the listener thread cannot see contextvars."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.route    = current_route.get()
+        record.tenant   = current_tenant.get()
+        record.trace_id = current_trace_id()
+        return True
+
+
+class LazyQueueHandler(QueueHandler):
+    """QueueHandler that leaves `msg % args` to the listener instead of formatting on enqueue."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts":       datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level":    record.levelname,
+            "logger":   record.name,
+            "msg":      record.getMessage(),
+            "template": record.msg if isinstance(record.msg, str) else None,
+        }
+        for key in ("route", "tenant", "trace_id", "sample_rate"):
+            value = getattr(record, key, None)
+            if value is not None and value != "-":
+                event[key] = value
+        if LOG_CALLER:
+            event["loc"] = f"{record.module}:{record.lineno}"
+        if record.exc_info:
+            event["exc"] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+def configure_logging(stream: Optional[TextIO] = None, fmt: str = LOG_FORMAT,
+                      sample_rates: Optional[Dict[str, float]] = None) -> QueueListener:
+    """Route all logging through a queue to a listener thread. Safe to call again (replaces the setup)."""
+    global _listener, _sampler
+    stop_logging()
+
+    # Per-record lookups nothing here prints
+    logging.logProcesses = logging.logMultiprocessing = False
+    logging.logThreads = LOG_CALLER
+
+    _sampler = Sampler(_load_sample_rates() if sample_rates is None else sample_rates)
+
+    sink = logging.StreamHandler(stream or sys.stdout)
+    sink.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    handler = LazyQueueHandler(queue.SimpleQueue())
+    handler.addFilter(SamplingFilter(_sampler))   # first, so dropped records skip the context capture
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(handler.queue, sink, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
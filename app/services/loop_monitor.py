@@ -0,0 +1,116 @@
+"""
+app/services/loop_monitor.py
+
+Event-loop lag monitor and blocking detector.
+
+- A heartbeat coroutine sleeps LOOP_MONITOR_INTERVAL and records how late it
+  woke up into the `event_loop_lag_seconds` histogram.
+- A watchdog thread checks the heartbeat; when the loop has not ticked for
+  LOOP_BLOCK_THRESHOLD it grabs the loop thread's current Python stack, finds
+  the ASGI scope of the request on that stack and logs one structured warning
+  per blocking episode naming the route and the offending frames.
+
+Typical culprits: requests.get in simulate_profile, WeasyPrint in
+generate_pdf_report, base64 of large uploads.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.services.metrics import registry
+
+logger = logging.getLogger("creator_growth_ai")
+
+LOOP_MONITOR_ENABLED:  bool  = os.getenv("LOOP_MONITOR_ENABLED", "1").lower() in ("1", "true", "yes")
+LOOP_MONITOR_INTERVAL: float = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1"))
+LOOP_BLOCK_THRESHOLD:  float = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.25"))
+LOOP_STACK_DEPTH:      int   = int(os.getenv("LOOP_STACK_DEPTH", "12"))
+
+event_loop_lag = registry.histogram(
+    "event_loop_lag_seconds", "Delay between scheduled and actual heartbeat wake-up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+event_loop_blocks_total = registry.counter(
+    "event_loop_blocks_total", "Episodes where the loop was blocked past the threshold", ("route",))
+
+
+def _route_on_stack(frame) -> str:
+    """Innermost ASGI `scope` found in the frames' locals → request path."""
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            return str(scope.get("path", "-"))
+        frame = frame.f_back
+    return "-"
+
+
+class LoopMonitor:
+    def __init__(self, interval: float = LOOP_MONITOR_INTERVAL, threshold: float = LOOP_BLOCK_THRESHOLD):
+        self.interval  = interval
+        self.threshold = threshold
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task:    Optional[asyncio.Task] = None
+        self._thread:  Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            event_loop_lag.observe(max(0.0, now - expected))
+            self._last_beat = now
+
+    def _watchdog(self) -> None:
+        reported_beat = 0.0
+        while not self._stopped.wait(self.interval):
+            beat = self._last_beat
+            blocked_for = time.monotonic() - beat
+            if blocked_for < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            route = _route_on_stack(frame)
+            stack = traceback.format_stack(frame, limit=LOOP_STACK_DEPTH)
+            event_loop_blocks_total.inc(route)
+            logger.warning(
+                "[loop_monitor] event loop blocked for %.0fms in %s", blocked_for * 1000, route,
+                extra={
+                    "event":      "event_loop_blocked",
+                    "route":      route,
+                    "blocked_ms": round(blocked_for * 1000, 1),
+                    "stack":      [line.strip() for line in stack],
+                },
+            )
+
+    def start(self) -> None:
+        if not LOOP_MONITOR_ENABLED or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info("[loop_monitor] started interval=%ss threshold=%ss", self.interval, self.threshold)
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+loop_monitor = LoopMonitor()
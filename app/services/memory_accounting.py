@@ -0,0 +1,195 @@
+"""
+app/services/memory_accounting.py
+
+Optional per-request memory accounting.
+
+MEMORY_ACCOUNTING=off | rss | tracemalloc  (default off)
+MEMORY_SAMPLE_RATE=0.0–1.0                 fraction of requests measured
+
+- rss:         peak resident set of the process while the request runs, minus
+               the RSS at its start. A shared daemon thread reads
+               /proc/self/statm every MEMORY_RSS_INTERVAL_MS while any probe
+               is active, so memory allocated and freed before the response
+               still shows up. Cheap enough for production; concurrent
+               requests share the process, so the figure is an upper bound,
+               not an exact attribution.
+- tracemalloc: Python-heap peak during the request (tracemalloc.reset_peak).
+               The peak is process-global, so only one request is probed at a
+               time — others arriving meanwhile are not sampled, and
+               allocations by unsampled concurrent requests still count
+               towards the probed one. Once tracing starts every allocation
+               in the process is traced, whatever MEMORY_SAMPLE_RATE says:
+               this mode slows all requests and is meant for diagnosis, not
+               for leaving on.
+
+Peaks are recorded per route in the `request_peak_memory_bytes` histogram.
+Requests whose peak exceeds MEMORY_HEAVY_BYTES are listed by GET
+/debug/memory, which in tracemalloc mode also takes a snapshot of the
+allocation sites currently live (in a worker thread, on demand — never on
+the request path).
+"""
+import logging
+import os
+import random
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Deque, List, Optional, Set
+
+from app.services.metrics import registry
+
+logger = logging.getLogger("creator_growth_ai")
+
+MEMORY_ACCOUNTING:      str   = os.getenv("MEMORY_ACCOUNTING", "off").strip().lower()
+MEMORY_SAMPLE_RATE:     float = float(os.getenv("MEMORY_SAMPLE_RATE", "0.05"))
+MEMORY_HEAVY_BYTES:     int   = int(os.getenv("MEMORY_HEAVY_BYTES", str(32 * 1024 * 1024)))
+MEMORY_TOP_SITES:       int   = int(os.getenv("MEMORY_TOP_SITES", "15"))
+MEMORY_RECENT_HEAVY:    int   = int(os.getenv("MEMORY_RECENT_HEAVY", "20"))
+MEMORY_RSS_INTERVAL_MS: float = float(os.getenv("MEMORY_RSS_INTERVAL_MS", "20"))
+
+MEMORY_ENABLED = MEMORY_ACCOUNTING in ("rss", "tracemalloc") and MEMORY_SAMPLE_RATE > 0
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+request_peak_memory = registry.histogram(
+    "request_peak_memory_bytes", "Peak memory growth attributed to a request", ("route", "mode"),
+    buckets=(1 << 20, 4 << 20, 16 << 20, 32 << 20, 64 << 20, 128 << 20, 256 << 20, 512 << 20, 1 << 30))
+memory_probes_skipped = registry.counter(
+    "memory_probes_skipped_total", "Sampled requests not probed because a tracemalloc probe was already running",
+    ("route",))
+
+_heavy: Deque[dict] = deque(maxlen=MEMORY_RECENT_HEAVY)
+_traced_probe: Optional["MemoryProbe"] = None
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class _RssSampler:
+    """One daemon thread raising the `peak` of every active rss probe; exits when none are left."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._probes: Set["MemoryProbe"] = set()
+        self._lock   = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, probe: "MemoryProbe") -> None:
+        with self._lock:
+            self._probes.add(probe)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+                self._thread.start()
+
+    def remove(self, probe: "MemoryProbe") -> None:
+        with self._lock:
+            self._probes.discard(probe)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._probes:
+                    self._thread = None
+                    return
+                probes = list(self._probes)
+            rss = _rss_bytes()
+            for probe in probes:
+                if rss > probe.peak:
+                    probe.peak = rss
+            time.sleep(self.interval)
+
+
+_rss_sampler = _RssSampler(MEMORY_RSS_INTERVAL_MS / 1000)
+
+
+class MemoryProbe:
+    __slots__ = ("route", "mode", "peak", "_start")
+
+    def __init__(self, route: str, mode: str):
+        self.route = route
+        self.mode  = mode
+        if mode == "tracemalloc":
+            tracemalloc.reset_peak()
+            self._start = tracemalloc.get_traced_memory()[0]
+            self.peak   = self._start
+        else:
+            self._start = self.peak = _rss_bytes()
+            _rss_sampler.add(self)
+
+    def finish(self) -> int:
+        global _traced_probe
+        if self.mode == "tracemalloc":
+            peak = max(0, tracemalloc.get_traced_memory()[1] - self._start)
+            if _traced_probe is self:
+                _traced_probe = None
+        else:
+            _rss_sampler.remove(self)
+            peak = max(0, max(self.peak, _rss_bytes()) - self._start)
+        if peak >= MEMORY_HEAVY_BYTES:
+            _remember_heavy(self.route, self.mode, peak)
+        request_peak_memory.observe(peak, self.route, self.mode)
+        return peak
+
+
+def _remember_heavy(route: str, mode: str, peak: int) -> None:
+    _heavy.append({
+        "route":      route,
+        "mode":       mode,
+        "peak_bytes": peak,
+        "at":         time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    })
+    logger.info("[memory] heavy request on %s: peak %.1fMB", route, peak / 1_048_576)
+
+
+def start() -> None:
+    """Called at startup; begins tracemalloc tracing when that mode is selected."""
+    if MEMORY_ENABLED and MEMORY_ACCOUNTING == "tracemalloc" and not tracemalloc.is_tracing():
+        tracemalloc.start(int(os.getenv("MEMORY_TRACE_FRAMES", "1")))
+        logger.warning("[memory] tracemalloc accounting on: every allocation is traced (sample_rate=%s)",
+                       MEMORY_SAMPLE_RATE)
+
+
+def maybe_probe(route: str) -> Optional[MemoryProbe]:
+    global _traced_probe
+    if random.random() >= MEMORY_SAMPLE_RATE:
+        return None
+    if MEMORY_ACCOUNTING == "tracemalloc":
+        if not tracemalloc.is_tracing():
+            return None
+        if _traced_probe is not None:
+            memory_probes_skipped.inc(route)
+            return None
+        _traced_probe = MemoryProbe(route, MEMORY_ACCOUNTING)
+        return _traced_probe
+    return MemoryProbe(route, MEMORY_ACCOUNTING)
+
+
+def top_sites() -> Optional[List[dict]]:
+    """Allocation sites currently live, largest first; None unless tracing. Blocking — run in a thread."""
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    return [
+        {"site": str(stat.traceback[0]), "bytes": stat.size, "blocks": stat.count}
+        for stat in snapshot.statistics("lineno")[:MEMORY_TOP_SITES]
+    ]
+
+
+def recent_heavy() -> dict:
+    return {
+        "mode":            MEMORY_ACCOUNTING,
+        "sample_rate":     MEMORY_SAMPLE_RATE,
+        "heavy_threshold": MEMORY_HEAVY_BYTES,
+        "rss_bytes":       _rss_bytes(),
+        "traced_bytes":    tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+        "heavy_requests":  list(reversed(_heavy)),
+    }
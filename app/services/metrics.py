@@ -0,0 +1,166 @@
+"""
+app/services/metrics.py
+
+Minimal Prometheus-compatible metrics registry.
+No client library needed — metrics are plain dicts keyed by label-value tuples
+and rendered in the text exposition format (0.0.4) on GET /metrics.
+
+Hot-path updates take no locks: almost all of them happen on the event loop
+thread, and the few from worker threads are single dict/list updates under the
+GIL, where a rare lost increment is an acceptable trade for zero contention.
+"""
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Request latency buckets (seconds) — from sub-ms /health up to 150s AI calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 90.0, 150.0)
+SIZE_BUCKETS    = (1_024, 10_240, 102_400, 512_000, 1_048_576, 2_097_152,
+                   5_242_880, 10_485_760)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name   = name
+        self.help   = help_text
+        self.labels = tuple(labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def items(self) -> List[Tuple[LabelValues, float]]:
+        return list(self._values.items())
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, lv)} {_format_value(v)}"
+            for lv, v in list(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) - amount
+
+    def set(self, *label_values: str, value: float) -> None:
+        self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values → [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series.setdefault(label_values, [0] * (len(self.buckets) + 1) + [0.0])
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for lv, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, lv, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, lv)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, lv)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labels))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help_text, labels))  # type: ignore[return-value]
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# ── HTTP ─────────────────────────────────────────────────────────
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("route", "method", "status"))
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "Requests currently being served", ("route",))
+upload_size_bytes = registry.histogram(
+    "upload_size_bytes", "Size of uploaded images", ("route",), buckets=SIZE_BUCKETS)
+
+# ── OpenAI ───────────────────────────────────────────────────────
+openai_request_duration = registry.histogram(
+    "openai_request_duration_seconds", "OpenAI chat completion latency", ("model", "status"))
+openai_requests_total = registry.counter(
+    "openai_requests_total", "OpenAI chat completion calls by status", ("model", "status"))
+openai_retries_total = registry.counter(
+    "openai_retries_total", "OpenAI calls retried after a retryable status", ("model",))
+openai_tokens_total = registry.counter(
+    "openai_tokens_total", "Tokens reported in the OpenAI usage field", ("model", "endpoint", "kind"))
+
+# ── Reports ──────────────────────────────────────────────────────
+pdf_render_duration = registry.histogram(
+    "pdf_render_seconds", "Report rendering time", ("output",))
@@ -0,0 +1,134 @@
+"""
+app/services/openai_transport.py
+
+Single HTTP path for every OpenAI chat completion call.
+The services keep their own payload building and error mapping; this module
+only owns the wire call so latency, status codes, retries and token usage are
+accounted for in one place.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from app.services.deadlines import remaining, timeout_within
+from app.services.metrics import (
+    openai_request_duration,
+    openai_requests_total,
+    openai_retries_total,
+    openai_tokens_total,
+    registry,
+)
+from app.services.request_context import current_route, current_tenant
+from app.services.tenants import fair_scheduler, record_tokens
+from app.services.tracing import KIND_CLIENT, span
+
+logger = logging.getLogger("creator_growth_ai")
+
+OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+
+_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# endpoint -> [calls, calls with a cache hit, prompt tokens, cached prompt tokens]
+_prompt_cache: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0, 0])
+
+openai_prompt_cache_hit_ratio = registry.gauge(
+    "openai_prompt_cache_hit_ratio", "Share of prompt tokens served from OpenAI's prompt cache", ("endpoint",))
+
+
+async def post_chat_completion(api_key: str, payload: dict, timeout: float) -> httpx.Response:
+    """
+    POST one chat completion. Network errors are re-raised unchanged so callers
+    keep their existing httpx.TimeoutException / httpx.RequestError handling.
+    Retryable statuses are retried up to OPENAI_MAX_RETRIES times with
+    exponential backoff; the final response is returned whatever its status.
+    The timeout is shrunk to the request deadline (see deadlines.py) and the
+    call waits for the tenant's fair share of capacity (see tenants.py).
+    """
+    model = str(payload.get("model", "unknown"))
+    async with fair_scheduler.slot(current_tenant.get(), cost=float(payload.get("max_tokens") or 1000)):
+        return await _post_with_retries(api_key, payload, timeout, model)
+
+
+async def _post_with_retries(api_key: str, payload: dict, timeout: float, model: str) -> httpx.Response:
+    attempt = 0
+
+    while True:
+        start = time.perf_counter()
+        try:
+            with span("openai.chat_completion", KIND_CLIENT, model=model, attempt=attempt) as sp:
+                headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+                if sp:
+                    headers["traceparent"] = sp.traceparent()
+                async with httpx.AsyncClient(timeout=timeout_within(timeout)) as client:
+                    resp = await client.post(OPENAI_URL, headers=headers, json=payload)
+                if sp:
+                    sp.set("http.status_code", resp.status_code)
+        except httpx.TimeoutException:
+            _record(model, "timeout", time.perf_counter() - start)
+            raise
+        except httpx.RequestError:
+            _record(model, "error", time.perf_counter() - start)
+            raise
+
+        _record(model, str(resp.status_code), time.perf_counter() - start)
+
+        backoff = 0.5 * (2 ** attempt)
+        left = remaining()
+        if (resp.status_code in _RETRYABLE_STATUSES and attempt < OPENAI_MAX_RETRIES
+                and (left is None or left > backoff + 1.0)):
+            attempt += 1
+            openai_retries_total.inc(model)
+            logger.warning("[OpenAI] HTTP %s — retry %s/%s in %.1fs", resp.status_code, attempt, OPENAI_MAX_RETRIES, backoff)
+            await asyncio.sleep(backoff)
+            continue
+
+        return resp
+
+
+def _record(model: str, status: str, elapsed: float) -> None:
+    openai_request_duration.observe(elapsed, model, status)
+    openai_requests_total.inc(model, status)
+
+
+def record_usage(model: str, data: dict) -> None:
+    """Count prompt / completion / cached tokens from a parsed completion body."""
+    usage: Optional[dict] = data.get("usage") if isinstance(data, dict) else None
+    if not usage:
+        return
+    endpoint = current_route.get()
+    prompt_tokens     = usage.get("prompt_tokens", 0) or 0
+    completion_tokens = usage.get("completion_tokens", 0) or 0
+    openai_tokens_total.inc(model, endpoint, "prompt", amount=prompt_tokens)
+    openai_tokens_total.inc(model, endpoint, "completion", amount=completion_tokens)
+    record_tokens(current_tenant.get(), prompt_tokens + completion_tokens)
+    details = usage.get("prompt_tokens_details") or {}
+    cached_tokens = details.get("cached_tokens", 0) or 0
+    openai_tokens_total.inc(model, endpoint, "cached", amount=cached_tokens)
+
+    stats = _prompt_cache[endpoint]
+    stats[0] += 1
+    stats[1] += 1 if cached_tokens else 0
+    stats[2] += prompt_tokens
+    stats[3] += cached_tokens
+    if stats[2]:
+        openai_prompt_cache_hit_ratio.set(endpoint, value=stats[3] / stats[2])
+
+
+def prompt_cache_stats() -> dict:
+    """Per-endpoint prompt-cache effectiveness since process start."""
+    return {
+        endpoint: {
+            "calls":          calls,
+            "calls_with_hit": hits,
+            "prompt_tokens":  prompt_tokens,
+            "cached_tokens":  cached_tokens,
+            "hit_ratio":      round(cached_tokens / prompt_tokens, 4) if prompt_tokens else None,
+        }
+        for endpoint, (calls, hits, prompt_tokens, cached_tokens) in sorted(_prompt_cache.items())
+    }
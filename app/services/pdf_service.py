@@ -5,8 +5,11 @@ Generates a styled HTML report and optionally converts it to PDF using WeasyPrin
 Falls back to returning HTML bytes if WeasyPrint is not installed.
 """
 import logging
+import time
 from datetime import datetime
 from app.models.schemas import ReportRequest
+from app.services.metrics import pdf_render_duration
+from app.services.tracing import span
 
 logger = logging.getLogger("creator_growth_ai")
 
@@ -228,17 +231,22 @@ def _build_html(req: ReportRequest) -> str:
 
 
 def generate_pdf_report(req: ReportRequest) -> bytes:
-    logger.info(f"[generate_pdf_report] generating for @{req.username}")
-    html = _build_html(req)
+    logger.info("[generate_pdf_report] generating for @%s", req.username)
+    start = time.perf_counter()
+    with span("report.build_html"):
+        html = _build_html(req)
 
     try:
         from weasyprint import HTML as WeasyHTML
-        pdf = WeasyHTML(string=html).write_pdf()
-        logger.info(f"[generate_pdf_report] ✅ PDF generated ({len(pdf)} bytes)")
+        with span("report.render_pdf", html_chars=len(html)):
+            pdf = WeasyHTML(string=html).write_pdf()
+        logger.info("[generate_pdf_report] ✅ PDF generated (%s bytes)", len(pdf))
+        pdf_render_duration.observe(time.perf_counter() - start, "pdf")
         return pdf
     except ImportError:
         logger.warning("[generate_pdf_report] WeasyPrint not installed — returning HTML")
-        return html.encode("utf-8")
     except Exception as exc:
-        logger.error(f"[generate_pdf_report] WeasyPrint error: {exc} — returning HTML fallback")
-        return html.encode("utf-8")
+        logger.error("[generate_pdf_report] WeasyPrint error: %s — returning HTML fallback", exc)
+
+    pdf_render_duration.observe(time.perf_counter() - start, "html")
+    return html.encode("utf-8")
@@ -0,0 +1,234 @@
+"""
+app/services/pipeline_service.py
+
+One-call creator pipeline: profile → insights, astrology, goals and the PDF
+report run server-side as a dependency graph instead of five client round
+trips.
+
+    profile ──► insights ──┐
+    astrology ─────────────┼──► report
+    goals ─────────────────┘   (goals waits for profile only when the
+                                request does not carry current_followers)
+
+Every stage starts the moment its dependencies settle, so end-to-end latency
+is the critical path, not the sum of the stages. run_pipeline() is an async
+generator of progress events (streamed as NDJSON by POST /pipeline); the last
+event carries per-stage timings, the critical path and the result ids of
+everything produced (see result_store.py). The request deadline is enforced
+between events too: once the NDJSON stream has started the middleware can no
+longer answer 504, so at the deadline the running stages are cancelled and
+the last event reports status "deadline_exceeded".
+"""
+import asyncio
+import base64
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+
+from app.models.schemas import (
+    AIInsightsRequest, AstrologyRequest, GoalRequest, PipelineRequest, ReportRequest,
+)
+from app.services import deadlines
+from app.services.astrology_corpus import astrology_corpus
+from app.services.goal_service import calculate_goal
+from app.services.metrics import registry
+from app.services.pdf_service import generate_pdf_report
+from app.services.profile_service import simulate_profile
+from app.services.request_context import current_route
+from app.services.result_store import result_store
+from app.services.speculation import speculator
+from app.services.tracing import span
+
+logger = logging.getLogger("creator_growth_ai")
+
+pipeline_stage_duration = registry.histogram(
+    "pipeline_stage_duration_seconds", "Duration of each /pipeline stage", ("stage", "status"))
+
+
+@dataclass
+class Stage:
+    name:     str
+    deps:     Tuple[str, ...]
+    run:      Callable[[Dict[str, Any]], Awaitable[Any]]
+    required: Tuple[str, ...] = ()   # deps whose failure skips this stage; others are best-effort
+
+
+def _build_stages(req: PipelineRequest) -> List[Stage]:
+    stages: List[Stage] = []
+
+    async def profile(_):
+        return await asyncio.to_thread(simulate_profile, req.social_url)
+    stages.append(Stage("profile", (), profile))
+
+    async def insights(results):
+        prof = results["profile"]
+        return await speculator.insights(AIInsightsRequest(
+            username=req.username or prof.username,
+            platform=prof.platform.value,
+            followers=prof.followers,
+            engagement_rate=prof.engagement_rate,
+            niche=req.niche,
+            goals=req.goals,
+            target_followers=req.target_followers,
+            timeline_months=req.timeline_months,
+        ))
+    stages.append(Stage("insights", ("profile",), insights, required=("profile",)))
+
+    if req.zodiac is not None and req.dob:
+        async def astrology(_):
+            return await astrology_corpus.astrology(AstrologyRequest(
+                dob=req.dob, time_of_birth=req.time_of_birth, zodiac=req.zodiac))
+        stages.append(Stage("astrology", (), astrology))
+
+    if req.target_followers:
+        deps = () if req.current_followers else ("profile",)
+
+        async def goals(results):
+            current = req.current_followers or results["profile"].followers
+            return calculate_goal(GoalRequest(
+                current_followers=current,
+                target_followers=req.target_followers,
+                timeline_months=req.timeline_months,
+                niche=req.niche or "general",
+                posting_frequency=req.posting_frequency,
+                platform=results["profile"].platform if deps else None,
+            ))
+        stages.append(Stage("goals", deps, goals, required=deps))
+
+    if req.include_report:
+        async def report(results):
+            sections = {
+                name: results[name].model_dump(mode="json")
+                for name in ("profile", "insights", "astrology", "goals") if name in results
+            }
+            username = req.username or results["profile"].username
+            content = await asyncio.to_thread(
+                generate_pdf_report, ReportRequest(username=username, **sections))
+            is_pdf = content[:4] == b"%PDF"
+            return {
+                "content_type": "application/pdf" if is_pdf else "text/html",
+                "filename":     f"growth_report_{username}.{'pdf' if is_pdf else 'html'}",
+                "content_b64":  base64.b64encode(content).decode("ascii"),
+            }
+        stages.append(Stage("report", tuple(s.name for s in stages), report, required=("profile",)))
+
+    return stages
+
+
+def _critical_path(stages: List[Stage], timings: Dict[str, dict]) -> List[str]:
+    """Walk back from the last stage to finish through whichever dependency finished last."""
+    by_name = {s.name: s for s in stages}
+    ran = {n: t for n, t in timings.items() if "end_ms" in t}
+    if not ran:
+        return []
+    path = [max(ran, key=lambda n: ran[n]["end_ms"])]
+    while True:
+        deps = [d for d in by_name[path[-1]].deps if d in ran]
+        if not deps:
+            break
+        path.append(max(deps, key=lambda n: ran[n]["end_ms"]))
+    return list(reversed(path))
+
+
+async def run_pipeline(req: PipelineRequest) -> AsyncIterator[Dict[str, Any]]:
+    stages  = _build_stages(req)
+    events: asyncio.Queue = asyncio.Queue()
+    results: Dict[str, Any] = {}
+    result_ids: Dict[str, str] = {}
+    timings: Dict[str, dict] = {}
+    settled: Dict[str, asyncio.Event] = {s.name: asyncio.Event() for s in stages}
+    failed: set = set()
+    t0 = time.perf_counter()
+
+    def ms() -> float:
+        return round((time.perf_counter() - t0) * 1000, 1)
+
+    async def execute(stage: Stage) -> None:
+        try:
+            for dep in stage.deps:
+                await settled[dep].wait()
+            blocked = [d for d in stage.required if d in failed]
+            if blocked:
+                failed.add(stage.name)
+                timings[stage.name] = {"status": "skipped"}
+                events.put_nowait({"event": "stage_skipped", "stage": stage.name,
+                                   "reason": f"dependency failed: {', '.join(blocked)}", "t_ms": ms()})
+                return
+
+            start = ms()
+            events.put_nowait({"event": "stage_start", "stage": stage.name, "t_ms": start})
+            status = "ok"
+            try:
+                with span(f"pipeline.{stage.name}"):
+                    result = await stage.run(results)
+                results[stage.name] = result
+                result_ids[stage.name] = await result_store.put(
+                    stage.name, result.model_dump(mode="json") if isinstance(result, BaseModel) else result)
+            except HTTPException as exc:
+                status = "error"
+                failed.add(stage.name)
+                error = {"status_code": exc.status_code, "detail": exc.detail}
+            except ValidationError as exc:
+                status = "error"
+                failed.add(stage.name)
+                error = {"status_code": 422, "detail": exc.errors(include_url=False, include_input=False)}
+            except Exception as exc:
+                status = "error"
+                failed.add(stage.name)
+                logger.error("[pipeline] stage %s failed: %s", stage.name, exc)
+                error = {"status_code": 500, "detail": str(exc)}
+            end = ms()
+            timings[stage.name] = {"status": status, "start_ms": start, "end_ms": end,
+                                   "duration_ms": round(end - start, 1)}
+            pipeline_stage_duration.observe((end - start) / 1000, stage.name, status)
+            if status == "ok":
+                events.put_nowait({"event": "stage_done", "stage": stage.name, "t_ms": end,
+                                   "duration_ms": timings[stage.name]["duration_ms"],
+                                   "result_id": result_ids[stage.name]})
+            else:
+                events.put_nowait({"event": "stage_error", "stage": stage.name, "t_ms": end,
+                                   "duration_ms": timings[stage.name]["duration_ms"], **error})
+        finally:
+            settled[stage.name].set()
+
+    tasks = [asyncio.create_task(execute(s)) for s in stages]
+    yield {"event": "pipeline_start", "stages": {s.name: list(s.deps) for s in stages}}
+    timed_out = False
+    try:
+        remaining = len(tasks)
+        while remaining:
+            try:
+                event = await asyncio.wait_for(events.get(), deadlines.remaining())
+            except asyncio.TimeoutError:
+                timed_out = True
+                break
+            if event["event"] in ("stage_done", "stage_error", "stage_skipped"):
+                remaining -= 1
+            yield event
+    finally:
+        # Client went away or the deadline hit — stop the stages still running
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    total = ms()
+    if timed_out:
+        for name in settled:
+            timings.setdefault(name, {"status": "cancelled"})
+        deadlines.request_aborts_total.inc(current_route.get(), "deadline")
+        logger.warning("[pipeline] %s hit its deadline after %.0fms", req.social_url, total)
+    else:
+        logger.info("[pipeline] %s finished in %.0fms", req.social_url, total)
+    yield {
+        "event":          "pipeline_done",
+        "status":         "deadline_exceeded" if timed_out else "error" if failed else "ok",
+        "total_ms":       total,
+        "sum_of_stages_ms": round(sum(t.get("duration_ms", 0.0) for t in timings.values()), 1),
+        "critical_path":  _critical_path(stages, timings),
+        "timings":        timings,
+        "result_ids":     result_ids,
+    }
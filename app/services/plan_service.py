@@ -0,0 +1,152 @@
+"""
+app/services/plan_service.py
+
+Lazy, paginated 30-day plan.
+
+Users read week 1 first, so the plan is not generated up front. POST /plans
+stores the creator context as the plan (its id is derived from the context,
+so the same creator asking again gets the same plan and its cached weeks) and
+generates week 1 only. The stored plan records its tenant; a plan id is
+unknown (404) to every other tenant, including through /results. GET /plans/{id}/weeks/{n} returns week n:
+  - already generated        → served from the result store (cached)
+  - being generated           → attaches to that call (inflight)
+  - not generated yet         → generated now (generated)
+Every page fetch then prefetches week n+1 in the background, so the next
+click is usually a cache hit.
+
+Each week is generated with the earlier weeks that already exist as context
+(to build on them without repeating tasks) and stored in the result store
+under "<plan id>.w<n>" for PLAN_TTL seconds. Prefetches run detached from the
+request, under the route label `prefetch:/plans`, and are skipped while
+OpenAI capacity is saturated by real requests.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from app.models.schemas import PlanRequest, PlanWeek
+from app.services import tracing
+from app.services.ai_service import PLAN_WEEK_DAYS, generate_plan_week
+from app.services.metrics import registry
+from app.services.request_context import current_route, current_tenant, request_deadline
+from app.services.result_store import result_store
+from app.services.tenants import fair_scheduler
+
+logger = logging.getLogger("creator_growth_ai")
+
+PLAN_TTL:      float = float(os.getenv("PLAN_TTL", str(7 * 24 * 3600)))
+PLAN_PREFETCH: bool  = os.getenv("PLAN_PREFETCH", "1").lower() in ("1", "true", "yes")
+
+PLAN_WEEKS     = len(PLAN_WEEK_DAYS)
+PREFETCH_ROUTE = "prefetch:/plans"
+PLAN_ID_PREFIX = "pln_"   # week ids are "<plan id>.w<n>", so they share it
+
+plan_weeks_total = registry.counter(
+    "plan_weeks_total", "Plan weeks served, by where they came from", ("source",))
+plan_prefetch_total = registry.counter(
+    "plan_prefetch_total", "Next-week prefetches", ("outcome",))
+
+
+def plan_id_for(req: PlanRequest) -> str:
+    """Deterministic plan id for a creator context (per tenant)."""
+    digest = hashlib.sha256(f"{current_tenant.get()}|{req.model_dump_json()}".encode("utf-8")).hexdigest()
+    return f"{PLAN_ID_PREFIX}{digest[:24]}"
+
+
+def _week_id(plan_id: str, week: int) -> str:
+    return f"{plan_id}.w{week}"
+
+
+class PlanService:
+    def __init__(self):
+        self._inflight: Dict[str, "asyncio.Task[PlanWeek]"] = {}
+
+    async def create(self, req: PlanRequest) -> str:
+        plan_id = plan_id_for(req)
+        if await self.context(plan_id) is None:
+            await result_store.put("plan", {"tenant": current_tenant.get(), "request": req.model_dump(mode="json")},
+                                   ttl=PLAN_TTL, result_id=plan_id)
+        return plan_id
+
+    async def context(self, plan_id: str) -> Optional[PlanRequest]:
+        """The plan's creator context, or None when it does not exist for the current tenant."""
+        data = await result_store.get(plan_id, kind="plan")
+        if not isinstance(data, dict) or data.get("tenant") != current_tenant.get():
+            return None
+        return PlanRequest(**data["request"])
+
+    async def _stored(self, plan_id: str, week: int) -> Optional[PlanWeek]:
+        data = await result_store.get(_week_id(plan_id, week), kind="plan_week")
+        return PlanWeek(**data) if data is not None else None
+
+    async def _generate(self, plan_id: str, week: int, req: PlanRequest) -> PlanWeek:
+        stored = await self._stored(plan_id, week)
+        if stored is not None:
+            return stored
+        previous: List[PlanWeek] = []
+        for earlier in range(1, week):
+            prev = await self._stored(plan_id, earlier)
+            if prev is not None:
+                previous.append(prev)
+        result = await generate_plan_week(req, week, previous)
+        await result_store.put("plan_week", result, ttl=PLAN_TTL, result_id=_week_id(plan_id, week))
+        return result
+
+    def _launch(self, plan_id: str, week: int, req: PlanRequest, detached: bool) -> "asyncio.Task[PlanWeek]":
+        key    = _week_id(plan_id, week)
+        parent = tracing.current_traceparent()
+
+        async def run() -> PlanWeek:
+            if not detached:
+                return await self._generate(plan_id, week, req)
+            # Prefetch: no request deadline, own trace, tokens labelled as prefetch
+            request_deadline.set(None)
+            current_route.set(PREFETCH_ROUTE)
+            root, token = tracing.start_trace(PREFETCH_ROUTE, parent)
+            try:
+                return await self._generate(plan_id, week, req)
+            finally:
+                tracing.finish_trace(root, token)
+
+        task = asyncio.create_task(run())
+        self._inflight[key] = task
+
+        def finished(t: asyncio.Task) -> None:
+            if self._inflight.get(key) is t:
+                del self._inflight[key]
+            if not t.cancelled() and t.exception() is not None:
+                logger.info("[plans] week %d of %s failed: %s", week, plan_id, t.exception())
+
+        task.add_done_callback(finished)
+        return task
+
+    def prefetch(self, plan_id: str, week: int, req: PlanRequest) -> None:
+        """Start generating `week` in the background unless it is running or OpenAI is saturated."""
+        if not PLAN_PREFETCH or week > PLAN_WEEKS or _week_id(plan_id, week) in self._inflight:
+            return
+        if fair_scheduler.active >= fair_scheduler.capacity:
+            plan_prefetch_total.inc("skipped")
+            return
+        plan_prefetch_total.inc("launched")
+        self._launch(plan_id, week, req, detached=True)
+
+    async def week(self, plan_id: str, week: int, req: PlanRequest) -> Tuple[PlanWeek, str]:
+        """Week `week` of the plan and where it came from; prefetches the following week."""
+        result = await self._stored(plan_id, week)
+        if result is not None:
+            source = "cached"
+        else:
+            task = self._inflight.get(_week_id(plan_id, week))
+            source = "inflight" if task is not None else "generated"
+            if task is None:
+                task = self._launch(plan_id, week, req, detached=False)
+            # shield: a disconnecting client must not cancel a week others may be waiting on
+            result = await asyncio.shield(task)
+        plan_weeks_total.inc(source)
+        self.prefetch(plan_id, week + 1, req)
+        return result, source
+
+
+plan_service = PlanService()
@@ -8,13 +8,21 @@ NOTE: Real scraping requires platform API access + auth which is beyond scope.
 """
 import random
 import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 import requests
 import re
 import os
 from fastapi import HTTPException
 
 from app.models.schemas import Platform, TopPost, ProfileAnalysisResponse
+from app.services.columnar import ROWS, shape
+from app.services.deadlines import timeout_within
+from app.services.tracing import KIND_CLIENT, current_traceparent, span
 
 logger = logging.getLogger("creator_growth_ai")
 
@@ -61,7 +69,7 @@ def extract_username(url: str) -> str:
             username = clean_seg
             break
 
-    logger.info(f"[extract_username] {url!r} → {username!r}")
+    logger.info("[extract_username] %r → %r", url, username)
     return username
 
 
@@ -104,20 +112,232 @@ def _platform_engagement_rate(platform: Platform, rng: random.Random) -> float:
     return round(rng.uniform(lo, hi), 2)
 
 
-def simulate_profile(url: str) -> ProfileAnalysisResponse:
+# ─────────────────────────────────────────────
+# Upstream page cache with conditional revalidation
+# ─────────────────────────────────────────────
+PROFILE_CACHE_TTL:  float = float(os.getenv("PROFILE_CACHE_TTL", "900"))
+PROFILE_STORE_PATH: str   = os.getenv("PROFILE_STORE_PATH", "profile_cache.sqlite3")
+
+_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+@dataclass
+class CachedPage:
+    """Numbers extracted from one upstream page plus its validator headers."""
+    etag:          Optional[str]
+    last_modified: Optional[str]
+    followers:     int
+    following:     int
+    total_posts:   int
+    total_views:   int
+    fetched_at:    float
+
+
+class _ProfileStore:
+    """
+    Compact on-disk store of previously extracted numbers, keyed by URL.
+    Only the handful of integers and the ETag / Last-Modified validators are
+    kept — never the HTML — so a few thousand creators fit in a few hundred KB.
+    An in-memory mirror serves reads; SQLite is only touched on writes and on
+    the first read of a URL after a restart.
+    """
+
+    def __init__(self, path: str):
+        self._path   = path
+        self._lock   = threading.Lock()
+        self._memory: Dict[str, CachedPage] = {}
+        self._conn:   Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and self._path:
+            try:
+                self._conn = sqlite3.connect(self._path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS pages ("
+                    " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,"
+                    " followers INTEGER, following INTEGER, total_posts INTEGER,"
+                    " total_views INTEGER, fetched_at REAL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as exc:
+                logger.warning("[profile_store] disabled on-disk cache: %s", exc)
+                self._path = ""
+                self._conn = None
+        return self._conn
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            page = self._memory.get(url)
+            if page is not None:
+                return page
+            conn = self._connect()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT etag, last_modified, followers, following, total_posts,"
+                " total_views, fetched_at FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            page = CachedPage(*row)
+            self._memory[url] = page
+            return page
+
+    def put(self, url: str, page: CachedPage) -> None:
+        with self._lock:
+            self._memory[url] = page
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, page.etag, page.last_modified, page.followers, page.following,
+                 page.total_posts, page.total_views, page.fetched_at),
+            )
+            conn.commit()
+
+
+_store = _ProfileStore(PROFILE_STORE_PATH)
+
+
+def _extract_youtube(html: str) -> tuple[int, int, int]:
+    followers = total_posts = total_views = 0
+
+    # Flexible regex for subscribers and videos, allowing characters in between
+    sub_match = re.search(r'(\d+(?:\.\d+)?[KMB]?) subscribers.*?(?:• )?(\d+(?:\.\d+)?[KMB]?) videos', html, re.DOTALL)
+    if sub_match:
+        followers = parse_number(sub_match.group(1))
+        total_posts = parse_number(sub_match.group(2))
+
+    # Views regex, allowing for '•'
+    views_match = re.search(r'• ([\d,]+) views', html)
+    if views_match:
+        total_views = int(views_match.group(1).replace(',', ''))
+
+    logger.info("[youtube_extract] followers=%d posts=%d views=%d", followers, total_posts, total_views)
+    return followers, total_posts, total_views
+
+
+def _extract_instagram(html: str) -> tuple[int, int, int]:
+    followers = following = total_posts = 0
+
+    # Updated regex to handle numbers with commas, decimals, and suffixes like M, K
+    meta_match = re.search(r'<meta property="og:description" content="([\d,.]+[KMB]?) Followers, ([\d,.]+[KMB]?) Following, ([\d,.]+[KMB]?) Posts', html)
+    if meta_match:
+        followers = parse_number(meta_match.group(1))
+        following = parse_number(meta_match.group(2))
+        total_posts = parse_number(meta_match.group(3))
+
+    logger.info("[instagram_extract] followers=%d following=%d posts=%d", followers, following, total_posts)
+    return followers, following, total_posts
+
+
+def fetch_profile_page(url: str, platform: Platform, force: bool = False) -> CachedPage:
+    """
+    Return the extracted numbers for a YouTube / Instagram profile.
+
+    Within PROFILE_CACHE_TTL the stored numbers are returned without touching
+    the network. After that the page is revalidated with If-None-Match /
+    If-Modified-Since; a 304 just bumps fetched_at and reuses the stored
+    numbers, so unchanged profiles cost a header round trip instead of a full
+    HTML download and regex pass. `force=True` skips the TTL check but still
+    revalidates conditionally.
+    """
+    cached = _store.get(url)
+    now = time.time()
+    if cached and not force and now - cached.fetched_at < PROFILE_CACHE_TTL:
+        logger.info("[fetch_profile_page] fresh cache hit for %r", url)
+        return cached
+
+    fetch_url = url.rstrip('/') + '/about' if platform == Platform.youtube else url
+    headers = dict(_HEADERS)
+    if cached:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    with span("profile.http_get", KIND_CLIENT, conditional=bool(cached)) as sp:
+        traceparent = current_traceparent()
+        if traceparent:
+            headers["traceparent"] = traceparent
+        response = requests.get(fetch_url, headers=headers, timeout=timeout_within(10))
+        if sp:
+            sp.set("http.status_code", response.status_code)
+            sp.set("bytes", len(response.content))
+
+    if response.status_code == 304 and cached:
+        logger.info("[fetch_profile_page] 304 not modified for %r", url)
+        cached = replace(cached, fetched_at=now)
+        _store.put(url, cached)
+        return cached
+
+    response.raise_for_status()
+    html = response.text
+
+    following = 0
+    total_views = 0
+    with span("profile.extract", platform=platform.value):
+        if platform == Platform.youtube:
+            followers, total_posts, total_views = _extract_youtube(html)
+        else:
+            followers, following, total_posts = _extract_instagram(html)
+
+    if followers == 0:
+        raise ValueError("Failed to extract data")
+
+    page = CachedPage(
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        followers=followers,
+        following=following,
+        total_posts=total_posts,
+        total_views=total_views,
+        fetched_at=now,
+    )
+    _store.put(url, page)
+    return page
+
+
+def growth_columns(followers: int, engagement_rate: float, rng: random.Random,
+                   weeks: int = 25) -> Dict[str, List]:
+    """
+    Weekly growth series ending this week, as columns. Draws continue from the
+    profile's `rng` in the original per-week order (engagement, views,
+    growth), so rows and columnar carry the same values and rows are
+    unchanged from the per-row loop this replaced.
+    """
+    base_date = datetime.now() - timedelta(weeks=weeks - 1)
+    columns: Dict[str, List] = {"week": [], "followers": [], "engagement": [], "views": []}
+    current = float(followers) * 0.70
+    for w in range(weeks):
+        columns["week"].append((base_date + timedelta(weeks=w)).strftime("%b %d"))
+        columns["followers"].append(int(current))
+        columns["engagement"].append(round(rng.uniform(engagement_rate * 0.6, engagement_rate * 1.4), 2))
+        columns["views"].append(int(current * rng.uniform(2.0, 7.0)))
+        current *= (1 + rng.uniform(0.003, 0.045))
+    return columns
+
+
+def simulate_profile(url: str, fmt: str = ROWS) -> ProfileAnalysisResponse:
     """
     Fetches real data for YouTube and Instagram by parsing HTML DOM.
     Falls back to simulation for other platforms.
+    `fmt` selects the growth_data shape (see columnar.py).
     """
-    logger.info(f"[simulate_profile] url={url!r}")
+    with span("simulate_profile"):
+        return _simulate_profile(url, fmt)
+
+
+def _simulate_profile(url: str, fmt: str = ROWS) -> ProfileAnalysisResponse:
+    logger.info("[simulate_profile] url=%r", url)
 
     platform = detect_platform(url)
     username = extract_username(url)
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-
     followers = 0
     following = 0
     total_posts = 0
@@ -125,51 +345,22 @@ def simulate_profile(url: str) -> ProfileAnalysisResponse:
 
     if platform == Platform.youtube:
         try:
-            about_url = url.rstrip('/') + '/about'
-            response = requests.get(about_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            html = response.text
-
-            # Flexible regex for subscribers and videos, allowing characters in between
-            sub_match = re.search(r'(\d+(?:\.\d+)?[KMB]?) subscribers.*?(?:• )?(\d+(?:\.\d+)?[KMB]?) videos', html, re.DOTALL)
-            if sub_match:
-                followers = parse_number(sub_match.group(1))
-                total_posts = parse_number(sub_match.group(2))
-
-            # Views regex, allowing for '•'
-            views_match = re.search(r'• ([\d,]+) views', html)
-            if views_match:
-                total_views = int(views_match.group(1).replace(',', ''))
-
-            logger.info(f"[youtube_extract] followers={followers:,} posts={total_posts:,} views={total_views:,}")
-
-            if followers == 0:
-                raise ValueError("Failed to extract data")
-
+            page = fetch_profile_page(url, platform)
+            followers, total_posts, total_views = page.followers, page.total_posts, page.total_views
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"YouTube extraction failed: {e}")
+            logger.error("YouTube extraction failed: %s", e)
             raise HTTPException(status_code=500, detail="Failed to extract YouTube data")
 
     elif platform == Platform.instagram:
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            html = response.text
-
-            # Updated regex to handle numbers with commas, decimals, and suffixes like M, K
-            meta_match = re.search(r'<meta property="og:description" content="([\d,.]+[KMB]?) Followers, ([\d,.]+[KMB]?) Following, ([\d,.]+[KMB]?) Posts', html)
-            if meta_match:
-                followers = parse_number(meta_match.group(1))
-                following = parse_number(meta_match.group(2))
-                total_posts = parse_number(meta_match.group(3))
-
-            logger.info(f"[instagram_extract] followers={followers:,} following={following:,} posts={total_posts:,}")
-
-            if followers == 0:
-                raise ValueError("Failed to extract data")
-
+            page = fetch_profile_page(url, platform)
+            followers, following, total_posts = page.followers, page.following, page.total_posts
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Instagram extraction failed: {e}")
+            logger.error("Instagram extraction failed: %s", e)
             raise HTTPException(status_code=500, detail="Failed to extract Instagram data")
 
     else:
@@ -223,19 +414,9 @@ def simulate_profile(url: str) -> ProfileAnalysisResponse:
     ]
 
     # Simulate growth data
-    base_date = datetime.now() - timedelta(weeks=24)
-    growth_data = []
-    current = float(followers) * 0.70
-    for w in range(25):
-        growth_data.append({
-            "week":       (base_date + timedelta(weeks=w)).strftime("%b %d"),
-            "followers":  int(current),
-            "engagement": round(rng.uniform(engagement_rate * 0.6, engagement_rate * 1.4), 2),
-            "views":      int(current * rng.uniform(2.0, 7.0)),
-        })
-        current *= (1 + rng.uniform(0.003, 0.045))
+    growth_data = shape(growth_columns(followers, engagement_rate, rng), fmt)
 
-    logger.info(f"[simulate_profile] ✅ returning profile for @{username}")
+    logger.info("[simulate_profile] ✅ returning profile for @%s", username)
 
     return ProfileAnalysisResponse(
         platform=platform,
@@ -0,0 +1,127 @@
+"""
+app/services/profiler.py
+
+Opt-in, per-request statistical CPU profiler.
+
+Enabled with PROFILING_ENABLED=1. A request is profiled only when it carries
+the `X-Profile` header (matching PROFILING_TOKEN if one is set) and the
+per-minute budget allows it. A daemon thread samples the event-loop thread's
+stack every PROFILING_INTERVAL_MS and the result is saved as a collapsed-stack
+file (`frame;frame;frame count` — loads directly in speedscope or
+flamegraph.pl) to a bounded PROFILING_DIR.
+
+When disabled the middleware never calls into this module, so the cost is a
+single boolean check per request.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Deque, Optional
+
+logger = logging.getLogger("creator_growth_ai")
+
+PROFILING_ENABLED:     bool  = os.getenv("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILING_TOKEN:       str   = os.getenv("PROFILING_TOKEN", "").strip()
+PROFILING_DIR:         str   = os.getenv("PROFILING_DIR", "profiles")
+PROFILING_MAX_FILES:   int   = int(os.getenv("PROFILING_MAX_FILES", "50"))
+PROFILING_PER_MINUTE:  int   = int(os.getenv("PROFILING_PER_MINUTE", "6"))
+PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "2"))
+
+PROFILE_HEADER = "x-profile"
+
+_recent_starts: Deque[float] = deque()
+_budget_lock = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack on a fixed interval from a daemon thread.
+    Other coroutines sharing the loop thread show up too — the output is a
+    statistical picture of what the loop was doing while this request ran.
+    """
+
+    def __init__(self, route: str, interval: float):
+        self.route       = route
+        self.interval    = interval
+        self.samples: Counter = Counter()
+        self._target_id  = threading.get_ident()
+        self._stop       = threading.Event()
+        self._started    = time.perf_counter()
+        # Named up front so the response headers can point at it; the file is
+        # written once the body has been sent
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        self.filename    = f"{int(time.time() * 1000)}-{slug}.collapsed"
+        self._thread     = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> float:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        return time.perf_counter() - self._started
+
+    def save(self, elapsed: float) -> Optional[str]:
+        """Write the collapsed stacks and prune old files. Blocking — run off-loop."""
+        if not self.samples:
+            return None
+        directory = Path(PROFILING_DIR)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / self.filename
+            path.write_text(
+                "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common()),
+                encoding="utf-8",
+            )
+            files = sorted(directory.glob("*.collapsed"))
+            for old in files[:max(0, len(files) - PROFILING_MAX_FILES)]:
+                old.unlink(missing_ok=True)
+            logger.info("[profiler] saved %s samples over %.0fms to %s",
+                        sum(self.samples.values()), elapsed * 1000, path)
+            return path.name
+        except OSError as exc:
+            logger.warning("[profiler] could not save profile: %s", exc)
+            return None
+
+
+def _take_budget() -> bool:
+    now = time.monotonic()
+    with _budget_lock:
+        while _recent_starts and now - _recent_starts[0] > 60.0:
+            _recent_starts.popleft()
+        if len(_recent_starts) >= PROFILING_PER_MINUTE:
+            return False
+        _recent_starts.append(now)
+        return True
+
+
+def maybe_start(headers, route: str) -> Optional[StackSampler]:
+    """Start a sampler if this request asked for one and is allowed to have it."""
+    value = headers.get(PROFILE_HEADER)
+    if not value:
+        return None
+    if PROFILING_TOKEN and value != PROFILING_TOKEN:
+        return None
+    if not _take_budget():
+        logger.info("[profiler] budget exhausted — not profiling %s", route)
+        return None
+    return StackSampler(route, PROFILING_INTERVAL_MS / 1000.0)
@@ -0,0 +1,254 @@
+"""
+app/services/refresh_scheduler.py
+
+Background refresher for watched creator profiles.
+Keeps the upstream page cache in profile_service warm so that user-facing
+/analyze-profile lookups for watched creators almost never pay the scrape
+latency inline.
+
+- Watched URLs sit in a min-heap ordered by their next due time.
+- Each profile's interval shrinks as it gets requested more often
+  (exponentially decayed request rate) and is jittered to avoid thundering herds.
+- All refreshes run under one global concurrency limit and a token-bucket rate.
+- A URL has at most one refresh in flight and at most one live heap entry:
+  re-watching it while a refresh runs leaves rescheduling to that refresh.
+"""
+import asyncio
+import heapq
+import logging
+import math
+import os
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from app.models.schemas import Platform
+from app.services.profile_service import PROFILE_CACHE_TTL, detect_platform, fetch_profile_page
+
+logger = logging.getLogger("creator_growth_ai")
+
+REFRESH_BASE_INTERVAL: float = float(os.getenv("REFRESH_BASE_INTERVAL", str(PROFILE_CACHE_TTL * 0.8)))
+REFRESH_MIN_INTERVAL:  float = float(os.getenv("REFRESH_MIN_INTERVAL",  str(PROFILE_CACHE_TTL * 0.25)))
+REFRESH_MAX_INTERVAL:  float = float(os.getenv("REFRESH_MAX_INTERVAL",  str(PROFILE_CACHE_TTL * 4)))
+REFRESH_JITTER:        float = float(os.getenv("REFRESH_JITTER", "0.2"))
+REFRESH_CONCURRENCY:   int   = int(os.getenv("REFRESH_CONCURRENCY", "8"))
+REFRESH_RATE:          float = float(os.getenv("REFRESH_RATE", "5"))   # refreshes / second
+
+_RATE_HALF_LIFE = 3600.0          # request-rate memory, seconds
+_HOT_REQUESTS_PER_HOUR = 60.0     # at this rate the interval is halved
+
+
+class _DecayingRate:
+    """Exponentially decayed event counter → approximate events per hour."""
+
+    __slots__ = ("value", "updated")
+
+    def __init__(self) -> None:
+        self.value   = 0.0
+        self.updated = time.monotonic()
+
+    def _decay(self, now: float) -> None:
+        self.value  *= math.exp(-(now - self.updated) * math.log(2) / _RATE_HALF_LIFE)
+        self.updated = now
+
+    def hit(self) -> None:
+        self._decay(time.monotonic())
+        self.value += 1.0
+
+    def per_hour(self) -> float:
+        self._decay(time.monotonic())
+        # Steady state of a decayed counter is rate * half_life / ln2
+        return self.value * math.log(2) / _RATE_HALF_LIFE * 3600.0
+
+
+class ProfileRefresher:
+    def __init__(
+        self,
+        base_interval: float = REFRESH_BASE_INTERVAL,
+        min_interval:  float = REFRESH_MIN_INTERVAL,
+        max_interval:  float = REFRESH_MAX_INTERVAL,
+        jitter:        float = REFRESH_JITTER,
+        concurrency:   int   = REFRESH_CONCURRENCY,
+        rate:          float = REFRESH_RATE,
+    ):
+        self.base_interval = base_interval
+        self.min_interval  = min_interval
+        self.max_interval  = max_interval
+        self.jitter        = jitter
+        self.concurrency   = max(1, concurrency)
+        self.rate          = max(0.01, rate)
+
+        self._heap:  List[Tuple[float, str]] = []
+        self._due:   Dict[str, float] = {}
+        self._rates: Dict[str, _DecayingRate] = {}
+        self._refreshing: Set[str] = set()
+        self._rng    = random.Random()
+
+        self._task:      Optional[asyncio.Task] = None
+        self._wakeup:    Optional[asyncio.Event] = None
+        self._sem:       Optional[asyncio.Semaphore] = None
+        self._next_slot  = 0.0
+
+        self._in_flight       = 0
+        self._refreshes_total = 0
+        self._failures_total  = 0
+        self._lag_last        = 0.0
+        self._lag_max         = 0.0
+        self._lag_ewma        = 0.0
+        self._completed: Deque[float] = deque(maxlen=10_000)
+
+    # ── Watchlist ────────────────────────────────────────────────
+    def watch(self, url: str) -> None:
+        if detect_platform(url) not in (Platform.youtube, Platform.instagram):
+            raise ValueError("Only YouTube and Instagram profiles are fetched upstream")
+        self._rates.setdefault(url, _DecayingRate())
+        if url in self._refreshing and url not in self._due:
+            # Unwatched and re-watched mid-refresh: its completion reschedules it
+            self._due[url] = time.monotonic()
+        elif url not in self._due:
+            # First refresh soon, spread out so a bulk import doesn't burst
+            self._schedule(url, time.monotonic() + self._rng.uniform(0, self.min_interval))
+        logger.info("[refresher] watching %r (%s total)", url, len(self._due))
+
+    def unwatch(self, url: str) -> bool:
+        self._rates.pop(url, None)
+        removed = self._due.pop(url, None) is not None
+        if removed:
+            logger.info("[refresher] unwatched %r", url)
+        return removed
+
+    def watched(self) -> List[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "social_url":        url,
+                "requests_per_hour": round(self._rates[url].per_hour(), 2),
+                "next_refresh_in":   round(max(0.0, due - now), 1),
+            }
+            for url, due in sorted(self._due.items(), key=lambda kv: kv[1])
+        ]
+
+    def record_request(self, url: str) -> None:
+        """Called on every user-facing lookup; only watched URLs are tracked."""
+        rate = self._rates.get(url)
+        if rate is not None:
+            rate.hit()
+
+    # ── Scheduling ───────────────────────────────────────────────
+    def _interval(self, url: str) -> float:
+        rate = self._rates.get(url)
+        per_hour = rate.per_hour() if rate else 0.0
+        interval = self.base_interval / (1.0 + per_hour / _HOT_REQUESTS_PER_HOUR)
+        interval = max(self.min_interval, min(self.max_interval, interval))
+        return interval * self._rng.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def _schedule(self, url: str, due: float) -> None:
+        self._due[url] = due
+        heapq.heappush(self._heap, (due, url))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _take_rate_slot(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None and self._sem is not None
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            due, url = self._heap[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            if self._due.get(url) != due or url in self._refreshing:
+                continue  # unwatched, rescheduled or already refreshing — stale heap entry
+
+            await self._take_rate_slot()
+            await self._sem.acquire()
+            if self._due.get(url) != due:
+                self._sem.release()
+                continue  # unwatched (and maybe re-watched) while waiting for a slot
+
+            lag = time.monotonic() - due
+            self._lag_last = lag
+            self._lag_max  = max(self._lag_max, lag)
+            self._lag_ewma = lag if not self._refreshes_total else 0.9 * self._lag_ewma + 0.1 * lag
+
+            self._in_flight += 1
+            self._refreshing.add(url)
+            asyncio.create_task(self._refresh(url))
+
+    async def _refresh(self, url: str) -> None:
+        assert self._sem is not None
+        try:
+            await asyncio.to_thread(fetch_profile_page, url, detect_platform(url), True)
+            self._completed.append(time.monotonic())
+        except Exception as exc:
+            self._failures_total += 1
+            logger.warning("[refresher] refresh failed for %r: %s", url, exc)
+        finally:
+            self._refreshes_total += 1
+            self._in_flight -= 1
+            self._refreshing.discard(url)
+            self._sem.release()
+            if url in self._due:
+                self._schedule(url, time.monotonic() + self._interval(url))
+
+    # ── Lifecycle ────────────────────────────────────────────────
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._sem    = asyncio.Semaphore(self.concurrency)
+        self._task   = asyncio.create_task(self._run())
+        logger.info(
+            "[refresher] started concurrency=%s rate=%s/s interval=%.0f-%.0fs",
+            self.concurrency, self.rate, self.min_interval, self.max_interval,
+        )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # ── Observability ────────────────────────────────────────────
+    def stats(self) -> dict:
+        now = time.monotonic()
+        overdue = [now - due for url, due in self._due.items() if due <= now and url not in self._refreshing]
+        recent = sum(1 for t in self._completed if now - t <= 60.0)
+        return {
+            "running":              self._task is not None,
+            "watched":              len(self._due),
+            "in_flight":            self._in_flight,
+            "queue_depth":          len(overdue),
+            "queue_lag_seconds":    round(max(overdue, default=0.0), 3),
+            "dispatch_lag_last":    round(self._lag_last, 3),
+            "dispatch_lag_ewma":    round(self._lag_ewma, 3),
+            "dispatch_lag_max":     round(self._lag_max, 3),
+            "refreshes_total":      self._refreshes_total,
+            "failures_total":       self._failures_total,
+            "refreshes_per_minute": recent,
+        }
+
+
+refresher = ProfileRefresher()
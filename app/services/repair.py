@@ -0,0 +1,231 @@
+"""
+app/services/repair.py
+
+Salvage OpenAI completions instead of discarding them.
+
+A multi-thousand-token completion that is missing one key, or has one value of
+the wrong shape, used to become a 502 and a full retry by the user. Instead:
+
+  parse_json()          strips code fences and, when json.loads fails, salvages
+                        the object — trailing commas are dropped and a
+                        truncated completion is cut back to its last complete
+                        top-level member (the cut field is then repaired)
+  validate_or_repair()  validates once; on failure it takes the top-level fields
+                        named in the ValidationError, asks OpenAI for those
+                        fields only (the original conversation plus the valid
+                        fields as the assistant's answer), merges them and
+                        validates again
+
+Repairs are counted per endpoint and outcome, together with the tokens the
+original completion kept and the tokens the repair call cost.
+"""
+import json
+import logging
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Type, TypeVar, Union
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+
+from app.services.metrics import registry
+from app.services.request_context import current_route
+from app.services.serialization import validate
+from app.services.tracing import span
+
+logger = logging.getLogger("creator_growth_ai")
+
+AI_REPAIR_ENABLED:    bool = os.getenv("AI_REPAIR_ENABLED", "1").lower() in ("1", "true", "yes")
+AI_REPAIR_MAX_TOKENS: int  = int(os.getenv("AI_REPAIR_MAX_TOKENS", "1500"))
+
+M = TypeVar("M", bound=BaseModel)
+
+# call(messages, max_tokens=..., usage=...) -> parsed JSON dict
+Caller = Callable[..., Awaitable[dict]]
+
+ai_json_salvaged_total = registry.counter(
+    "ai_json_salvaged_total", "Malformed OpenAI JSON run through the tolerant parser", ("endpoint", "outcome"))
+ai_repairs_total = registry.counter(
+    "ai_repairs_total", "Follow-up calls regenerating missing or invalid fields", ("endpoint", "outcome"))
+ai_repair_fields_total = registry.counter(
+    "ai_repair_fields_total", "Fields regenerated by a repair call", ("endpoint", "field"))
+ai_repair_tokens_total = registry.counter(
+    "ai_repair_tokens_total",
+    "Tokens around repairs: completion tokens kept from the original call, and the repair call's own usage",
+    ("endpoint", "kind"))
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _strip_fences(raw: str) -> str:
+    cleaned = raw.strip()
+    if cleaned.startswith("```"):
+        lines   = cleaned.split("\n")
+        cleaned = "\n".join(lines[1:-1]) if lines[-1].strip() == "```" else "\n".join(lines[1:])
+    return cleaned
+
+
+def _close_truncated(text: str) -> Optional[str]:
+    """Cut an unterminated object back to its last complete top-level member."""
+    depth, in_string, escaped, last_member_end = 0, False, False, None
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return None                # balanced — not a truncation
+        elif ch == "," and depth == 1:
+            last_member_end = i
+    if last_member_end is None:
+        return None
+    return text[:last_member_end] + "}"
+
+
+def _salvage(cleaned: str) -> Optional[dict]:
+    start = cleaned.find("{")
+    if start < 0:
+        return None
+    end = cleaned.rfind("}")
+    candidates = [cleaned[start:end + 1]] if end > start else []
+    truncated = _close_truncated(cleaned[start:])
+    if truncated is not None:
+        candidates.append(truncated)
+    for candidate in candidates:
+        for text in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+            try:
+                data = json.loads(text)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(data, dict):
+                return data
+    return None
+
+
+def parse_json(raw: str) -> Any:
+    """json.loads with code fences stripped and a tolerant fallback; ValueError when unsalvageable."""
+    cleaned = _strip_fences(raw)
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError as exc:
+        data = _salvage(cleaned)
+        outcome = "salvaged" if data is not None else "failed"
+        ai_json_salvaged_total.inc(current_route.get(), outcome)
+        if data is None:
+            raise ValueError(str(exc)) from exc
+        logger.warning("[repair] salvaged malformed JSON (%s): kept %d keys", exc, len(data))
+        return data
+
+
+def _broken_fields(exc: ValidationError) -> Dict[str, str]:
+    broken: Dict[str, str] = {}
+    for err in exc.errors():
+        loc = err.get("loc") or ()
+        if not loc or not isinstance(loc[0], str):
+            continue
+        field, path = loc[0], ".".join(str(p) for p in loc[1:])
+        if field in broken:
+            continue
+        if err["type"] == "missing" and not path:
+            broken[field] = "missing"
+        else:
+            broken[field] = f"{path}: {err['msg']}" if path else err["msg"]
+    return broken
+
+
+def _repair_messages(messages: list, valid: dict, broken: Dict[str, str]) -> list:
+    listing = "\n".join(f"- {field}: {reason}" for field, reason in broken.items())
+    return [
+        *messages,
+        {"role": "assistant", "content": json.dumps(valid, ensure_ascii=False)},
+        {"role": "user", "content": (
+            "Your JSON above is incomplete. These fields are missing or invalid:\n"
+            f"{listing}\n\n"
+            "Respond ONLY with a JSON object containing exactly these keys, following the "
+            "structure from the instructions and consistent with the fields you already wrote."
+        )},
+    ]
+
+
+async def validate_or_repair(
+    model:    Type[M],
+    data:     Any,
+    messages: Union[list, Callable[[Dict[str, str]], list]],
+    call:     Caller,
+    usage:    Optional[dict] = None,
+    prepare:  Optional[Callable[[dict], dict]] = None,
+    required: Iterable[str] = (),
+) -> M:
+    """
+    Validate `data` (after `prepare`, which adds or normalises server-side
+    fields); if fields are missing or invalid, regenerate just those with one
+    follow-up call and merge. Raises 502 when the response cannot be repaired.
+    `messages` is the original conversation, or a function of the broken
+    fields returning the context to resend (e.g. to leave out an image).
+    `usage` is the original call's usage block, for the token counters.
+    `required` names fields the model declares optional but this call must
+    produce; a null or absent one is repaired like a missing field.
+    """
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=502, detail=f"OpenAI returned JSON {type(data).__name__}, not an object")
+    prepare  = prepare or (lambda d: d)
+    required = tuple(required)
+    prepared = prepare(data)
+    broken = {field: "missing" for field in required if prepared.get(field) is None}
+    error: Any = f"missing {sorted(broken)}"
+    try:
+        result = validate(model, prepared)
+        if not broken:
+            return result
+    except ValidationError as exc:
+        broken.update(_broken_fields(exc))
+        error = exc
+
+    endpoint = current_route.get()
+    if not broken or not AI_REPAIR_ENABLED:
+        raise HTTPException(status_code=502, detail=f"OpenAI response failed validation: {error}")
+
+    valid = {k: v for k, v in data.items() if k not in broken}
+    logger.info("[repair] %s: regenerating %s", endpoint, sorted(broken))
+    for field in broken:
+        ai_repair_fields_total.inc(endpoint, field)
+
+    if callable(messages):
+        messages = messages(broken)
+    repair_usage: dict = {}
+    try:
+        with span("repair", fields=",".join(broken)):
+            fixed = await call(_repair_messages(messages, valid, broken),
+                               max_tokens=AI_REPAIR_MAX_TOKENS, usage=repair_usage)
+        merged = {**valid, **{k: fixed[k] for k in broken if isinstance(fixed, dict) and k in fixed}}
+        prepared = prepare(merged)
+        still_missing = [field for field in required if prepared.get(field) is None]
+        if still_missing:
+            raise HTTPException(status_code=502, detail=f"OpenAI response still missing {still_missing} after repair")
+        result = validate(model, prepared)
+    except (HTTPException, ValidationError) as exc:
+        ai_repairs_total.inc(endpoint, "failed")
+        logger.warning("[repair] %s: repair failed: %s", endpoint, exc)
+        if isinstance(exc, HTTPException):
+            raise
+        raise HTTPException(status_code=502, detail=f"OpenAI response failed validation after repair: {exc}")
+    finally:
+        ai_repair_tokens_total.inc(endpoint, "repair_prompt", amount=repair_usage.get("prompt_tokens", 0) or 0)
+        ai_repair_tokens_total.inc(endpoint, "repair_completion",
+                                   amount=repair_usage.get("completion_tokens", 0) or 0)
+
+    kept = (usage or {}).get("completion_tokens", 0) or 0
+    ai_repairs_total.inc(endpoint, "repaired")
+    ai_repair_tokens_total.inc(endpoint, "original_completion", amount=kept)
+    logger.info("[repair] %s: repaired %d fields for %s completion tokens (kept %s)",
+                endpoint, len(broken), repair_usage.get("completion_tokens", "?"), kept)
+    return result
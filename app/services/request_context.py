@@ -0,0 +1,18 @@
+"""
+app/services/request_context.py
+
+Request-scoped context shared between the HTTP middleware and the services.
+Set once per request in main.timing_middleware; contextvars propagate into
+every task the request spawns, so services can label metrics without having
+the route threaded through their signatures.
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+current_route: ContextVar[str] = ContextVar("current_route", default="-")
+
+# Absolute loop-clock (time.monotonic) deadline for the current request, if any
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+# Tenant resolved from X-API-Key (see tenants.py)
+current_tenant: ContextVar[str] = ContextVar("current_tenant", default="public")
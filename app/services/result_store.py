@@ -0,0 +1,157 @@
+"""
+app/services/result_store.py
+
+Compact local store for endpoint results, addressed by short result ids.
+
+Profile, AI and goal responses are saved here and their id is returned in the
+`X-Result-Id` response header, so /generate-report can take ids instead of
+clients echoing tens of KB of JSON back to the server.
+
+- SQLite file (RESULT_STORE_PATH), one row per result, JSON payload zlib-compressed
+- Writes are write-behind: put() returns the id at once, the row is written in
+  a worker thread, and reads see pending writes from memory in the meantime
+- Rows expire after RESULT_TTL_SECONDS; a background job deletes expired rows
+  and reclaims pages with incremental vacuum every RESULT_COMPACT_INTERVAL
+"""
+import asyncio
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+logger = logging.getLogger("creator_growth_ai")
+
+RESULT_STORE_PATH:       str   = os.getenv("RESULT_STORE_PATH", "results.sqlite3")
+RESULT_TTL_SECONDS:      float = float(os.getenv("RESULT_TTL_SECONDS", str(24 * 3600)))
+RESULT_COMPACT_INTERVAL: float = float(os.getenv("RESULT_COMPACT_INTERVAL", "600"))
+
+_KIND_PREFIX = {
+    "profile":   "prf",
+    "insights":  "ins",
+    "astrology": "ast",
+    "palm":      "plm",
+    "goals":     "gol",
+    "creator":   "cra",
+    "report":    "rpt",
+    "plan":      "pln",
+    "plan_week": "plw",
+}
+
+
+class ResultStore:
+    def __init__(self, path: str = RESULT_STORE_PATH, ttl: float = RESULT_TTL_SECONDS):
+        self.path = path
+        self.ttl  = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, Tuple[str, Any, float]] = {}
+        self._tasks:   Set[asyncio.Task] = set()
+        self._compactor: Optional[asyncio.Task] = None
+
+    # ── SQLite (worker threads only) ─────────────────────────────
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path or ":memory:", check_same_thread=False)
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload BLOB NOT NULL,"
+                " created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_expiry ON results (expires_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _write(self, result_id: str, kind: str, data: Any, expires_at: float) -> None:
+        blob = zlib.compress(json.dumps(data, separators=(",", ":"), default=str).encode("utf-8"), 6)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (result_id, kind, blob, time.time(), expires_at),
+            )
+            conn.commit()
+
+    def _read(self, result_id: str) -> Optional[Tuple[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT kind, payload, expires_at FROM results WHERE id = ?", (result_id,)
+            ).fetchone()
+        if row is None or row[2] < time.time():
+            return None
+        return row[0], json.loads(zlib.decompress(row[1]))
+
+    def _compact(self) -> int:
+        with self._lock:
+            conn = self._connect()
+            deleted = conn.execute("DELETE FROM results WHERE expires_at < ?", (time.time(),)).rowcount
+            conn.commit()
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.commit()
+        return deleted
+
+    # ── Async API ────────────────────────────────────────────────
+    async def put(self, kind: str, result: Any, ttl: Optional[float] = None,
+                  result_id: Optional[str] = None) -> str:
+        """Store a result; `result_id` replaces the generated id for callers with a deterministic key."""
+        data = result.model_dump(mode="json") if isinstance(result, BaseModel) else result
+        result_id  = result_id or f"{_KIND_PREFIX.get(kind, 'res')}_{secrets.token_urlsafe(12)}"
+        expires_at = time.time() + (ttl or self.ttl)
+        self._pending[result_id] = (kind, data, expires_at)
+
+        async def flush():
+            try:
+                await asyncio.to_thread(self._write, result_id, kind, data, expires_at)
+            except sqlite3.Error as exc:
+                logger.error("[result_store] write failed for %s: %s", result_id, exc)
+            finally:
+                self._pending.pop(result_id, None)
+
+        task = asyncio.create_task(flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return result_id
+
+    async def get(self, result_id: str, kind: Optional[str] = None) -> Optional[Any]:
+        """Stored payload for an id, or None if unknown, expired or of another kind."""
+        pending = self._pending.get(result_id)
+        if pending is not None:
+            found: Optional[Tuple[str, Any]] = (pending[0], pending[1]) if pending[2] >= time.time() else None
+        else:
+            found = await asyncio.to_thread(self._read, result_id)
+        if found is None or (kind is not None and found[0] != kind):
+            return None
+        return found[1]
+
+    async def _compact_forever(self) -> None:
+        while True:
+            await asyncio.sleep(RESULT_COMPACT_INTERVAL)
+            try:
+                deleted = await asyncio.to_thread(self._compact)
+                if deleted:
+                    logger.info("[result_store] compacted %s expired results", deleted)
+            except sqlite3.Error as exc:
+                logger.error("[result_store] compaction failed: %s", exc)
+
+    def start(self) -> None:
+        if self._compactor is None:
+            self._compactor = asyncio.create_task(self._compact_forever())
+
+    async def stop(self) -> None:
+        if self._compactor is not None:
+            self._compactor.cancel()
+            self._compactor = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+result_store = ResultStore()
@@ -0,0 +1,91 @@
+"""
+app/services/serialization.py
+
+Fast response path for the large AI responses.
+
+By default FastAPI validates a returned model a second time against
+`response_model` and serializes it through jsonable_encoder + json.dumps.
+For CreatorAnalysisResponse (tens of KB of nested lists) that doubles the
+per-request CPU spent after OpenAI has already answered.
+
+Instead:
+  - services validate the OpenAI dict exactly once with a TypeAdapter built
+    at import (validate())
+  - endpoints return render(request, model), a ready Response that FastAPI
+    passes through untouched — `response_model` stays on the route for the
+    OpenAPI schema only
+  - JSON is produced by orjson from the model's Rust-side model_dump(); the
+    stdlib encoder is the fallback when orjson is not installed
+  - clients sending `Accept: application/msgpack` get MessagePack instead
+
+scripts/bench_serialization.py compares the paths on maximum-size responses.
+"""
+import json
+import logging
+from typing import Any, Dict, Mapping, Optional, Type, TypeVar
+
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.models.schemas import AIInsightsResponse, AstrologyResponse, PalmAnalysisResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional format
+    msgpack = None
+
+logger = logging.getLogger("creator_growth_ai")
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+M = TypeVar("M", bound=BaseModel)
+
+_adapters: Dict[type, TypeAdapter] = {}
+
+
+def register(model: Type[M]) -> TypeAdapter:
+    """Build (once) the validator for a response model."""
+    adapter = _adapters.get(model)
+    if adapter is None:
+        adapter = _adapters[model] = TypeAdapter(model)
+    return adapter
+
+
+for _model in (AIInsightsResponse, AstrologyResponse, PalmAnalysisResponse):
+    register(_model)
+
+
+def validate(model: Type[M], data: Mapping[str, Any]) -> M:
+    """The single validation pass for an OpenAI payload."""
+    return register(model).validate_python(data)
+
+
+def dumps(model: BaseModel) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(model.model_dump())
+    return model.model_dump_json().encode("utf-8")
+
+
+def wants_msgpack(request: Request) -> bool:
+    accept = request.headers.get("accept", "")
+    return msgpack is not None and any(t in accept for t in MSGPACK_TYPES)
+
+
+def render(request: Request, model: BaseModel, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serialized response for an already-validated model, negotiated on Accept."""
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if wants_msgpack(request):
+        body = msgpack.packb(model.model_dump(mode="json"), use_bin_type=True)
+        return Response(content=body, media_type="application/msgpack", headers=headers)
+    return Response(content=dumps(model), media_type="application/json", headers=headers)
+
+
+def stdlib_dumps(model: BaseModel) -> bytes:
+    """What FastAPI's default path amounts to — kept for the benchmark."""
+    return json.dumps(model.model_dump(mode="json"), ensure_ascii=False,
+                      allow_nan=False, separators=(",", ":")).encode("utf-8")
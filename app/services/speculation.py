@@ -0,0 +1,200 @@
+"""
+app/services/speculation.py
+
+Speculative prefetch of AI insights after /analyze-profile.
+
+Almost every profile analysis is followed by /generate-ai-insights with the
+same numbers. With SPECULATION_ENABLED=1, /analyze-profile starts that
+insights generation in the background as soon as it has its response; the
+result sits in a short-lived cache (SPECULATION_TTL seconds) keyed by the
+exact AIInsightsRequest the frontend will send (username, platform,
+followers, engagement rate, default niche/goals). The follow-up request then
+  - finds it ready           → served without an OpenAI call (hit_ready)
+  - finds it still running   → attaches to the in-flight call (hit_inflight)
+  - finds nothing / a failure → generates normally (miss)
+
+Budget: at most SPECULATION_MAX_INFLIGHT speculative calls at once, at most
+SPECULATION_PER_HOUR launches per hour, and none while OpenAI capacity is
+already saturated by real requests. Speculative calls run under the route
+label `speculative:/generate-ai-insights`, so their tokens are visible
+separately in openai_tokens_total; `speculation_outcomes_total` and
+`speculation_wasted_total` show whether the spend pays for itself.
+"""
+import asyncio
+import functools
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional, Set
+
+from app.models.schemas import AIInsightsRequest, AIInsightsResponse, ProfileAnalysisResponse
+from app.services import tracing
+from app.services.insights_cache import insights_cache
+from app.services.metrics import registry
+from app.services.request_context import current_route, current_tenant, request_deadline
+from app.services.tenants import fair_scheduler
+
+logger = logging.getLogger("creator_growth_ai")
+
+SPECULATION_ENABLED:      bool  = os.getenv("SPECULATION_ENABLED", "").lower() in ("1", "true", "yes")
+SPECULATION_TTL:          float = float(os.getenv("SPECULATION_TTL", "120"))
+SPECULATION_MAX_INFLIGHT: int   = int(os.getenv("SPECULATION_MAX_INFLIGHT", "4"))
+SPECULATION_PER_HOUR:     int   = int(os.getenv("SPECULATION_PER_HOUR", "200"))
+
+SPECULATIVE_ROUTE = "speculative:/generate-ai-insights"
+
+speculation_launched_total = registry.counter(
+    "speculation_launched_total", "Speculative insights generations started")
+speculation_skipped_total = registry.counter(
+    "speculation_skipped_total", "Speculative generations not started", ("reason",))
+speculation_outcomes_total = registry.counter(
+    "speculation_outcomes_total", "Insights requests by speculation outcome", ("outcome",))
+speculation_wasted_total = registry.counter(
+    "speculation_wasted_total", "Speculative results that expired without being used")
+
+
+@dataclass
+class _Entry:
+    task:       "asyncio.Task[AIInsightsResponse]"
+    expires_at: float
+    used:       bool = False
+
+
+@dataclass
+class _Counts:
+    launched: int = 0
+    used:     int = 0
+    wasted:   int = 0
+    outcomes: Dict[str, int] = field(default_factory=lambda: {"hit_ready": 0, "hit_inflight": 0, "miss": 0})
+
+
+def _key(req: AIInsightsRequest) -> str:
+    return f"{current_tenant.get()}|{req.model_dump_json()}"
+
+
+class Speculator:
+    def __init__(self):
+        self._entries:  Dict[str, _Entry] = {}
+        self._launches: Deque[float] = deque()
+        self._inflight: Set[asyncio.Task] = set()
+        self.counts = _Counts()
+
+    def _purge(self, now: float) -> None:
+        for key in [k for k, e in self._entries.items() if e.expires_at < now]:
+            entry = self._entries.pop(key)
+            if not entry.used:
+                # A still-running call is left to finish (requests may be
+                # attached to it); it simply is not offered to new ones
+                self.counts.wasted += 1
+                speculation_wasted_total.inc()
+
+    def _skip_reason(self, now: float) -> Optional[str]:
+        while self._launches and now - self._launches[0] > 3600.0:
+            self._launches.popleft()
+        if len(self._inflight) >= SPECULATION_MAX_INFLIGHT:
+            return "inflight_cap"
+        if SPECULATION_PER_HOUR and len(self._launches) >= SPECULATION_PER_HOUR:
+            return "hourly_budget"
+        if fair_scheduler.active >= fair_scheduler.capacity:
+            return "openai_saturated"
+        return None
+
+    def after_profile(self, profile: ProfileAnalysisResponse) -> None:
+        """Start insights for the request the frontend is about to make. Never blocks."""
+        if not SPECULATION_ENABLED:
+            return
+        req = AIInsightsRequest(
+            username=profile.username,
+            platform=profile.platform.value,
+            followers=profile.followers,
+            engagement_rate=profile.engagement_rate,
+        )
+        key = _key(req)
+        now = time.monotonic()
+        self._purge(now)
+        if key in self._entries:
+            return
+        reason = self._skip_reason(now)
+        if reason is not None:
+            speculation_skipped_total.inc(reason)
+            return
+
+        parent = tracing.current_traceparent()
+
+        async def speculate() -> AIInsightsResponse:
+            # Runs detached from the profile request: no deadline, own trace,
+            # tokens labelled as speculative
+            request_deadline.set(None)
+            current_route.set(SPECULATIVE_ROUTE)
+            root, token = tracing.start_trace(SPECULATIVE_ROUTE, parent)
+            try:
+                return await insights_cache.insights(req)
+            finally:
+                tracing.finish_trace(root, token)
+
+        task = asyncio.create_task(speculate())
+        self._inflight.add(task)
+        task.add_done_callback(functools.partial(self._finished, key))
+        self._entries[key] = _Entry(task, now + SPECULATION_TTL)
+        self._launches.append(now)
+        self.counts.launched += 1
+        speculation_launched_total.inc()
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.discard(task)
+        if task.cancelled() or task.exception() is not None:
+            # Drop it now so the next profile analysis can relaunch, rather than
+            # every follow-up missing on a dead entry until the TTL expires
+            entry = self._entries.get(key)
+            if entry is not None and entry.task is task:
+                del self._entries[key]
+            if not task.cancelled():
+                logger.info("[speculation] prefetch failed: %s", task.exception())
+
+    async def insights(self, req: AIInsightsRequest) -> AIInsightsResponse:
+        """Insights for req, served from a speculative result when one matches."""
+        if SPECULATION_ENABLED:
+            self._purge(time.monotonic())
+            entry = self._entries.get(_key(req))
+            if entry is not None and not (entry.task.done() and (entry.task.cancelled() or entry.task.exception())):
+                outcome = "hit_ready" if entry.task.done() else "hit_inflight"
+                try:
+                    # shield: a disconnecting client must not cancel a shared result
+                    result = await asyncio.shield(entry.task)
+                except Exception:
+                    pass   # the speculative call failed while we waited — fall back below
+                else:
+                    if not entry.used:
+                        entry.used = True
+                        self.counts.used += 1
+                    self._record(outcome)
+                    return result
+            self._record("miss")
+        return await insights_cache.insights(req)
+
+    def _record(self, outcome: str) -> None:
+        self.counts.outcomes[outcome] += 1
+        speculation_outcomes_total.inc(outcome)
+
+    def stats(self) -> dict:
+        hits  = self.counts.outcomes["hit_ready"] + self.counts.outcomes["hit_inflight"]
+        total = hits + self.counts.outcomes["miss"]
+        return {
+            "enabled":      SPECULATION_ENABLED,
+            "ttl_s":        SPECULATION_TTL,
+            "max_inflight": SPECULATION_MAX_INFLIGHT,
+            "per_hour":     SPECULATION_PER_HOUR,
+            "inflight":     len(self._inflight),
+            "cached":       len(self._entries),
+            "launched":     self.counts.launched,
+            "used":         self.counts.used,
+            "wasted":       self.counts.wasted,
+            "outcomes":     dict(self.counts.outcomes),
+            "hit_rate":     round(hits / total, 4) if total else None,
+            "used_ratio":   round(self.counts.used / self.counts.launched, 4) if self.counts.launched else None,
+        }
+
+
+speculator = Speculator()
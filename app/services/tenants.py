@@ -0,0 +1,236 @@
+"""
+app/services/tenants.py
+
+Tenant identification, budgets and weighted fair sharing of OpenAI capacity.
+
+Tenants are identified by the `X-API-Key` header:
+  TENANT_KEYS="key1:agency_a:3,key2:agency_b:1:200000:30"
+  → api_key:tenant[:weight[:tokens_per_hour[:requests_per_minute]]]
+Requests without a known key run as the "public" tenant (weight 1) unless
+TENANT_REQUIRE_KEY=1, in which case they get 401.
+
+Every OpenAI call passes through FairScheduler.slot(): at most
+OPENAI_MAX_CONCURRENCY calls are in flight, and waiting calls are released in
+weighted-fair-queueing order (smallest virtual finish time, cost = requested
+max_tokens / tenant weight). A tenant submitting a bulk run only queues
+behind itself; other tenants keep getting their weighted share. Each tenant's
+waiters form a FIFO and only its head is tagged and in the heap; the tenant's
+virtual finish advances when a call is granted, so waiters that give up
+(client disconnect, deadline) cost their tenant nothing.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.services.metrics import registry
+
+logger = logging.getLogger("creator_growth_ai")
+
+PUBLIC_TENANT = "public"
+
+OPENAI_MAX_CONCURRENCY:      int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+TENANT_REQUIRE_KEY:         bool = os.getenv("TENANT_REQUIRE_KEY", "").lower() in ("1", "true", "yes")
+TENANT_TOKENS_PER_HOUR:      int = int(os.getenv("TENANT_TOKENS_PER_HOUR", "0"))       # 0 = unlimited
+TENANT_REQUESTS_PER_MINUTE:  int = int(os.getenv("TENANT_REQUESTS_PER_MINUTE", "0"))   # 0 = unlimited
+
+tenant_wait = registry.histogram(
+    "tenant_openai_wait_seconds", "Time an OpenAI call waited for fair-share capacity", ("tenant",))
+tenant_tokens_total = registry.counter(
+    "tenant_tokens_total", "OpenAI tokens consumed per tenant", ("tenant",))
+tenant_rejected_total = registry.counter(
+    "tenant_rejected_total", "OpenAI calls refused for exceeding a tenant budget", ("tenant", "budget"))
+
+
+@dataclass
+class Tenant:
+    name:                str
+    weight:              float = 1.0
+    tokens_per_hour:     int   = TENANT_TOKENS_PER_HOUR
+    requests_per_minute: int   = TENANT_REQUESTS_PER_MINUTE
+
+    # runtime accounting
+    last_finish:   float = 0.0
+    active:        int   = 0
+    queued:        int   = 0
+    requests:      int   = 0
+    tokens:        int   = 0
+    wait_total:    float = 0.0
+    wait_max:      float = 0.0
+    _recent_requests: Deque[float]             = field(default_factory=deque, repr=False)
+    _recent_tokens:   Deque[Tuple[float, int]] = field(default_factory=deque, repr=False)
+    _waiters: Deque[Tuple[float, asyncio.Future]] = field(default_factory=deque, repr=False)
+
+    def tokens_last_hour(self, now: float) -> int:
+        while self._recent_tokens and now - self._recent_tokens[0][0] > 3600.0:
+            self._recent_tokens.popleft()
+        return sum(t for _, t in self._recent_tokens)
+
+    def requests_last_minute(self, now: float) -> int:
+        while self._recent_requests and now - self._recent_requests[0] > 60.0:
+            self._recent_requests.popleft()
+        return len(self._recent_requests)
+
+
+def _load_tenants() -> Tuple[Dict[str, str], Dict[str, Tenant]]:
+    keys: Dict[str, str] = {}
+    tenants: Dict[str, Tenant] = {PUBLIC_TENANT: Tenant(PUBLIC_TENANT)}
+    for item in filter(None, (p.strip() for p in os.getenv("TENANT_KEYS", "").split(","))):
+        parts = item.split(":")
+        if len(parts) < 2:
+            logger.warning("[tenants] ignoring malformed TENANT_KEYS entry")
+            continue
+        try:
+            tenant = Tenant(
+                name=parts[1],
+                weight=float(parts[2]) if len(parts) > 2 and parts[2] else 1.0,
+                tokens_per_hour=int(parts[3]) if len(parts) > 3 and parts[3] else TENANT_TOKENS_PER_HOUR,
+                requests_per_minute=int(parts[4]) if len(parts) > 4 and parts[4] else TENANT_REQUESTS_PER_MINUTE,
+            )
+        except ValueError:
+            logger.warning("[tenants] ignoring malformed TENANT_KEYS entry for tenant %r", parts[1])
+            continue
+        keys[parts[0]] = tenant.name
+        tenants[tenant.name] = tenant
+    return keys, tenants
+
+
+_api_keys, _tenants = _load_tenants()
+
+
+def resolve_tenant(api_key: Optional[str]) -> Optional[str]:
+    """Tenant name for an API key; None means the request must be refused."""
+    if api_key and api_key in _api_keys:
+        return _api_keys[api_key]
+    return None if TENANT_REQUIRE_KEY else PUBLIC_TENANT
+
+
+class FairScheduler:
+    def __init__(self, capacity: int = OPENAI_MAX_CONCURRENCY):
+        self.capacity = max(1, capacity)
+        self.active   = 0
+        self.virtual_time = 0.0
+        self._heap: List[Tuple[float, int, float, Tenant, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def _check_budget(self, tenant: Tenant, now: float) -> None:
+        if tenant.requests_per_minute and tenant.requests_last_minute(now) >= tenant.requests_per_minute:
+            tenant_rejected_total.inc(tenant.name, "requests")
+            raise HTTPException(status_code=429, detail=f"Request budget for tenant '{tenant.name}' exhausted. Retry in a minute.")
+        if tenant.tokens_per_hour and tenant.tokens_last_hour(now) >= tenant.tokens_per_hour:
+            tenant_rejected_total.inc(tenant.name, "tokens")
+            raise HTTPException(status_code=429, detail=f"Hourly token budget for tenant '{tenant.name}' exhausted.")
+
+    def _tags(self, tenant: Tenant, cost: float) -> Tuple[float, float]:
+        start_tag = max(self.virtual_time, tenant.last_finish)
+        return start_tag, start_tag + max(1.0, cost) / tenant.weight
+
+    def _grant(self, tenant: Tenant, start_tag: float, finish_tag: float) -> None:
+        self.virtual_time  = max(self.virtual_time, start_tag)
+        tenant.last_finish = finish_tag
+        self.active += 1
+
+    def _push_head(self, tenant: Tenant) -> None:
+        """Tag the tenant's oldest waiter and put it in the heap."""
+        if tenant._waiters:
+            cost, fut = tenant._waiters[0]
+            start_tag, finish_tag = self._tags(tenant, cost)
+            heapq.heappush(self._heap, (finish_tag, next(self._seq), start_tag, tenant, fut))
+
+    def _dispatch(self) -> None:
+        while self._heap and self.active < self.capacity:
+            finish_tag, _, start_tag, tenant, fut = heapq.heappop(self._heap)
+            if fut.done():
+                continue   # cancelled head; the next waiter was already pushed
+            tenant._waiters.popleft()
+            self._grant(tenant, start_tag, finish_tag)
+            fut.set_result(None)
+            self._push_head(tenant)
+
+    @asynccontextmanager
+    async def slot(self, tenant_name: str, cost: float) -> AsyncIterator[None]:
+        tenant = _tenants.get(tenant_name) or _tenants[PUBLIC_TENANT]
+        now = time.monotonic()
+        self._check_budget(tenant, now)
+
+        waited = 0.0
+        if self.active < self.capacity and not self._heap and not tenant._waiters:
+            self._grant(tenant, *self._tags(tenant, cost))
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            tenant._waiters.append((cost, fut))
+            if len(tenant._waiters) == 1:
+                self._push_head(tenant)
+            tenant.queued += 1
+            self._dispatch()
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self.active -= 1
+                    self._dispatch()
+                else:
+                    was_head = tenant._waiters[0][1] is fut
+                    tenant._waiters.remove((cost, fut))
+                    if was_head:
+                        self._push_head(tenant)
+                        self._dispatch()
+                raise
+            finally:
+                tenant.queued -= 1
+            waited = time.monotonic() - now
+
+        tenant.active   += 1
+        tenant.requests += 1
+        tenant._recent_requests.append(now)
+        tenant.wait_total += waited
+        tenant.wait_max    = max(tenant.wait_max, waited)
+        tenant_wait.observe(waited, tenant.name)
+        try:
+            yield
+        finally:
+            tenant.active -= 1
+            self.active   -= 1
+            self._dispatch()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "capacity": self.capacity,
+            "active":   self.active,
+            "queued":   sum(t.queued for t in _tenants.values()),
+            "tenants": {
+                t.name: {
+                    "weight":               t.weight,
+                    "active":               t.active,
+                    "queued":               t.queued,
+                    "requests":             t.requests,
+                    "tokens":               t.tokens,
+                    "tokens_last_hour":     t.tokens_last_hour(now),
+                    "requests_last_minute": t.requests_last_minute(now),
+                    "tokens_per_hour":      t.tokens_per_hour or None,
+                    "requests_per_minute":  t.requests_per_minute or None,
+                    "avg_wait_s":           round(t.wait_total / t.requests, 4) if t.requests else 0.0,
+                    "max_wait_s":           round(t.wait_max, 4),
+                }
+                for t in _tenants.values()
+            },
+        }
+
+
+def record_tokens(tenant_name: str, tokens: int) -> None:
+    tenant = _tenants.get(tenant_name) or _tenants[PUBLIC_TENANT]
+    tenant.tokens += tokens
+    tenant._recent_tokens.append((time.monotonic(), tokens))
+    tenant_tokens_total.inc(tenant.name, amount=tokens)
+
+
+fair_scheduler = FairScheduler()
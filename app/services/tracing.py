@@ -0,0 +1,227 @@
+"""
+app/services/tracing.py
+
+Lightweight in-process request tracing.
+- One trace per HTTP request, rooted in main.timing_middleware
+- `with span("stage"):` anywhere below it records a timed child span;
+  outside a request (background jobs) spans are no-ops
+- W3C `traceparent` is honoured on the way in and injected on the way out
+- A request's trace is finished once its response body has been sent, so
+  spans from work done while streaming (pipeline.*) stay under its root
+- Finished traces go into a bounded ring buffer served by GET /debug/traces
+- Optionally each trace is also written as an OTLP/JSON file to TRACE_EXPORT_DIR
+"""
+import json
+import logging
+import os
+import re
+import secrets
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("creator_growth_ai")
+
+TRACE_BUFFER_SIZE:      int = int(os.getenv("TRACE_BUFFER_SIZE", "256"))
+TRACE_EXPORT_DIR:       str = os.getenv("TRACE_EXPORT_DIR", "").strip()
+TRACE_EXPORT_MAX_FILES: int = int(os.getenv("TRACE_EXPORT_MAX_FILES", "500"))
+
+SERVICE_NAME = "astroforge-ai"
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER   = 2
+KIND_CLIENT   = 3
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind",
+                 "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str],
+                 kind: int = KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+        self.trace      = trace
+        self.span_id    = secrets.token_hex(8)
+        self.parent_id  = parent_id
+        self.name       = name
+        self.kind       = kind
+        self.start_ns   = time.time_ns()
+        self.end_ns     = 0
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "span_id":     self.span_id,
+            "parent_id":   self.parent_id,
+            "name":        self.name,
+            "start_ms":    round((self.start_ns - self.trace.root.start_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes":  self.attributes,
+            "error":       self.error,
+        }
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId":           self.trace.trace_id,
+            "spanId":            self.span_id,
+            "name":              self.name,
+            "kind":              self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano":   str(self.end_ns),
+            "attributes":        [_otlp_attr(k, v) for k, v in self.attributes.items()],
+            "status":            {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class Trace:
+    __slots__ = ("trace_id", "root", "spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.root: Span = None  # type: ignore[assignment]
+
+    def summary(self, with_spans: bool = True) -> dict:
+        out = {
+            "trace_id":    self.trace_id,
+            "name":        self.root.name,
+            "duration_ms": round(self.root.duration_ms, 3),
+            "attributes":  self.root.attributes,
+            "error":       self.root.error,
+        }
+        if with_spans:
+            out["spans"] = [s.to_dict() for s in sorted(self.spans, key=lambda s: s.start_ns)]
+        return out
+
+    def to_otlp(self) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attr("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.services.tracing"},
+                    "spans": [s.to_otlp() for s in self.spans],
+                }],
+            }]
+        }
+
+
+def _otlp_attr(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_recent: Deque[Trace] = deque(maxlen=TRACE_BUFFER_SIZE)
+
+
+def parse_traceparent(header: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Return (trace_id, parent_span_id) from a W3C traceparent header, or (None, None)."""
+    if not header:
+        return None, None
+    m = _TRACEPARENT_RE.match(header.strip().lower())
+    if not m or m.group(1) == "0" * 32 or m.group(2) == "0" * 16:
+        return None, None
+    return m.group(1), m.group(2)
+
+
+def current_traceparent() -> Optional[str]:
+    """Header value to propagate to upstream calls made inside the current span."""
+    current = _current_span.get()
+    return current.traceparent() if current else None
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace.trace_id if current else None
+
+
+def start_trace(name: str, traceparent: Optional[str] = None,
+                **attributes: Any) -> Tuple[Span, Token]:
+    trace_id, parent_id = parse_traceparent(traceparent)
+    trace = Trace(trace_id or secrets.token_hex(16))
+    root = Span(trace, name, parent_id, KIND_SERVER, attributes)
+    trace.root = root
+    trace.spans.append(root)
+    return root, _current_span.set(root)
+
+
+def finish_trace(root: Span, token: Optional[Token] = None) -> Trace:
+    """End the root span and publish the trace; without `token`, detach() has already run."""
+    root.end_ns = time.time_ns()
+    if token is not None:
+        _current_span.reset(token)
+    _recent.append(root.trace)
+    return root.trace
+
+
+def detach(token: Token) -> None:
+    """Stop treating the root span as current here; the trace stays open until finish_trace."""
+    _current_span.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes: Any) -> Iterator[Optional[Span]]:
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(parent.trace, name, parent.span_id, kind, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = f"{type(exc).__name__}: {exc}"[:300]
+        raise
+    finally:
+        child.end_ns = time.time_ns()
+        _current_span.reset(token)
+        parent.trace.spans.append(child)
+
+
+def slowest_traces(limit: int = 20, route: Optional[str] = None) -> List[dict]:
+    traces = [t for t in list(_recent) if route is None or t.root.attributes.get("http.route") == route]
+    traces.sort(key=lambda t: t.root.duration_ms, reverse=True)
+    return [t.summary() for t in traces[:limit]]
+
+
+def export_trace(trace: Trace) -> None:
+    """Write one trace as OTLP/JSON and keep at most TRACE_EXPORT_MAX_FILES files. Blocking — run off-loop."""
+    if not TRACE_EXPORT_DIR:
+        return
+    try:
+        directory = Path(TRACE_EXPORT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{trace.root.start_ns}-{trace.trace_id}.json"
+        path.write_text(json.dumps(trace.to_otlp(), default=str), encoding="utf-8")
+
+        files = sorted(directory.glob("*.json"))
+        for old in files[:max(0, len(files) - TRACE_EXPORT_MAX_FILES)]:
+            old.unlink(missing_ok=True)
+    except OSError as exc:
+        logger.warning("[tracing] export failed: %s", exc)
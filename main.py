@@ -8,9 +8,14 @@ uvicorn main:app --reload --host 0.0.0.0 --port 8000
 
 from typing import Optional
 
-from fastapi import FastAPI, Form, HTTPException, UploadFile, File, Request
+from fastapi import FastAPI, Form, HTTPException, UploadFile, File, Path, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
+from starlette.routing import Match
+import asyncio
+import base64
+import hashlib
+import json
 import logging
 import time
 from io import BytesIO
@@ -27,26 +32,45 @@ from app.models.schemas import (
     AstrologyRequest, AstrologyResponse,
     PalmAnalysisResponse,
     GoalRequest, GoalResponse,
-    ReportRequest
+    GoalSolveRequest, GoalSolveResponse,
+    ReportRequest,
+    PipelineRequest,
+    PlanRequest, PlanResponse,
 )
 
 # ---- Services ----
 from app.services.profile_service import simulate_profile
-from app.services.ai_service import generate_insights, generate_astrology, analyze_palm_image
-from app.services.goal_service import calculate_goal
+from app.services.ai_service import generate_insights, analyze_palm_image
+from app.services.goal_service import calculate_goal, solve_goal
 from app.services.pdf_service import generate_pdf_report
+from app.services.pipeline_service import run_pipeline
+from app.services.plan_service import PLAN_ID_PREFIX, PLAN_WEEKS, plan_service
+from app.services.refresh_scheduler import refresher
+from app.services.loop_monitor import loop_monitor
+from app.services.metrics import registry, http_request_duration, http_requests_in_flight, upload_size_bytes
+from app.services.request_context import current_route, current_tenant
+from app.services.tenants import PUBLIC_TENANT, fair_scheduler, resolve_tenant
+from app.services.result_store import result_store
+from app.services.speculation import speculator
+from app.services.insights_cache import insights_cache
+from app.services.astrology_corpus import astrology_corpus, month_key
+from app.services.serialization import render, wants_msgpack
+from app.services.compression import CompressionMiddleware, astrology_cache, report_cache
+from app.services.columnar import FORMAT_PATTERN, ROWS
+from app.services import admission, memory_accounting, profiler, tracing
+from app.services.deadlines import DeadlineMiddleware
+from app.services.logging_setup import configure_logging
+from app.services.openai_transport import prompt_cache_stats
 
 # ---- NEW SERVICE ----
 from app.services.creator_analysis_service import (
     CreatorAnalysisResponse,
+    parse_sections,
     run_creator_analysis,
 )
 
 # ---- Logging ----
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s  %(levelname)-8s  %(name)s  %(message)s",
-)
+configure_logging()
 logger = logging.getLogger("creator_growth_ai")
 
 # ---- App Init ----
@@ -58,34 +82,139 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
-# ---- CORS ----
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=False,  # IMPORTANT
-    allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["X-Process-Time"],
-)
-
 # ---- Middleware ----
+# Registered before timing_middleware so it runs inside it: deadline and
+# disconnect aborts are still timed, traced and counted there.
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(CompressionMiddleware)
+
+# Liveness, scraping and docs stay reachable without a key when TENANT_REQUIRE_KEY=1
+_OPEN_PATHS = frozenset({"/", "/health", "/metrics", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json"})
+
+_route_labels: dict = {}
+
+
+def _route_label(request: Request) -> str:
+    """Route template for metric labels — keeps cardinality bounded for path params and 404 scans."""
+    path = request.url.path
+    label = _route_labels.get(path)
+    if label is None:
+        label = "unmatched"
+        for route in app.router.routes:
+            if route.matches(request.scope)[0] == Match.FULL:
+                label = route.path
+                break
+        if label != path and len(_route_labels) > 1024:
+            return label
+        _route_labels[path] = label
+    return label
+
+
 @app.middleware("http")
 async def timing_middleware(request: Request, call_next):
     if request.method == "OPTIONS":
         return await call_next(request)
 
+    tenant = resolve_tenant(request.headers.get("x-api-key"))
+    if tenant is None and request.url.path in _OPEN_PATHS:
+        tenant = PUBLIC_TENANT
+    if tenant is None:
+        return JSONResponse(status_code=401, content={"detail": "Missing or unknown X-API-Key."})
+
     start = time.perf_counter()
+    route = _route_label(request)
+    current_route.set(route)
+    current_tenant.set(tenant)
+    http_requests_in_flight.inc(route)
+    status = 500
+    root_span, trace_token = tracing.start_trace(
+        f"{request.method} {route}",
+        request.headers.get("traceparent"),
+        **{"http.method": request.method, "http.route": route, "tenant": tenant},
+    )
+    sampler = profiler.maybe_start(request.headers, route) if profiler.PROFILING_ENABLED else None
+    memory_probe = memory_accounting.maybe_probe(route) if memory_accounting.MEMORY_ENABLED else None
+    ticket = None
+
+    def complete() -> None:
+        # Runs once the body has been sent: a streamed /pipeline does its work
+        # after the headers, and the request is not over until then
+        if ticket is not None:
+            ticket.release()
+        elapsed = time.perf_counter() - start
+        http_requests_in_flight.dec(route)
+        http_request_duration.observe(elapsed, route, request.method, str(status))
+        root_span.set("http.status_code", status)
+        trace = tracing.finish_trace(root_span)
+        loop = asyncio.get_running_loop()
+        if tracing.TRACE_EXPORT_DIR:
+            loop.run_in_executor(None, tracing.export_trace, trace)
+        if sampler is not None:
+            sampler.stop()
+            loop.run_in_executor(None, sampler.save, elapsed)
+        if memory_probe is not None:
+            memory_probe.finish()
 
     try:
+        ticket = await admission.admit(route)
         response = await call_next(request)
+    except admission.Rejected as exc:
+        response = JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
     except Exception as exc:
-        logger.exception(f"Unhandled error in {request.url.path}")
-        return JSONResponse(status_code=500, content={"detail": str(exc)})
-
+        logger.exception("Unhandled error in %s", request.url.path)
+        root_span.error = str(exc)
+        response = JSONResponse(status_code=500, content={"detail": str(exc)})
+    except BaseException:
+        complete()
+        raise
+    finally:
+        tracing.detach(trace_token)
+    status = response.status_code
+
+    # Time to headers; the histogram records the full time once the body is sent
     response.headers["X-Process-Time"] = str(round(time.perf_counter() - start, 4))
+    response.headers["traceparent"] = root_span.traceparent()
+    if sampler is not None:
+        response.headers["X-Profile-File"] = sampler.filename
+    admission.on_body_sent(response, complete)
     return response
 
 
+# ---- CORS ----
+# Added last so it is the outermost layer: the 401/503 answers built in
+# timing_middleware carry CORS headers too, and the browser can read Retry-After.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=False,  # IMPORTANT
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["X-Process-Time", "traceparent", "X-Profile-File", "Retry-After", "X-Result-Id", "X-Plan-Source"],
+)
+
+
+# ---- Background jobs ----
+@app.on_event("startup")
+async def start_background_jobs():
+    refresher.start()
+    loop_monitor.start()
+    memory_accounting.start()
+    result_store.start()
+    astrology_corpus.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    await refresher.stop()
+    await loop_monitor.stop()
+    await result_store.stop()
+    await astrology_corpus.stop()
+
+
 # ============================================================
 # ---------------------- META -------------------------------
 # ============================================================
@@ -100,6 +229,11 @@ async def root():
     }
 
 
+@app.get("/metrics", tags=["Meta"], include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health", tags=["Meta"])
 async def health():
     return {
@@ -115,7 +249,8 @@ async def health():
 
 @app.post("/creator-analysis", response_model=CreatorAnalysisResponse, tags=["AI"])
 async def creator_analysis(
-    palm_image:  UploadFile      = File(...),
+    request:     Request,
+    palm_image:  Optional[UploadFile] = File(None),
     platform:    str             = Form(...),
     name:        str             = Form(...),
     goal:        str             = Form(...),
@@ -126,6 +261,7 @@ async def creator_analysis(
     subscribers: Optional[int]   = Form(None),
     videos:      Optional[int]   = Form(None),
     views:       Optional[int]   = Form(None),
+    sections:    Optional[str]   = Form(None, description="Comma-separated response sections to generate (default: all)"),
 ):
     """
     Advanced creator analysis:
@@ -133,18 +269,24 @@ async def creator_analysis(
     - Astrology
     - Growth strategy
     - 30-day plan
+
+    `sections` limits generation to the listed top-level fields; the others
+    come back null. palm_image is only required when palm_reading is included.
     """
 
-    if not palm_image.content_type or not palm_image.content_type.startswith("image/"):
+    wanted = parse_sections(sections)
+    if palm_image is None and "palm_reading" in wanted:
+        raise HTTPException(status_code=400, detail="palm_image is required unless palm_reading is left out of sections.")
+    if palm_image is not None and (not palm_image.content_type or not palm_image.content_type.startswith("image/")):
         raise HTTPException(
             status_code=400,
             detail=f"palm_image must be an image. Got: {palm_image.content_type}"
         )
 
-    logger.info(f"[creator-analysis] {name} | {platform} | {goal[:40]}")
+    logger.info("[creator-analysis] %s | %s | %s", name, platform, goal[:40])
 
     try:
-        return await run_creator_analysis(
+        result = await run_creator_analysis(
             palm_image=palm_image,
             platform=platform,
             name=name,
@@ -156,73 +298,283 @@ async def creator_analysis(
             subscribers=subscribers,
             videos=videos,
             views=views,
+            sections=wanted,
         )
+    except HTTPException:
+        raise   # tenant budget 429, deadline 504, OpenAI/repair 502s keep their status
     except Exception as e:
-        logger.error(f"Creator analysis failed: {e}")
+        logger.error("Creator analysis failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+    return render(request, result, {"X-Result-Id": await result_store.put("creator", result)})
+
 
 # ============================================================
 # ---------------------- CORE APIs ----------------------------
 # ============================================================
 
 @app.post("/analyze-profile", response_model=ProfileAnalysisResponse, tags=["Core"])
-async def analyze_profile(req: ProfileAnalysisRequest):
-    logger.info(f"[analyze-profile] {req.social_url}")
-    return simulate_profile(req.social_url)
+async def analyze_profile(
+    req: ProfileAnalysisRequest,
+    response: Response,
+    fmt: str = Query(ROWS, alias="format", pattern=FORMAT_PATTERN,
+                     description="growth_data as rows (default) or parallel arrays"),
+):
+    logger.info("[analyze-profile] %s", req.social_url)
+    refresher.record_request(req.social_url)
+    result = await asyncio.to_thread(simulate_profile, req.social_url, fmt)
+    response.headers["X-Result-Id"] = await result_store.put("profile", result)
+    speculator.after_profile(result)
+    return result
 
 
 @app.post("/generate-ai-insights", response_model=AIInsightsResponse, tags=["AI"])
-async def ai_insights(req: AIInsightsRequest):
-    logger.info(f"[ai-insights] {req.username}")
-    return await generate_insights(req)
+async def ai_insights(req: AIInsightsRequest, request: Request):
+    logger.info("[ai-insights] %s", req.username)
+    result = await speculator.insights(req)
+    return render(request, result, {"X-Result-Id": await result_store.put("insights", result)})
 
 
 @app.post("/astrology-analysis", response_model=AstrologyResponse, tags=["AI"])
-async def astrology_analysis(req: AstrologyRequest):
-    logger.info(f"[astrology] {req.zodiac}")
-    return await generate_astrology(req)
+async def astrology_analysis(req: AstrologyRequest, request: Request):
+    logger.info("[astrology] %s", req.zodiac)
+    # Readings change with the month (corpus, solar-return note) and X-Result-Id is per tenant
+    key = (f"{current_tenant.get()}|{month_key()}|{req.dob}|{req.time_of_birth}|{req.zodiac.value}|"
+           f"{'msgpack' if wants_msgpack(request) else 'json'}")
+    entry = astrology_cache.get(key)
+    if entry is None:
+        result = await astrology_corpus.astrology(req)
+        rendered = render(request, result, {"X-Result-Id": await result_store.put("astrology", result)})
+        entry = astrology_cache.put(key, rendered.body, rendered.media_type,
+                                    {"X-Result-Id": rendered.headers["x-result-id"], "Vary": "Accept"})
+    return await astrology_cache.respond(entry, request)
 
 
 @app.post("/palm-analysis", response_model=PalmAnalysisResponse, tags=["AI"])
-async def palm_analysis(image: UploadFile = File(...)):
-    logger.info(f"[palm-analysis] {image.filename}")
+async def palm_analysis(request: Request, image: UploadFile = File(...)):
+    logger.info("[palm-analysis] %s", image.filename)
 
     if not image.content_type or not image.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
 
     image_bytes = await image.read()
+    upload_size_bytes.observe(len(image_bytes), "/palm-analysis")
 
     if len(image_bytes) > 10 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="Image must be under 10MB")
 
-    return await analyze_palm_image(image_bytes)
+    result = await analyze_palm_image(image_bytes)
+    return render(request, result, {"X-Result-Id": await result_store.put("palm", result)})
 
 
 @app.post("/calculate-goals", response_model=GoalResponse, tags=["Core"])
-async def goal_planner(req: GoalRequest):
-    logger.info(f"[goal] {req.current_followers} -> {req.target_followers}")
-    return calculate_goal(req)
+async def goal_planner(
+    req: GoalRequest,
+    response: Response,
+    fmt: str = Query(ROWS, alias="format", pattern=FORMAT_PATTERN,
+                     description="projection and bands as rows (default) or parallel arrays"),
+):
+    logger.info("[goal] %s -> %s", req.current_followers, req.target_followers)
+    result = await asyncio.to_thread(calculate_goal, req, fmt)
+    response.headers["X-Result-Id"] = await result_store.put("goals", result)
+    return result
+
+
+@app.post("/solve-goals", response_model=GoalSolveResponse, tags=["Core"])
+async def goal_solver(req: GoalSolveRequest):
+    logger.info("[solve-goals] %s -> %s >= %s", req.current_followers, req.target_followers, req.min_score)
+    return solve_goal(req)
 
 
 @app.post("/generate-report", tags=["Core"])
-async def generate_report(req: ReportRequest):
-    logger.info(f"[report] {req.username}")
+async def generate_report(req: ReportRequest, request: Request):
+    logger.info("[report] %s", req.username)
+
+    # Load any sections passed by result id instead of inline JSON
+    for section in ("profile", "insights", "astrology", "goals"):
+        result_id = getattr(req, f"{section}_id")
+        if result_id and getattr(req, section) is None:
+            stored = await result_store.get(result_id, kind=section)
+            if stored is None:
+                raise HTTPException(status_code=404, detail=f"{section}_id {result_id!r} not found or expired")
+            setattr(req, section, stored)
+
+    key = hashlib.sha256(req.model_dump_json(include={"profile", "insights", "astrology", "goals", "username"})
+                         .encode("utf-8")).hexdigest()
+    entry = report_cache.get(key)
+    if entry is None:
+        pdf_bytes = await asyncio.to_thread(generate_pdf_report, req)
+
+        content_type = "application/pdf" if pdf_bytes[:4] == b"%PDF" else "text/html"
+        ext = "pdf" if content_type == "application/pdf" else "html"
+
+        entry = report_cache.put(key, pdf_bytes, content_type, {
+            "Content-Disposition": f"attachment; filename=growth_report_{req.username}.{ext}"
+        })
+    return await report_cache.respond(entry, request)
 
-    pdf_bytes = generate_pdf_report(req)
 
-    content_type = "application/pdf" if pdf_bytes[:4] == b"%PDF" else "text/html"
-    ext = "pdf" if content_type == "application/pdf" else "html"
+@app.post("/pipeline", tags=["Core"])
+async def pipeline(req: PipelineRequest, stream: bool = True):
+    """
+    Profile → insights, astrology, goals and report in one call, run as a
+    dependency graph. Streams NDJSON progress events by default; with
+    ?stream=false only the final summary (timings + result ids) is returned.
+    """
+    logger.info("[pipeline] %s", req.social_url)
+    if not stream:
+        async for event in run_pipeline(req):
+            pass
+        return event
+
+    async def ndjson():
+        async for event in run_pipeline(req):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@app.get("/results/{result_id}", tags=["Core"])
+async def get_result(result_id: str):
+    """Fetch a stored result by the id returned in X-Result-Id (reports download as files)."""
+    if result_id.startswith(PLAN_ID_PREFIX):
+        # Plan ids are derived, not random; plans are only served tenant-checked via /plans
+        raise HTTPException(status_code=404, detail="Result not found or expired")
+    stored = await result_store.get(result_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Result not found or expired")
+    if isinstance(stored, dict) and "content_b64" in stored:
+        return StreamingResponse(
+            BytesIO(base64.b64decode(stored["content_b64"])),
+            media_type=stored["content_type"],
+            headers={"Content-Disposition": f"attachment; filename={stored['filename']}"},
+        )
+    return stored
 
-    return StreamingResponse(
-        BytesIO(pdf_bytes),
-        media_type=content_type,
-        headers={
-            "Content-Disposition": f"attachment; filename=growth_report_{req.username}.{ext}"
-        },
+
+# ============================================================
+# ---------------------- 30-DAY PLAN --------------------------
+# ============================================================
+
+def _plan_page(plan_id: str, week: int, result) -> PlanResponse:
+    return PlanResponse(
+        plan_id=plan_id,
+        weeks_total=PLAN_WEEKS,
+        week=result,
+        next_week=f"/plans/{plan_id}/weeks/{week + 1}" if week < PLAN_WEEKS else None,
     )
 
 
+@app.post("/plans", response_model=PlanResponse, tags=["AI"])
+async def create_plan(req: PlanRequest, response: Response):
+    """Start a 30-day plan: week 1 is generated now, week 2 in the background."""
+    logger.info("[plans] %r on %s", req.name, req.platform)
+    plan_id = await plan_service.create(req)
+    result, source = await plan_service.week(plan_id, 1, req)
+    response.headers["X-Result-Id"] = plan_id
+    response.headers["X-Plan-Source"] = source
+    return _plan_page(plan_id, 1, result)
+
+
+@app.get("/plans/{plan_id}/weeks/{week}", response_model=PlanResponse, tags=["AI"])
+async def get_plan_week(plan_id: str, response: Response, week: int = Path(..., ge=1, le=PLAN_WEEKS)):
+    """One week of a plan, generated on first request; the following week is prefetched."""
+    req = await plan_service.context(plan_id)
+    if req is None:
+        raise HTTPException(status_code=404, detail="Plan not found or expired")
+    result, source = await plan_service.week(plan_id, week, req)
+    response.headers["X-Plan-Source"] = source
+    return _plan_page(plan_id, week, result)
+
+
+# ============================================================
+# ---------------------- TENANTS ------------------------------
+# ============================================================
+
+@app.get("/tenants/usage", tags=["Meta"])
+async def tenants_usage():
+    """Per-tenant OpenAI usage, budgets and fair-queue wait times."""
+    return fair_scheduler.stats()
+
+
+# ============================================================
+# ---------------------- DEBUG --------------------------------
+# ============================================================
+
+@app.get("/debug/traces", tags=["Debug"])
+async def debug_traces(limit: int = 20, route: Optional[str] = None):
+    """Slowest recent traces from the in-process ring buffer, with their spans."""
+    return {"traces": tracing.slowest_traces(limit=max(1, min(limit, 200)), route=route)}
+
+
+@app.get("/debug/memory", tags=["Debug"])
+async def debug_memory():
+    """Recent heavy requests, current RSS and (tracemalloc mode) the live top allocation sites."""
+    report = memory_accounting.recent_heavy()
+    report["top_sites"] = await asyncio.to_thread(memory_accounting.top_sites)
+    return report
+
+
+@app.get("/debug/admission", tags=["Debug"])
+async def debug_admission():
+    """Current occupancy of each expensive-route lane."""
+    return admission.lane_stats()
+
+
+@app.get("/debug/caches", tags=["Debug"])
+async def debug_caches():
+    """Hit rates and size of the rendered-response caches, the insights cache and the astrology corpus."""
+    return {
+        "astrology":        astrology_cache.stats(),
+        "report":           report_cache.stats(),
+        "insights":         insights_cache.stats(),
+        "astrology_corpus": astrology_corpus.stats(),
+    }
+
+
+@app.get("/debug/speculation", tags=["Debug"])
+async def debug_speculation():
+    """Speculative insights prefetch: launches, hit rate and wasted results."""
+    return speculator.stats()
+
+
+@app.get("/debug/prompt-cache", tags=["Debug"])
+async def debug_prompt_cache():
+    """OpenAI prompt-cache hit ratio per endpoint (cached / prompt tokens)."""
+    return prompt_cache_stats()
+
+
+# ============================================================
+# ---------------------- WATCHLIST ----------------------------
+# ============================================================
+
+@app.get("/watchlist", tags=["Watchlist"])
+async def list_watchlist():
+    return {"profiles": refresher.watched()}
+
+
+@app.post("/watchlist", tags=["Watchlist"])
+async def add_to_watchlist(req: ProfileAnalysisRequest):
+    try:
+        refresher.watch(req.social_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"social_url": req.social_url, "watched": True}
+
+
+@app.delete("/watchlist", tags=["Watchlist"])
+async def remove_from_watchlist(social_url: str):
+    url = ProfileAnalysisRequest(social_url=social_url).social_url
+    if not refresher.unwatch(url):
+        raise HTTPException(status_code=404, detail="Profile is not on the watchlist")
+    return {"social_url": url, "watched": False}
+
+
+@app.get("/watchlist/stats", tags=["Watchlist"])
+async def watchlist_stats():
+    return refresher.stats()
+
+
 # ============================================================
 # ---------------------- RUN SERVER ---------------------------
 # ============================================================
@@ -0,0 +1,95 @@
+"""
+scripts/bench_columnar.py
+
+Row vs columnar time-series payloads (app/services/columnar.py).
+
+    python scripts/bench_columnar.py [iterations]
+
+For profile growth_data (25 weeks as served, plus a 520-week series to show
+the trend) and a 60-month goal projection with Monte Carlo bands, prints
+  build   time to generate the series (legacy per-row loop vs columns, shaped
+          either way; growth_data draws the same values as the legacy loop)
+  bytes   JSON payload size for each shape
+  encode  json.dumps / orjson.dumps time for each shape
+"""
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.models.schemas import GoalRequest                    # noqa: E402
+from app.services.columnar import COLUMNAR, ROWS, shape         # noqa: E402
+from app.services.goal_service import projection_columns, simulate_projection_bands  # noqa: E402
+from app.services.profile_service import growth_columns        # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def legacy_growth_rows(followers: int, engagement_rate: float, seed: int, weeks: int):
+    """The per-week loop simulate_profile used before the columnar change."""
+    rng = random.Random(seed)
+    base_date = datetime.now() - timedelta(weeks=weeks - 1)
+    rows, current = [], float(followers) * 0.70
+    for w in range(weeks):
+        rows.append({
+            "week":       (base_date + timedelta(weeks=w)).strftime("%b %d"),
+            "followers":  int(current),
+            "engagement": round(rng.uniform(engagement_rate * 0.6, engagement_rate * 1.4), 2),
+            "views":      int(current * rng.uniform(2.0, 7.0)),
+        })
+        current *= (1 + rng.uniform(0.003, 0.045))
+    return rows
+
+
+def timed(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def report(label: str, rows, columns, iterations: int) -> None:
+    print(f"\n{label}")
+    for name, payload in (("rows", rows), ("columnar", columns)):
+        encoded = json.dumps(payload, separators=(",", ":"))
+        line = f"  {name:<9} {len(encoded):>8,} bytes   json {timed(lambda: json.dumps(payload), iterations):8.1f} µs"
+        if orjson is not None:
+            line += f"   orjson {timed(lambda: orjson.dumps(payload), iterations):7.1f} µs"
+        print(line)
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    for weeks in (25, 520):
+        legacy = timed(lambda: legacy_growth_rows(250_000, 4.2, 1234, weeks), iterations)
+        col_rows = timed(lambda: shape(growth_columns(250_000, 4.2, random.Random(1234), weeks), ROWS),
+                         iterations)
+        col_cols = timed(lambda: shape(growth_columns(250_000, 4.2, random.Random(1234), weeks), COLUMNAR),
+                         iterations)
+        columns = growth_columns(250_000, 4.2, random.Random(1234), weeks)
+        report(f"growth_data, {weeks} weeks — build: legacy loop {legacy:.1f} µs, "
+               f"columns→rows {col_rows:.1f} µs, columns {col_cols:.1f} µs",
+               shape(columns, ROWS), shape(columns, COLUMNAR), iterations)
+
+    req = GoalRequest(current_followers=12_000, target_followers=250_000, timeline_months=60,
+                      niche="fitness", projection_mode="monte_carlo", simulations=1_000)
+    rate = (req.target_followers - req.current_followers) / req.timeline_months / req.current_followers
+    projection = projection_columns(req, rate)
+    rows = {"projection": shape(projection, ROWS),
+            "projection_bands": simulate_projection_bands(req, rate, fmt=ROWS)}
+    cols = {"projection": shape(projection, COLUMNAR),
+            "projection_bands": simulate_projection_bands(req, rate, fmt=COLUMNAR)}
+    report("goal projection + bands, 60 months", rows, cols, iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+scripts/bench_logging.py
+
+Per-request logging overhead on the request thread, before and after
+app/services/logging_setup.py.
+
+    python scripts/bench_logging.py [requests]
+
+A "request" emits the lines an /analyze-profile → /generate-ai-insights
+round trip logs. Both setups write to the same temporary file:
+  before  basicConfig StreamHandler, f-strings formatted eagerly, every line written
+  after   configure_logging(): lazy %-templates, QueueHandler → listener thread,
+          JSON lines, default per-template sampling
+Only time spent in the calling thread is measured — that is what the event
+loop pays. The listener is drained before the file is checked.
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services import logging_setup  # noqa: E402
+
+logger = logging.getLogger("creator_growth_ai")
+
+URL, USER, MODEL = "https://tiktok.com/@some.creator", "some.creator", "gpt-4o-mini"
+
+
+def request_eager(i: int) -> None:
+    logger.info(f"[analyze-profile] {URL}")
+    logger.info(f"[simulate_profile] url={URL!r}")
+    logger.info(f"[extract_username] {URL!r} → {USER!r}")
+    logger.info(f"[simulate_profile] ✅ returning profile for @{USER}")
+    logger.info(f"[ai-insights] {USER}")
+    logger.info(f"[generate_insights] @{USER} on tiktok, {120_000 + i:,} followers")
+    logger.info(f"[OpenAI] calling model={MODEL} messages={1}")
+    logger.info(f"[OpenAI] response length={2_400 + i} chars")
+    logger.debug(f"[debug] payload={dict(user=USER, i=i)}")
+
+
+def request_lazy(i: int) -> None:
+    logger.info("[analyze-profile] %s", URL)
+    logger.info("[simulate_profile] url=%r", URL)
+    logger.info("[extract_username] %r → %r", URL, USER)
+    logger.info("[simulate_profile] ✅ returning profile for @%s", USER)
+    logger.info("[ai-insights] %s", USER)
+    logger.info("[generate_insights] @%s on %s, %d followers", USER, "tiktok", 120_000 + i)
+    logger.info("[OpenAI] calling model=%s messages=%s", MODEL, 1)
+    logger.info("[OpenAI] response length=%s chars", 2_400 + i)
+    logger.debug("[debug] payload=%s", dict(user=USER, i=i))
+
+
+def run(label: str, fn, n: int, path: str) -> float:
+    for i in range(200):
+        fn(i)
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    per_request = (time.perf_counter() - start) / n * 1e6
+    logging_setup.stop_logging()   # no-op for the "before" setup; drains the queue for "after"
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+    with open(path, "rb") as f:
+        lines = sum(1 for _ in f)
+    print(f"  {label:<7} {per_request:8.1f} µs/request on the caller thread, {lines:,} lines written")
+    return per_request
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    root = logging.getLogger()
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path, after_path = os.path.join(tmp, "before.log"), os.path.join(tmp, "after.log")
+
+        with open(before_path, "w") as sink:
+            handler = logging.StreamHandler(sink)
+            handler.setFormatter(logging.Formatter(logging_setup.TEXT_FORMAT))
+            root.handlers[:] = [handler]
+            root.setLevel(logging.INFO)
+            before = run("before", request_eager, n, before_path)
+
+        with open(after_path, "w") as sink:
+            logging_setup.configure_logging(stream=sink, fmt="json")
+            after = run("after", request_lazy, n, after_path)
+        root.handlers[:] = []
+
+    print(f"  → {before / after:.1f}x less logging time per request on the event loop")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+scripts/bench_serialization.py
+
+Microbenchmark for the response fast path (app/services/serialization.py)
+on a maximum-size CreatorAnalysisResponse — every list filled and a 30-day
+monthly_plan, about what a 4096-token completion can hold.
+
+    python scripts/bench_serialization.py [iterations]
+
+Compares, per response, from the OpenAI dict to response bytes:
+  default   model(**data) → FastAPI response_model re-validation →
+            jsonable_encoder → JSONResponse (what the routes did before)
+  fast      one TypeAdapter validation → model_dump → orjson
+  msgpack   one TypeAdapter validation → MessagePack
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.responses import JSONResponse                     # noqa: E402
+from fastapi.routing import serialize_response                 # noqa: E402
+from fastapi.utils import create_response_field                # noqa: E402
+
+from app.services import serialization                          # noqa: E402
+from app.services.creator_analysis_service import CreatorAnalysisResponse  # noqa: E402
+
+
+def _sentence(i: int) -> str:
+    return f"Point {i}: post short-form hooks in the first two seconds and reply to every comment within the hour."
+
+
+def max_size_payload() -> dict:
+    items = [_sentence(i) for i in range(12)]
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    return {
+        "platform_assessment":  " ".join(items),
+        "what_went_right":      items,
+        "what_went_wrong":      items,
+        "content_strategy":     " ".join(items * 2),
+        "astro_zodiac_reading": {
+            "personality": " ".join(items), "good_timings": items, "bad_timings": items,
+            "good_days": items, "bad_days": items, "monthly_forecast": " ".join(items), "remedies": items,
+        },
+        "palm_reading": {
+            "overall_reading": " ".join(items), "creativity_score": 88, "leadership_score": 74,
+            "resilience_score": 91, "difficulties": items, "how_to_overcome": items, "creator_strengths": items,
+        },
+        "best_posting_days": days,
+        "posting_schedule":  {d: ["09:00 — " + _sentence(0), "18:30 — " + _sentence(1)] for d in days},
+        "monthly_plan": [
+            {"day": d, "theme": _sentence(d), "tasks": [_sentence(d + k) for k in range(4)], "kpi": f"{d * 120} views"}
+            for d in range(1, 31)
+        ],
+        "growth_prediction": " ".join(items),
+        "final_blessing":    _sentence(99),
+    }
+
+
+def bench(label: str, fn, iterations: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call = (time.perf_counter() - start) / iterations
+    print(f"  {label:<10} {per_call * 1e6:9.1f} µs/response")
+    return per_call
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    data  = max_size_payload()
+    field = create_response_field(name="response", type_=CreatorAnalysisResponse)
+    loop  = asyncio.new_event_loop()
+
+    def default_path() -> bytes:
+        model   = CreatorAnalysisResponse(**data)
+        content = loop.run_until_complete(serialize_response(field=field, response_content=model))
+        return JSONResponse(content).body
+
+    def fast_path() -> bytes:
+        return serialization.dumps(serialization.validate(CreatorAnalysisResponse, data))
+
+    def msgpack_path() -> bytes:
+        model = serialization.validate(CreatorAnalysisResponse, data)
+        return serialization.msgpack.packb(model.model_dump(mode="json"), use_bin_type=True)
+
+    print(f"CreatorAnalysisResponse: {len(default_path()):,} bytes JSON, "
+          f"orjson={'yes' if serialization.orjson else 'no'}, "
+          f"msgpack={'yes' if serialization.msgpack else 'no'}; {iterations} iterations")
+    base = bench("default", default_path, iterations)
+    fast = bench("fast", fast_path, iterations)
+    print(f"  → fast path {base / fast:.1f}x faster")
+    if serialization.msgpack is not None:
+        packed = bench("msgpack", msgpack_path, iterations)
+        print(f"  → msgpack {base / packed:.1f}x faster, {len(msgpack_path()):,} bytes")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
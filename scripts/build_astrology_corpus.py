@@ -0,0 +1,45 @@
+"""
+scripts/build_astrology_corpus.py
+
+Offline build of the astrology corpus (app/services/astrology_corpus.py):
+one sign-wide reading per zodiac sign per month, written to the SQLite asset
+the server loads at startup.
+
+    python scripts/build_astrology_corpus.py [months_ahead] [path]
+
+Generates the current month plus `months_ahead` following months (default:
+ASTROLOGY_CORPUS_MONTHS_AHEAD) into `path` (default: ASTROLOGY_CORPUS_PATH).
+Existing readings are kept unless older than ASTROLOGY_CORPUS_MAX_AGE, so the
+script can be re-run to top up a partial build. Needs OPENAI_API_KEY.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.models.schemas import Zodiac                 # noqa: E402
+from app.services import astrology_corpus as corpus   # noqa: E402
+from app.services.ai_service import OPENAI_API_KEY    # noqa: E402
+from app.services.request_context import current_route  # noqa: E402
+
+
+async def main() -> None:
+    months_ahead = int(sys.argv[1]) if len(sys.argv) > 1 else corpus.ASTROLOGY_CORPUS_MONTHS_AHEAD
+    path = sys.argv[2] if len(sys.argv) > 2 else corpus.ASTROLOGY_CORPUS_PATH
+    if not OPENAI_API_KEY:
+        sys.exit("OPENAI_API_KEY is not set")
+
+    months = [corpus.month_key(i) for i in range(months_ahead + 1)]
+    current_route.set("build:astrology-corpus")
+    written = await corpus.build(path, months, max_age=corpus.ASTROLOGY_CORPUS_MAX_AGE)
+
+    present = corpus.load_entries(path, months)
+    expected = len(months) * len(Zodiac)
+    print(f"{path}: generated {len(written)} readings, {len(present)}/{expected} present for {', '.join(months)}")
+    if len(present) < expected:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Keep the SQLite-backed stores out of the working tree and run without OpenAI
+_tmp = tempfile.mkdtemp(prefix="astroforge-tests-")
+os.environ.setdefault("RESULT_STORE_PATH", os.path.join(_tmp, "results.sqlite3"))
+os.environ.setdefault("PROFILE_STORE_PATH", os.path.join(_tmp, "profile_cache.sqlite3"))
+os.environ.setdefault("ASTROLOGY_CORPUS_PATH", os.path.join(_tmp, "astrology_corpus.sqlite3"))
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
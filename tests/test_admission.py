@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.services import admission
+from app.services.admission import LaneConfig, Rejected, RouteLimiter
+
+
+def _limiter(concurrency=1, max_queue=2, max_wait=10.0, service=1.0) -> RouteLimiter:
+    return RouteLimiter("/test", LaneConfig(concurrency, max_queue, max_wait, service))
+
+
+def test_free_slot_is_taken_without_waiting():
+    async def run():
+        lim = _limiter(concurrency=2)
+        assert await lim.acquire() == 0.0
+        assert await lim.acquire() == 0.0
+        assert lim.active == 2
+    asyncio.run(run())
+
+
+def test_full_queue_is_shed_up_front():
+    async def run():
+        lim = _limiter(concurrency=1, max_queue=1, service=0.1)
+        await lim.acquire()
+        waiter = asyncio.create_task(lim.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as exc:
+            await lim.acquire()
+        assert exc.value.reason == "queue full"
+        waiter.cancel()
+    asyncio.run(run())
+
+
+def test_predicted_wait_beyond_deadline_is_shed_up_front():
+    async def run():
+        # position 1 × 30s EWMA / concurrency 1 > 10s max wait
+        lim = _limiter(concurrency=1, max_queue=8, max_wait=10.0, service=30.0)
+        await lim.acquire()
+        with pytest.raises(Rejected) as exc:
+            await lim.acquire()
+        assert exc.value.reason == "predicted wait exceeds deadline"
+        assert exc.value.retry_after == 30
+        assert not lim._waiters
+    asyncio.run(run())
+
+
+def test_release_hands_the_slot_to_the_oldest_waiter():
+    async def run():
+        lim = _limiter(concurrency=1, max_queue=4, service=0.1)
+        await lim.acquire()
+        first  = asyncio.create_task(lim.acquire())
+        second = asyncio.create_task(lim.acquire())
+        await asyncio.sleep(0)
+        lim.release(0.0)
+        await first
+        assert not second.done() and lim.active == 1
+        lim.release(0.0)
+        await second
+        lim.release(0.0)
+        assert lim.active == 0
+    asyncio.run(run())
+
+
+def test_queue_wait_deadline_sheds_and_leaves_the_queue():
+    async def run():
+        lim = _limiter(concurrency=1, max_queue=4, max_wait=0.05, service=0.01)
+        await lim.acquire()
+        with pytest.raises(Rejected) as exc:
+            await lim.acquire()
+        assert exc.value.reason == "queue wait deadline"
+        assert not lim._waiters and lim.active == 1
+    asyncio.run(run())
+
+
+def test_service_time_ewma_follows_held_time():
+    lim = _limiter(service=10.0)
+    lim.active = 1
+    lim.release(20.0)
+    assert lim.service_ewma == pytest.approx(12.0)
+
+
+def test_retry_after_is_whole_seconds_and_at_least_one():
+    assert Rejected("/x", "r", 0.2).retry_after == 1
+    assert Rejected("/x", "r", 2.1).retry_after == 3
+
+
+def test_cheap_routes_are_never_queued():
+    assert asyncio.run(admission.admit("/health")) is None
+
+
+def test_ticket_release_is_idempotent():
+    async def run():
+        ticket = await admission.admit("/generate-report")
+        limiter = ticket.limiter
+        active = limiter.active
+        ticket.release()
+        ticket.release()
+        assert limiter.active == active - 1
+    asyncio.run(run())
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from app.models.schemas import Zodiac
+from app.services import astrology_corpus as corpus_module
+from app.services.astrology_corpus import AstrologyCorpus, month_key
+
+
+@pytest.fixture
+def builds(monkeypatch, tmp_path):
+    """Record build() calls instead of calling OpenAI; pretend a key is set."""
+    calls = []
+
+    async def fake_build(path, months, **kw):
+        calls.append(list(months))
+        return {}
+
+    monkeypatch.setattr(corpus_module, "build", fake_build)
+    monkeypatch.setattr(corpus_module, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(corpus_module, "ASTROLOGY_CORPUS_ENABLED", True)
+    monkeypatch.setattr(corpus_module, "ASTROLOGY_CORPUS_REFRESH_INTERVAL", 3600.0)
+    return AstrologyCorpus(str(tmp_path / "corpus.sqlite3")), calls
+
+
+async def _run_refresher(corpus: AstrologyCorpus) -> None:
+    corpus.start()
+    await asyncio.sleep(0.1)
+    await corpus.stop()
+
+
+def test_startup_only_loads_by_default(builds, monkeypatch):
+    corpus, calls = builds
+    monkeypatch.setattr(corpus_module, "ASTROLOGY_CORPUS_GENERATE", False)
+    asyncio.run(_run_refresher(corpus))
+    assert calls == []
+    corpus._fill(Zodiac.aries, month_key())
+    assert not corpus._tasks
+
+
+def test_generation_is_opt_in(builds, monkeypatch):
+    corpus, calls = builds
+    monkeypatch.setattr(corpus_module, "ASTROLOGY_CORPUS_GENERATE", True)
+    asyncio.run(_run_refresher(corpus))
+    assert calls == [corpus_module.corpus_months()]
@@ -0,0 +1,142 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.services import compression
+from app.services.compression import CompressionMiddleware, VariantCache, negotiate
+
+brotli = pytest.importorskip("brotli")
+
+BIG = {"items": ["growth"] * 400}          # well over COMPRESSION_MIN_BYTES
+BIG_BYTES = json.dumps(BIG).encode()
+
+
+def _decode(headers, raw: bytes) -> bytes:
+    encoding = headers.get("content-encoding")
+    if encoding == "br":
+        return brotli.decompress(raw)
+    if encoding == "gzip":
+        return gzip.decompress(raw)
+    return raw
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/big")
+    async def big():
+        return BIG
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/pdf")
+    async def pdf():
+        return Response(b"%PDF" + b"0" * 4096, media_type="application/pdf")
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(200):
+                yield json.dumps({"event": i, "pad": "x" * 20}) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/encoded")
+    async def encoded():
+        return PlainTextResponse(gzip.compress(b"x" * 4096), headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+
+def _get(client, path: str, accept: str):
+    """Headers and the bytes on the wire (httpx would otherwise decode the body itself)."""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as resp:
+        return resp.headers, b"".join(resp.iter_raw())
+
+
+@pytest.mark.parametrize("accept,expected", [
+    ("br", "br"), ("gzip", "gzip"), ("gzip, br", "br"), ("br;q=0.5, gzip", "gzip"),
+    ("*", "br"), ("identity", None), ("", None), ("gzip;q=0, br;q=0", None), ("gzip;q=abc, br", "br"),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+
+@pytest.mark.parametrize("accept", ["br", "gzip"])
+def test_large_json_is_compressed_with_the_negotiated_encoding(client, accept):
+    headers, raw = _get(client, "/big", accept)
+    assert headers["content-encoding"] == accept
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(raw) < len(BIG_BYTES)
+    assert json.loads(_decode(headers, raw)) == BIG
+
+
+def test_identity_and_small_bodies_are_sent_as_is(client):
+    headers, raw = _get(client, "/big", "identity")
+    assert "content-encoding" not in headers
+    assert json.loads(raw) == BIG
+
+    headers, raw = _get(client, "/small", "br")
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert json.loads(raw) == {"ok": True}
+
+
+@pytest.mark.parametrize("path", ["/pdf", "/stream", "/encoded"])
+def test_binary_streaming_and_preencoded_responses_pass_through(client, path):
+    headers, raw = _get(client, path, "br")
+    if path == "/encoded":
+        assert headers["content-encoding"] == "gzip"
+        assert gzip.decompress(raw) == b"x" * 4096
+    else:
+        assert "content-encoding" not in headers
+        assert len(raw) > compression.COMPRESSION_MIN_BYTES
+
+
+def test_variant_cache_compresses_each_encoding_once(monkeypatch):
+    calls = []
+    real = compression.compress
+
+    def counting(body, encoding, cached=False):
+        calls.append((encoding, cached))
+        return real(body, encoding, cached)
+
+    monkeypatch.setattr(compression, "compress", counting)
+    cache = VariantCache("test", ttl=60, max_bytes=1 << 20)
+    entry = cache.put("k", BIG_BYTES, "application/json", {"X-Test": "1"})
+
+    def request(accept: str) -> Request:
+        return Request({"type": "http", "headers": [(b"accept-encoding", accept.encode())]})
+
+    async def run():
+        out = []
+        for accept in ("br", "br", "gzip", "identity"):
+            out.append(await cache.respond(cache.get("k"), request(accept)))
+        return out
+
+    br1, br2, gz, plain = asyncio.run(run())
+    assert calls == [("br", True), ("gzip", True)]
+    assert br1.body == br2.body and brotli.decompress(br1.body) == BIG_BYTES
+    assert gzip.decompress(gz.body) == BIG_BYTES
+    assert plain.body == BIG_BYTES and "content-encoding" not in plain.headers
+    assert br1.headers["content-encoding"] == "br" and br1.headers["x-test"] == "1"
+    assert set(entry.variants) == {"br", "gzip"}
+    assert cache.stats()["bytes"] == entry.size
+
+
+def test_variant_cache_evicts_least_recently_used():
+    cache = VariantCache("test", ttl=60, max_bytes=2 * len(BIG_BYTES) + 10)
+    cache.put("a", BIG_BYTES, "application/json")
+    cache.put("b", BIG_BYTES, "application/json")
+    assert cache.get("a") is not None          # "b" is now the oldest
+    cache.put("c", BIG_BYTES, "application/json")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
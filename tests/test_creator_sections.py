@@ -0,0 +1,96 @@
+import asyncio
+import re
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.services import creator_analysis_service
+from app.services.creator_analysis_service import (
+    SECTIONS, _RULES, _system_prompt, parse_sections, run_creator_analysis,
+)
+
+_READING = {"personality": "Bold", "good_timings": ["7pm"], "bad_timings": ["6am"], "good_days": ["Friday"],
+            "bad_days": ["Monday"], "monthly_forecast": "Up", "remedies": ["Rest"]}
+_PALM = {"overall_reading": "Strong", "creativity_score": 80, "leadership_score": 70, "resilience_score": 90,
+         "difficulties": ["Focus"], "how_to_overcome": ["Plan"], "creator_strengths": ["Voice"]}
+FULL = {
+    "platform_assessment": "Solid", "what_went_right": ["Hooks"], "what_went_wrong": ["Cadence"],
+    "content_strategy": "Series", "astro_zodiac_reading": _READING, "palm_reading": _PALM,
+    "best_posting_days": ["Friday"], "posting_schedule": {"Friday": ["7pm"]}, "monthly_plan": ["Week 1"],
+    "growth_prediction": "+20%", "final_blessing": "Shine",
+}
+
+
+def _schema_keys(prompt: str):
+    # Top-level keys of the JSON skeleton are the only ones indented by exactly two spaces
+    return re.findall(r'^  "(\w+)":', prompt, flags=re.MULTILINE)
+
+
+def test_missing_or_blank_means_every_section():
+    assert parse_sections(None) == SECTIONS
+    assert parse_sections("") == SECTIONS
+    assert parse_sections("  ") == SECTIONS
+
+
+def test_sections_come_back_in_response_order_without_duplicates():
+    first, second, third = SECTIONS[0], SECTIONS[1], SECTIONS[-1]
+    assert parse_sections(f" {third}, {first},{third} ,, {second}") == (first, second, third)
+
+
+def test_unknown_section_is_422_naming_it():
+    with pytest.raises(HTTPException) as exc:
+        parse_sections(f"{SECTIONS[0]},horoscope")
+    assert exc.value.status_code == 422
+    assert "horoscope" in str(exc.value.detail)
+
+
+def test_full_prompt_lists_every_section_and_rule():
+    prompt = _system_prompt(SECTIONS)
+    assert _schema_keys(prompt) == list(SECTIONS)
+    for i, (_, text) in enumerate(_RULES, 1):
+        assert f"\n{i}. {text}\n" in prompt
+
+
+def test_subset_prompt_keeps_only_its_schema_and_rules():
+    wanted = parse_sections("posting_schedule,final_blessing")
+    prompt = _system_prompt(wanted)
+    assert _schema_keys(prompt) == ["posting_schedule", "final_blessing"]
+    rules = [text for section, text in _RULES if section is None or section in wanted]
+    numbered = re.findall(r"^(\d+)\. (.*)$", prompt.split("ABSOLUTE RULES:")[1], flags=re.MULTILINE)
+    assert numbered == [(str(i), text) for i, text in enumerate(rules, 1)]
+    assert "palm_reading" not in prompt and "monthly_plan" not in prompt
+
+
+def test_prompt_is_cached_per_selection():
+    wanted = parse_sections("growth_prediction")
+    assert _system_prompt(wanted) is _system_prompt(parse_sections("growth_prediction"))
+
+
+def _analyse(monkeypatch, replies: list) -> tuple:
+    """Default all-sections call; the model's first reply and any repair replies come from `replies`."""
+    calls = []
+
+    async def fake_call(messages, max_tokens=4096, usage=None):
+        calls.append(messages)
+        return replies[len(calls) - 1]
+
+    palm = UploadFile(BytesIO(b"\x89PNG\r\n\x1a\n" + b"0" * 64), filename="palm.png")
+    monkeypatch.setattr(creator_analysis_service, "_call_openai_vision", fake_call)
+    result = asyncio.run(run_creator_analysis(palm, "instagram", "Ana", "grow", "Leo", "1990-08-01"))
+    return result, calls
+
+
+def test_default_call_repairs_a_section_the_model_left_out(monkeypatch):
+    first = {k: v for k, v in FULL.items() if k != "final_blessing"}
+    result, calls = _analyse(monkeypatch, [first, {"final_blessing": "Shine on"}])
+    assert len(calls) == 2
+    assert result.final_blessing == "Shine on"
+    assert result.growth_prediction == "+20%"
+
+
+def test_default_call_rejects_a_section_that_cannot_be_repaired(monkeypatch):
+    first = {k: v for k, v in FULL.items() if k != "final_blessing"}
+    with pytest.raises(HTTPException) as exc:
+        _analyse(monkeypatch, [first, {}])
+    assert exc.value.status_code == 502
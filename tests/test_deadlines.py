@@ -0,0 +1,104 @@
+import asyncio
+import json
+from typing import Optional
+
+from app.services import deadlines
+from app.services.deadlines import DeadlineMiddleware, remaining, request_aborts_total
+
+ROUTE = "/pipeline"
+
+
+def _scope(deadline: Optional[str] = None, path: str = ROUTE) -> dict:
+    headers = [(b"x-request-deadline", deadline.encode())] if deadline else []
+    return {"type": "http", "method": "POST", "path": path, "headers": headers}
+
+
+def _receiver(disconnect_after: Optional[float] = None):
+    """The request body, then (optionally) a disconnect after `disconnect_after` seconds."""
+    messages = [{"type": "http.request", "body": b"{}", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        if disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+async def _call(app, scope, receive) -> list:
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await DeadlineMiddleware(app)(scope, receive, send)
+    return sent
+
+
+def _slow_app(state: dict, seconds: float = 5.0):
+    async def app(scope, receive, send):
+        await receive()
+        state["remaining"] = remaining()
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"late"})
+    return app
+
+
+def test_deadline_before_headers_is_504_and_cancels_the_work():
+    state = {}
+    before = request_aborts_total.value(ROUTE, "deadline")
+    sent = asyncio.run(_call(_slow_app(state), _scope("0.05"), _receiver()))
+    assert sent[0]["status"] == 504
+    assert "0.05s" in json.loads(sent[1]["body"])["detail"]
+    assert state["cancelled"] and 0 < state["remaining"] <= 0.05
+    assert request_aborts_total.value(ROUTE, "deadline") == before + 1
+
+
+def test_disconnect_before_headers_is_499_and_cancels_the_work():
+    state = {}
+    before = request_aborts_total.value(ROUTE, "disconnect")
+    sent = asyncio.run(_call(_slow_app(state), _scope("5"), _receiver(disconnect_after=0.02)))
+    assert sent[0]["status"] == 499
+    assert state["cancelled"]
+    assert request_aborts_total.value(ROUTE, "disconnect") == before + 1
+
+
+def test_response_within_budget_passes_through():
+    state = {}
+    sent = asyncio.run(_call(_slow_app(state, seconds=0.01), _scope(), _receiver()))
+    assert [m.get("status") for m in sent] == [200, None]
+    assert sent[1]["body"] == b"late"
+    default = deadlines.DEFAULT_DEADLINES[ROUTE]
+    assert default - 1 < state["remaining"] <= default
+
+
+def test_started_stream_is_not_cut_at_the_deadline():
+    async def app(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await asyncio.sleep(0.1)
+        await send({"type": "http.response.body", "body": b"tail"})
+
+    sent = asyncio.run(_call(app, _scope("0.02"), _receiver()))
+    assert sent[0]["status"] == 200 and sent[1]["body"] == b"tail"
+
+
+def test_routes_without_a_budget_get_no_deadline():
+    state = {}
+    asyncio.run(_call(_slow_app(state, seconds=0), _scope(path="/health"), _receiver()))
+    assert state["remaining"] is None
+
+
+def test_header_budget_is_capped(monkeypatch):
+    monkeypatch.setattr(deadlines, "DEADLINE_MAX_SECONDS", 2.0)
+    state = {}
+    asyncio.run(_call(_slow_app(state, seconds=0), _scope("9999"), _receiver()))
+    assert 1 < state["remaining"] <= 2.0
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.models.schemas import MAX_SIMULATION_CELLS, GoalRequest
+from app.services.goal_service import simulate_projection_bands
+
+
+def _req(months: int = 24, simulations: int = 5_000, **kw) -> GoalRequest:
+    return GoalRequest(current_followers=1_000, target_followers=5_000, timeline_months=months,
+                       niche="fitness", projection_mode="monte_carlo", simulations=simulations, **kw)
+
+
+def test_same_seed_gives_same_bands():
+    req = _req()
+    first = simulate_projection_bands(req, 0.07, seed=7, fmt="columnar")
+    assert simulate_projection_bands(req, 0.07, seed=7, fmt="columnar") == first
+    assert simulate_projection_bands(req, 0.07, seed=8, fmt="columnar") != first
+
+
+def test_default_seed_is_derived_from_inputs():
+    req = _req()
+    assert simulate_projection_bands(req, 0.07, fmt="columnar") == \
+        simulate_projection_bands(req, 0.07, fmt="columnar")
+
+
+def test_bands_match_full_matrix_percentiles():
+    """The per-month computation gives what a (months, n) matrix of the same draws gives."""
+    req, seed, rate = _req(months=12, simulations=2_000), 11, 0.06
+    bands = simulate_projection_bands(req, rate, seed=seed, fmt="columnar")
+
+    freq_factor = float(np.clip((req.posting_frequency / 5.0) ** 0.35, 0.6, 1.5))
+    mean_rate   = rate * 0.85 * freq_factor
+    sigma       = 0.05 + 0.35 * mean_rate
+    drift       = np.log1p(mean_rate) - 0.5 * sigma * sigma
+    paths = np.random.default_rng(seed).standard_normal((12, 2_000), dtype=np.float32)
+    paths *= np.float32(sigma)
+    paths += np.float32(drift)
+    np.cumsum(paths, axis=0, out=paths)
+    reached = np.maximum.accumulate(paths, axis=0) >= np.float32(np.log(5.0))
+    pct = np.rint(1_000 * np.exp(np.percentile(paths, [10, 50, 90], axis=1).astype(np.float64)))
+
+    assert bands["p10"][1:] == pct[0].astype(int).tolist()
+    assert bands["p50"][1:] == pct[1].astype(int).tolist()
+    assert bands["p90"][1:] == pct[2].astype(int).tolist()
+    assert bands["reach_probability"][1:] == np.round(reached.mean(axis=1), 4).tolist()
+
+
+def test_bands_are_ordered_and_reach_probability_never_falls():
+    bands = simulate_projection_bands(_req(), 0.07, seed=3, fmt="columnar")
+    assert bands["month"] == list(range(25))
+    assert bands["p10"][0] == bands["p50"][0] == bands["p90"][0] == 1_000
+    assert all(lo <= mid <= hi for lo, mid, hi in zip(bands["p10"], bands["p50"], bands["p90"]))
+    probs = bands["reach_probability"]
+    assert all(a <= b for a, b in zip(probs, probs[1:]))
+
+
+def test_simulation_budget_is_enforced():
+    _req(months=60, simulations=MAX_SIMULATION_CELLS // 60)
+    with pytest.raises(ValidationError, match="simulations × timeline_months"):
+        _req(months=60, simulations=100_000)
@@ -0,0 +1,56 @@
+import pytest
+
+from app.models.schemas import GoalRequest, GoalSolveRequest
+from app.services.goal_service import (
+    MAX_POSTING_FREQUENCY, MAX_TIMELINE_MONTHS, calculate_goal, feasibility_surface, solve_goal,
+)
+
+# (current, target): ordinary, rate-band edges hit exactly (1000 → 1600 is 5%/month
+# over 12 months, 10% over 6), and an extreme target
+PAIRS = [(10_000, 25_000), (1_000, 1_600), (500, 1_000_000)]
+
+
+def _score(current: int, target: int, months: int, freq: int) -> float:
+    return calculate_goal(GoalRequest(current_followers=current, target_followers=target,
+                                      timeline_months=months, niche="fitness",
+                                      posting_frequency=freq)).feasibility_score
+
+
+@pytest.mark.parametrize("current,target", PAIRS)
+def test_surface_matches_calculate_goal_everywhere(current, target):
+    surface = feasibility_surface(current, target)
+    assert surface.shape == (MAX_TIMELINE_MONTHS, MAX_POSTING_FREQUENCY)
+    for months in range(1, MAX_TIMELINE_MONTHS + 1):
+        for freq in range(1, MAX_POSTING_FREQUENCY + 1):
+            assert surface[months - 1, freq - 1] == _score(current, target, months, freq), (months, freq)
+
+
+@pytest.mark.parametrize("current,target", PAIRS[:2])
+@pytest.mark.parametrize("min_score", [60.0, 80.0, 95.0])
+def test_timeline_objective_picks_shortest_then_fewest_posts(current, target, min_score):
+    result = solve_goal(GoalSolveRequest(current_followers=current, target_followers=target, min_score=min_score))
+    plan = result.plan
+    assert plan is not None
+    assert plan["feasibility_score"] == _score(current, target, plan["timeline_months"], plan["posting_frequency"])
+    assert plan["feasibility_score"] >= min_score
+    for months in range(1, plan["timeline_months"]):
+        assert all(_score(current, target, months, f) < min_score for f in range(1, MAX_POSTING_FREQUENCY + 1))
+    for freq in range(1, plan["posting_frequency"]):
+        assert _score(current, target, plan["timeline_months"], freq) < min_score
+
+
+def test_frequency_objective_picks_fewest_posts_then_shortest():
+    req = GoalSolveRequest(current_followers=10_000, target_followers=25_000, min_score=80.0, objective="frequency")
+    plan = solve_goal(req).plan
+    for freq in range(1, plan["posting_frequency"]):
+        assert all(_score(10_000, 25_000, m, freq) < 80.0 for m in range(1, MAX_TIMELINE_MONTHS + 1))
+    for months in range(1, plan["timeline_months"]):
+        assert _score(10_000, 25_000, months, plan["posting_frequency"]) < 80.0
+
+
+def test_limits_are_respected_and_infeasible_gives_no_plan():
+    req = GoalSolveRequest(current_followers=500, target_followers=1_000_000, min_score=95.0,
+                           max_timeline_months=12, max_posting_frequency=7)
+    result = solve_goal(req)
+    assert result.plan is None and result.feasible_plans == 0
+    assert len(result.surface) == MAX_TIMELINE_MONTHS   # the full surface is still returned
@@ -0,0 +1,75 @@
+from app.models.schemas import AIInsightsRequest, AIInsightsResponse
+from app.services.ai_service import feasibility_score
+from app.services.insights_cache import InsightsCache, _Entry, _Patcher, quantized_key
+from app.services.request_context import current_tenant
+
+
+def _req(**overrides) -> AIInsightsRequest:
+    fields = dict(username="sunny.days", platform="instagram", followers=10_213, engagement_rate=4.31,
+                  niche="Fitness", goals="grow audience", target_followers=20_000, timeline_months=6)
+    fields.update(overrides)
+    return AIInsightsRequest(**fields)
+
+
+def test_near_duplicate_requests_share_a_key():
+    assert quantized_key(_req()) == quantized_key(_req(followers=10_240, engagement_rate=4.29,
+                                                       target_followers=20_400, niche="  fitness!! "))
+
+
+def test_key_separates_distinct_requests():
+    base = quantized_key(_req())
+    assert quantized_key(_req(followers=14_000)) != base
+    assert quantized_key(_req(engagement_rate=4.6)) != base
+    assert quantized_key(_req(platform="tiktok")) != base
+    assert quantized_key(_req(niche="cooking")) != base
+    assert quantized_key(_req(timeline_months=12)) != base
+
+
+def test_key_includes_tenant():
+    token = current_tenant.set("agency_a")
+    try:
+        other = quantized_key(_req())
+    finally:
+        current_tenant.reset(token)
+    assert other != quantized_key(_req())
+
+
+def test_patcher_substitutes_exact_figures_and_username():
+    patcher = _Patcher(_req(), _req(username="moon.light", followers=10_240, engagement_rate=4.29))
+    text = "@sunny.days has 10,213 followers (10213) at 4.31% engagement; sunny.days should post daily."
+    assert patcher.text(text) == (
+        "@moon.light has 10,240 followers (10240) at 4.29% engagement; moon.light should post daily.")
+
+
+def test_patcher_leaves_other_numbers_alone():
+    patcher = _Patcher(_req(), _req(followers=10_240))
+    text = "110,213 views, 10,2130 impressions, 10,213.5 average and 10,213 followers"
+    assert patcher.text(text) == "110,213 views, 10,2130 impressions, 10,213.5 average and 10,240 followers"
+
+
+def test_short_username_is_only_replaced_with_at_sign():
+    patcher = _Patcher(_req(username="go"), _req(username="ann"))
+    assert patcher.text("@go: go for it") == "@ann: go for it"
+
+
+def test_patcher_walks_nested_values():
+    patcher = _Patcher(_req(), _req(followers=10_240))
+    assert patcher.text({"a": ["10,213 now"], "b": 3}) == {"a": ["10,240 now"], "b": 3}
+
+
+def test_prediction_scales_numbers_by_follower_ratio():
+    patcher = _Patcher(_req(followers=10_000), _req(followers=11_000))
+    assert patcher.prediction({"month_3": 15_000, "note": "from 10,000", "flag": True}) == {
+        "month_3": 16_500, "note": "from 11,000", "flag": True}
+
+
+def test_patch_recomputes_feasibility():
+    cached = AIInsightsResponse(
+        profile_analysis="@sunny.days has 10,213 followers.", mistakes=[], daily_plan=[], content_ideas=[],
+        hook_ideas=[], posting_schedule={}, growth_prediction={"month_6": 20_426}, feasibility_score=1.0)
+    entry = _Entry(_req(), cached, seconds=2.0, tokens=900, expires_at=0.0)
+    target = _req(followers=10_240, target_followers=20_000)
+    patched = InsightsCache.patch(entry, target)
+    assert patched.profile_analysis == "@sunny.days has 10,240 followers."
+    assert patched.growth_prediction == {"month_6": round(20_426 * 10_240 / 10_213)}
+    assert patched.feasibility_score == feasibility_score(target)
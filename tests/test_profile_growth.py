@@ -0,0 +1,38 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.columnar import COLUMNAR, ROWS, to_rows
+from app.services.profile_service import growth_columns, simulate_profile
+
+URLS = ["https://tiktok.com/@someone", "https://twitter.com/someone", "https://facebook.com/some.page"]
+
+
+def _per_row_loop(followers: int, engagement_rate: float, rng: random.Random, weeks: int = 25) -> list:
+    """The per-week loop growth_data was built with before columnar output."""
+    base_date = datetime.now() - timedelta(weeks=weeks - 1)
+    rows, current = [], float(followers) * 0.70
+    for w in range(weeks):
+        rows.append({
+            "week":       (base_date + timedelta(weeks=w)).strftime("%b %d"),
+            "followers":  int(current),
+            "engagement": round(rng.uniform(engagement_rate * 0.6, engagement_rate * 1.4), 2),
+            "views":      int(current * rng.uniform(2.0, 7.0)),
+        })
+        current *= (1 + rng.uniform(0.003, 0.045))
+    return rows
+
+
+@pytest.mark.parametrize("weeks", [1, 25, 104])
+def test_columns_draw_what_the_per_row_loop_drew(weeks):
+    columns = growth_columns(250_000, 4.2, random.Random(1234), weeks)
+    assert to_rows(columns) == _per_row_loop(250_000, 4.2, random.Random(1234), weeks)
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_rows_and_columnar_carry_the_same_growth_data(url):
+    rows    = simulate_profile(url, ROWS)
+    columns = simulate_profile(url, COLUMNAR)
+    assert to_rows(columns.growth_data) == rows.growth_data
+    assert columns.model_dump(exclude={"growth_data"}) == rows.model_dump(exclude={"growth_data"})
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services import refresh_scheduler
+from app.services.refresh_scheduler import ProfileRefresher
+
+URL = "https://instagram.com/someone"
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """fetch_profile_page that blocks until `release` is set, counting calls."""
+    release = threading.Event()
+    calls = []
+
+    def fake_fetch(url, platform, force=False):
+        calls.append(url)
+        release.wait(5)
+
+    monkeypatch.setattr(refresh_scheduler, "fetch_profile_page", fake_fetch)
+    return calls, release
+
+
+async def _until(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+def _live_entries(r: ProfileRefresher) -> list:
+    return [(due, url) for due, url in r._heap if url == URL and r._due.get(url) == due]
+
+
+def test_rewatch_during_refresh_keeps_one_schedule(fetches):
+    calls, release = fetches
+
+    async def run():
+        r = ProfileRefresher(base_interval=3600, min_interval=0.01, max_interval=7200, jitter=0.0, rate=1000)
+        r.start()
+        try:
+            r.watch(URL)
+            await _until(lambda: calls)
+            assert r.unwatch(URL)
+            r.watch(URL)
+            await asyncio.sleep(0.05)           # past the re-watch's first-refresh window
+            assert len(calls) == 1              # no second refresh of the same URL in flight
+            assert _live_entries(r) == []
+
+            release.set()
+            await _until(lambda: r.stats()["refreshes_total"] == 1)
+            assert len(_live_entries(r)) == 1
+            assert r.watched()[0]["next_refresh_in"] > 3000
+        finally:
+            release.set()
+            await r.stop()
+
+    asyncio.run(run())
+
+
+def test_unwatch_during_refresh_stops_rescheduling(fetches):
+    calls, release = fetches
+
+    async def run():
+        r = ProfileRefresher(base_interval=3600, min_interval=0.01, max_interval=7200, jitter=0.0, rate=1000)
+        r.start()
+        try:
+            r.watch(URL)
+            await _until(lambda: calls)
+            r.unwatch(URL)
+            release.set()
+            await _until(lambda: r.stats()["refreshes_total"] == 1)
+            assert r.watched() == [] and _live_entries(r) == []
+        finally:
+            release.set()
+            await r.stop()
+
+    asyncio.run(run())
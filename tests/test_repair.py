@@ -0,0 +1,132 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.services import repair
+from app.services.repair import _close_truncated, parse_json, validate_or_repair
+
+
+class Reading(BaseModel):
+    title: str
+    tags:  List[str]
+    score: int
+
+
+MESSAGES = [{"role": "user", "content": "Write a reading as JSON."}]
+
+
+def _caller(reply: dict):
+    calls = []
+
+    async def call(messages, max_tokens=None, usage=None):
+        calls.append(messages)
+        if usage is not None:
+            usage.update(prompt_tokens=50, completion_tokens=10)
+        return reply
+
+    return call, calls
+
+
+# ── parse_json ──────────────────────────────────────────────────
+def test_parse_json_strips_code_fences():
+    assert parse_json('```json\n{"a": 1}\n```') == {"a": 1}
+    assert parse_json('```\n{"a": 1}') == {"a": 1}
+
+
+def test_parse_json_drops_trailing_commas():
+    assert parse_json('{"a": [1, 2,], "b": 3,}') == {"a": [1, 2], "b": 3}
+
+
+def test_parse_json_cuts_truncated_completion_to_last_complete_member():
+    assert parse_json('{"title": "Leo", "tags": ["bold", "warm"], "score": 9') == {
+        "title": "Leo", "tags": ["bold", "warm"]}
+
+
+def test_parse_json_ignores_text_around_the_object():
+    assert parse_json('Here you go: {"a": 1} Hope this helps!') == {"a": 1}
+
+
+def test_parse_json_raises_value_error_when_unsalvageable():
+    with pytest.raises(ValueError):
+        parse_json("no json here")
+    with pytest.raises(ValueError):
+        parse_json('{"only": "one unterminated member')
+
+
+# ── _close_truncated ────────────────────────────────────────────
+def test_close_truncated_respects_strings_and_nesting():
+    assert _close_truncated('{"a": "x, y", "b": "tru') == '{"a": "x, y"}'
+    assert _close_truncated('{"a": {"b": 1, "c": 2}, "d": [1, 2') == '{"a": {"b": 1, "c": 2}}'
+    assert _close_truncated('{"a": "say \\"hi\\", ok", "b": 1, "c": ') == '{"a": "say \\"hi\\", ok", "b": 1}'
+
+
+def test_close_truncated_leaves_balanced_or_memberless_text():
+    assert _close_truncated('{"a": 1}') is None
+    assert _close_truncated('{"a": [1, 2') is None
+
+
+# ── validate_or_repair ──────────────────────────────────────────
+def test_valid_data_makes_no_call():
+    call, calls = _caller({})
+    result = asyncio.run(validate_or_repair(Reading, {"title": "t", "tags": [], "score": 1}, MESSAGES, call))
+    assert result == Reading(title="t", tags=[], score=1)
+    assert calls == []
+
+
+def test_only_broken_fields_are_regenerated_and_merged():
+    call, calls = _caller({"score": 7, "title": "ignored"})
+    result = asyncio.run(validate_or_repair(Reading, {"title": "t", "tags": ["a"], "score": "high"},
+                                            MESSAGES, call))
+    assert result == Reading(title="t", tags=["a"], score=7)
+    assert len(calls) == 1
+    # The valid fields are resent as the assistant's answer, the broken one is named
+    assistant, ask = calls[0][-2], calls[0][-1]
+    assert assistant["role"] == "assistant" and '"score"' not in assistant["content"]
+    assert "- score:" in ask["content"]
+
+
+def test_required_optional_field_is_repaired():
+    class Partial(BaseModel):
+        title: str
+        extra: Optional[str] = None
+
+    call, _ = _caller({"extra": "filled"})
+    result = asyncio.run(validate_or_repair(Partial, {"title": "t"}, MESSAGES, call, required=("extra",)))
+    assert result.extra == "filled"
+
+
+def test_messages_callable_receives_the_broken_fields():
+    seen = {}
+
+    def context(broken):
+        seen.update(broken)
+        return MESSAGES
+
+    call, _ = _caller({"tags": ["x"]})
+    asyncio.run(validate_or_repair(Reading, {"title": "t", "score": 1}, context, call))
+    assert seen == {"tags": "missing"}
+
+
+def test_unrepairable_response_is_502():
+    call, _ = _caller({"score": "still bad"})
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(validate_or_repair(Reading, {"title": "t", "tags": [], "score": "bad"}, MESSAGES, call))
+    assert exc.value.status_code == 502
+
+
+def test_non_object_json_is_502_without_a_call():
+    call, calls = _caller({})
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(validate_or_repair(Reading, ["not", "an", "object"], MESSAGES, call))
+    assert exc.value.status_code == 502 and calls == []
+
+
+def test_repair_disabled_raises_immediately(monkeypatch):
+    monkeypatch.setattr(repair, "AI_REPAIR_ENABLED", False)
+    call, calls = _caller({"score": 1})
+    with pytest.raises(HTTPException):
+        asyncio.run(validate_or_repair(Reading, {"title": "t", "tags": []}, MESSAGES, call))
+    assert calls == []
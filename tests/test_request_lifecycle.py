@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.services import admission, tracing
+from app.services.metrics import http_request_duration, http_requests_in_flight
+
+BODY_SECONDS = 0.3
+
+
+@pytest.fixture
+def slow_pipeline(monkeypatch):
+    """/pipeline whose work happens while the body streams, as the real one does."""
+    events = []
+
+    async def fake_run_pipeline(req):
+        yield {"event": "started"}
+        with tracing.span("pipeline.stage"):
+            await asyncio.sleep(BODY_SECONDS)
+        events.append(http_requests_in_flight.value("/pipeline"))
+        yield {"event": "done"}
+
+    monkeypatch.setattr(main, "run_pipeline", fake_run_pipeline)
+    return events
+
+
+def _stream_pipeline() -> list:
+    client = TestClient(main.app)
+    with client.stream("POST", "/pipeline", json={"social_url": "https://instagram.com/someone"}) as resp:
+        assert resp.status_code == 200
+        return [json.loads(line) for line in resp.iter_lines() if line]
+
+
+def test_request_stays_in_flight_until_the_body_is_sent(slow_pipeline):
+    lines = _stream_pipeline()
+    assert [e["event"] for e in lines] == ["started", "done"]
+    assert slow_pipeline == [1]   # still counted while the body was being produced
+    assert http_requests_in_flight.value("/pipeline") == 0
+    assert admission._limiters["/pipeline"].active == 0
+
+
+def _duration_series():
+    series = http_request_duration._series.get(("/pipeline", "POST", "200"))
+    return (sum(series[:-1]), series[-1]) if series else (0, 0.0)
+
+
+def test_duration_histogram_covers_the_streamed_body(slow_pipeline):
+    count_before, sum_before = _duration_series()
+    _stream_pipeline()
+    count_after, sum_after = _duration_series()
+    assert count_after == count_before + 1
+    assert sum_after - sum_before >= BODY_SECONDS
+
+
+def test_trace_stays_open_until_the_body_is_sent(slow_pipeline):
+    _stream_pipeline()
+    trace = tracing._recent[-1]
+    root = trace.root
+    assert root.attributes["http.route"] == "/pipeline"
+    assert root.attributes["http.status_code"] == 200
+    stage = next(s for s in trace.spans if s.name == "pipeline.stage")
+    assert stage.parent_id == root.span_id
+    assert stage.end_ns <= root.end_ns
+    assert root.duration_ms >= BODY_SECONDS * 1000
+
+
+def test_rejections_complete_immediately(monkeypatch):
+    async def reject(route):
+        raise admission.Rejected(route, "queue full", 3.0)
+
+    monkeypatch.setattr(admission, "admit", reject)
+    resp = TestClient(main.app).post("/pipeline", json={"social_url": "https://instagram.com/someone"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"]
+    assert http_requests_in_flight.value("/pipeline") == 0
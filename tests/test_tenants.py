@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.services import tenants
+from app.services.tenants import FairScheduler, Tenant
+
+
+@pytest.fixture
+def weighted(monkeypatch):
+    """Tenants "a" (weight 3) and "b" (weight 1), fresh for each test."""
+    a, b = Tenant("a", weight=3.0), Tenant("b", weight=1.0)
+    monkeypatch.setitem(tenants._tenants, "a", a)
+    monkeypatch.setitem(tenants._tenants, "b", b)
+    return a, b
+
+
+async def _call(sched: FairScheduler, tenant: str, order: list, cost: float = 1.0) -> None:
+    async with sched.slot(tenant, cost):
+        order.append(tenant)
+        await asyncio.sleep(0)
+
+
+async def _queue_behind_holder(sched: FairScheduler, calls) -> list:
+    """Occupy the only slot, queue `calls` in order, then let them run; returns the grant order."""
+    order: list = []
+    release = asyncio.Event()
+
+    async def holder():
+        async with sched.slot("public", 1.0):
+            await release.wait()
+
+    held = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    tasks = []
+    for tenant in calls:
+        tasks.append(asyncio.create_task(_call(sched, tenant, order)))
+        await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(held, *tasks)
+    return order
+
+
+def test_capacity_is_shared_by_weight(weighted):
+    order = asyncio.run(_queue_behind_holder(FairScheduler(capacity=1), ["a"] * 6 + ["b"] * 6))
+    assert order[:4].count("a") == 3
+    assert order[:8].count("a") == 6
+
+
+def test_bulk_tenant_only_queues_behind_itself(weighted):
+    order = asyncio.run(_queue_behind_holder(FairScheduler(capacity=1), ["b"] * 10 + ["a"]))
+    assert order.index("a") <= 1
+
+
+def test_cancelled_waiter_does_not_charge_its_tenant(weighted):
+    a, _ = weighted
+
+    async def run():
+        sched = FairScheduler(capacity=1)
+        order: list = []
+        release = asyncio.Event()
+
+        async def holder():
+            async with sched.slot("public", 1.0):
+                await release.wait()
+
+        held = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        gone  = asyncio.create_task(_call(sched, "a", order, cost=300.0))
+        later = asyncio.create_task(_call(sched, "a", order))
+        await asyncio.sleep(0)
+        gone.cancel()
+        await asyncio.sleep(0)
+        assert a.last_finish == 0.0
+        release.set()
+        await asyncio.gather(held, later)
+        assert order == ["a"]
+        assert a.last_finish < 300.0 / a.weight
+        assert sched.active == 0 and a.queued == 0
+
+    asyncio.run(run())
+
+
+def test_meta_routes_need_no_key_when_keys_are_required(monkeypatch):
+    monkeypatch.setattr(tenants, "TENANT_REQUIRE_KEY", True)
+    client = TestClient(main.app)
+    for path in ("/", "/health", "/metrics", "/docs", "/openapi.json"):
+        assert client.get(path).status_code == 200, path
+    assert client.get("/tenants/usage").status_code == 401